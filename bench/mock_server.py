@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""
+tradead / Discord 로컬 대역 서버
+실제 판매 사이트와 웹훅 없이 모니터를 끝까지 돌려 볼 수 있도록 두 가지를 한 포트에서 흉내 낸다.
+- GET /<slug>: 고정 데이터(html/wbc_last.html, 합성 공연, 공연 목록 JSON)로 만든 Inertia 형식 페이지
+  스크립트/난수로 건수를 바꾸고, 403/429 응답과 지연을 끼워 넣을 수 있음. ETag 를 주므로 304 경로도 확인 가능
+- POST /api/webhooks/<id>/<token>: Discord 호환 웹훅 수신함. 받은 payload 를 기록하고
+  웹훅별 레이트 리밋 버킷(X-RateLimit-* 헤더, 429 + retry_after)과 Discord 크기 제한(400)을 흉내 냄
+- GET /_mock/stats: 요청 수, 바뀐 건수 중 알림이 온 비율, 변경 → 알림 도착 지연(p50/p95/max)
+- GET /_mock/webhooks: 받은 payload 목록
+
+모니터는 이벤트 설정의 url / webhook 으로 연결한다:
+  python bench/mock_server.py --port 8800 --change-every 3
+  {"events": [{"slug": "wbc2026", "url": "http://127.0.0.1:8800/wbc2026",
+               "webhook": "http://127.0.0.1:8800/api/webhooks/1/mock", "target_ids": [1519, 1520]}]}
+
+스크립트 예 (--script, 페이지 요청 번호 기준, 1부터):
+  {"steps": [
+    {"request": 3, "set": {"1519": 2}},
+    {"request": 5, "status": 429, "retry_after": 30},
+    {"request": 6, "latency_ms": 1500},
+    {"request": 8, "set": {"1519": 0, "1520": 4}}
+  ]}
+"""
+
+import argparse
+import html
+import json
+import random
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from bench.synth import make_concert, make_data_page, render_page  # noqa: E402
+from wbc_extract import find_data_page  # noqa: E402
+from wbc_records import display_date  # noqa: E402
+
+# Discord 크기 제한 (넘으면 400 Invalid Form Body)
+EMBED_DESCRIPTION_MAX = 4096
+EMBEDS_PER_MESSAGE = 10
+CONTENT_MAX = 2000
+
+# 변경 줄: "• **03/05 19:00 | 韓国 vs 日本** — 0件 → **3件**"
+_CHANGE_LINE = re.compile(r"\*\*(\d{2}/\d{2} \S+)(?: \| [^*]*)?\*\* — (\d+)件 → \*\*(\d+)件\*\*")
+
+
+def load_fixture(path=None, synthetic: int = 0, seed: int = 0) -> dict:
+    """
+    페이지 data-page dict. synthetic 이 있으면 합성 공연 N건,
+    path 가 .html 이면 그 페이지의 data-page, .json 이면 공연 목록(또는 data-page 전체)
+    """
+    if synthetic:
+        rng = random.Random(seed)
+        return make_data_page([make_concert(1000 + i, rng) for i in range(synthetic)])
+    path = Path(path or ROOT / "html" / "wbc_last.html")
+    text = path.read_text(encoding="utf-8")
+    if path.suffix == ".json":
+        data = json.loads(text)
+        return data if isinstance(data, dict) else make_data_page(data)
+    raw, debug_msg = find_data_page(text)
+    if raw is None:
+        raise ValueError(f"{path}: {debug_msg}")
+    return json.loads(html.unescape(raw))
+
+
+def _quantile(values: list[float], q: float) -> float | None:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+class MockSite:
+    """가짜 이벤트 페이지 상태 (건수 변경 스크립트, 장애 주입, 변경 시각 기록)"""
+
+    def __init__(self, data_page: dict, script=None, change_every: int = 0, changes_per_step: int = 1,
+                 fail_rate: float = 0.0, fail_codes=(403, 429), retry_after: float = 0.0,
+                 latency_ms: float = 0.0, jitter_ms: float = 0.0, etag: bool = True, seed: int = 0):
+        self.data_page = data_page
+        self.concerts: list[dict] = data_page["props"]["concerts"]
+        self.steps: dict[int, list[dict]] = {}
+        for step in (script or {}).get("steps", []):
+            self.steps.setdefault(int(step["request"]), []).append(step)
+        self.change_every = change_every
+        self.changes_per_step = changes_per_step
+        self.fail_rate = fail_rate
+        self.fail_codes = tuple(fail_codes)
+        self.retry_after = retry_after
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.etag = etag
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.responses: dict[int, int] = {}
+        self.version = 0
+        self._page: str | None = None
+        # "MM/DD HH:MM" → 공연 id (웹훅 본문의 변경 줄을 공연으로 되돌릴 때 사용)
+        self.by_slot = {self._slot(c): c.get("id") for c in self.concerts}
+        # 아직 알림이 오지 않은 공연 id → (첫 변경 시각, 최신 건수). 알림 전에 다시 바뀌면 첫 시각 유지
+        self.pending: dict = {}
+        self.changes_made = 0
+        self.superseded = 0  # 알림 전에 다시 바뀐 변경 수 (알림 스레드가 하나로 합침)
+
+    @staticmethod
+    def _slot(c: dict) -> str:
+        date = c.get("concert_date_web_format") or c.get("concert_date") or "?"
+        return f"{display_date(date)} {c.get('start_time_web_format') or c.get('start_time') or '?'}"
+
+    def set_count(self, concert_id, count: int, now: float | None = None):
+        """공연 건수 변경 (이미 그 값이면 무시). 반환: 바뀌었는지"""
+        for c in self.concerts:
+            if str(c.get("id")) == str(concert_id):
+                if c.get("listings_count") == count:
+                    return False
+                c["listings_count"] = count
+                now = now if now is not None else time.time()
+                prev = self.pending.get(c.get("id"))
+                if prev is not None:
+                    self.superseded += 1
+                    now = prev[0]
+                self.pending[c.get("id")] = (now, count)
+                self.changes_made += 1
+                self.version += 1
+                self._page = None
+                return True
+        raise KeyError(f"공연 id {concert_id} 가 고정 데이터에 없습니다")
+
+    def _random_changes(self, now: float):
+        for c in self.rng.sample(self.concerts, min(self.changes_per_step, len(self.concerts))):
+            current = c.get("listings_count") or 0
+            new = self.rng.choice((0, self.rng.randint(1, 30))) if current else self.rng.randint(1, 30)
+            self.set_count(c.get("id"), new, now)
+
+    def handle(self, if_none_match: str | None) -> tuple[int, dict, bytes, float]:
+        """페이지 요청 하나 처리. 반환: (상태 코드, 헤더, 본문, 응답 전 지연(초))"""
+        with self.lock:
+            self.requests += 1
+            n = self.requests
+            now = time.time()
+            status = 200
+            retry_after = self.retry_after
+            latency = self.latency_ms + (self.rng.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0)
+            for step in self.steps.pop(n, ()):
+                for concert_id, count in (step.get("set") or {}).items():
+                    self.set_count(concert_id, int(count), now)
+                status = int(step.get("status", status))
+                retry_after = float(step.get("retry_after", retry_after))
+                latency += float(step.get("latency_ms", 0))
+            if self.change_every and n % self.change_every == 0:
+                self._random_changes(now)
+            if status == 200 and self.fail_rate and self.rng.random() < self.fail_rate:
+                status = self.rng.choice(self.fail_codes)
+            headers = {}
+            if status != 200:
+                body = f"<html><body>{status}</body></html>".encode()
+                if retry_after:
+                    headers["Retry-After"] = f"{retry_after:g}"
+            else:
+                etag = f'"v{self.version}"'
+                if self.etag:
+                    headers["ETag"] = etag
+                if self.etag and if_none_match == etag:
+                    status, body = 304, b""
+                else:
+                    if self._page is None:
+                        self._page = render_page(self.data_page)
+                    body = self._page.encode("utf-8")
+            self.responses[status] = self.responses.get(status, 0) + 1
+        return status, headers, body, latency / 1000
+
+
+class _Bucket:
+    def __init__(self, limit: int):
+        self.remaining = limit
+        self.reset_at = 0.0
+
+
+class WebhookSink:
+    """Discord 호환 웹훅 수신함 (payload 기록, 웹훅별 레이트 리밋 버킷, 크기 제한 검사)"""
+
+    def __init__(self, site: MockSite | None = None, bucket_limit: int = 5, bucket_window: float = 2.0,
+                 jsonl_path=None, keep: int = 10000):
+        self.site = site
+        self.bucket_limit = bucket_limit
+        self.bucket_window = bucket_window
+        self.jsonl_path = Path(jsonl_path) if jsonl_path else None
+        self.keep = keep
+        self.lock = threading.Lock()
+        self.received: list[dict] = []
+        self.buckets: dict[str, _Bucket] = {}
+        self.rate_limited = 0
+        self.rejected = 0
+        self.latencies: list[float] = []
+
+    @staticmethod
+    def _invalid(payload) -> str:
+        if not isinstance(payload, dict):
+            return "payload 가 객체가 아닙니다"
+        embeds = payload.get("embeds") or []
+        if not embeds and not payload.get("content"):
+            return "content 나 embeds 가 필요합니다"
+        if len(embeds) > EMBEDS_PER_MESSAGE:
+            return f"embeds {len(embeds)}개 > {EMBEDS_PER_MESSAGE}"
+        if len(payload.get("content") or "") > CONTENT_MAX:
+            return f"content {CONTENT_MAX}자 초과"
+        for e in embeds:
+            if len(e.get("description") or "") > EMBED_DESCRIPTION_MAX:
+                return f"embed description {EMBED_DESCRIPTION_MAX}자 초과"
+        return ""
+
+    def handle(self, path: str, body: bytes) -> tuple[int, dict, bytes]:
+        now = time.time()
+        mono = time.monotonic()
+        with self.lock:
+            bucket = self.buckets.setdefault(path, _Bucket(self.bucket_limit))
+            if mono >= bucket.reset_at:
+                bucket.remaining = self.bucket_limit
+                bucket.reset_at = mono + self.bucket_window
+            reset_after = max(0.0, bucket.reset_at - mono)
+            headers = {
+                "X-RateLimit-Limit": str(self.bucket_limit),
+                "X-RateLimit-Bucket": path,
+                "X-RateLimit-Reset-After": f"{reset_after:.3f}",
+            }
+            if bucket.remaining <= 0:
+                self.rate_limited += 1
+                headers["X-RateLimit-Remaining"] = "0"
+                headers["Retry-After"] = f"{reset_after:.3f}"
+                body = {"message": "You are being rate limited.", "retry_after": round(reset_after, 3), "global": False}
+                return 429, headers, json.dumps(body).encode()
+            bucket.remaining -= 1
+            headers["X-RateLimit-Remaining"] = str(bucket.remaining)
+            try:
+                payload = json.loads(body or b"null")
+            except ValueError:
+                payload = None
+            reason = self._invalid(payload)
+            if reason:
+                self.rejected += 1
+                return 400, headers, json.dumps({"message": "Invalid Form Body", "detail": reason}).encode()
+            record = {"time": now, "webhook": path, "payload": payload, "changes": self._match_changes(payload, now)}
+            self.received.append(record)
+            if len(self.received) > self.keep:
+                del self.received[: len(self.received) - self.keep]
+        if self.jsonl_path is not None:
+            with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return 204, headers, b""
+
+    def _match_changes(self, payload: dict, now: float) -> list[dict]:
+        """본문의 변경 줄을 공연으로 되돌려, 그 건수가 보인 시각부터 알림 도착까지의 지연 기록"""
+        out = []
+        if self.site is None:
+            return out
+        for embed in payload.get("embeds") or []:
+            for m in _CHANGE_LINE.finditer(embed.get("description") or ""):
+                slot, old, new = m.group(1), int(m.group(2)), int(m.group(3))
+                concert_id = self.site.by_slot.get(slot)
+                with self.site.lock:
+                    seen = self.site.pending.get(concert_id)
+                    # 알림이 최신 건수를 담고 있을 때만 처리된 것으로 봄 (그 사이 또 바뀌었으면 다음 알림 대기)
+                    if seen is not None and seen[1] == new:
+                        del self.site.pending[concert_id]
+                    else:
+                        seen = None
+                item = {"concert_id": concert_id, "old": old, "new": new}
+                if seen is not None:
+                    item["latency"] = now - seen[0]
+                    self.latencies.append(item["latency"])
+                out.append(item)
+        return out
+
+
+class MockServer:
+    """MockSite + WebhookSink 를 한 포트에서 서비스"""
+
+    def __init__(self, site: MockSite, sink: WebhookSink, port: int = 8800, addr: str = "127.0.0.1"):
+        from http.server import ThreadingHTTPServer
+
+        self.site = site
+        self.sink = sink
+        self.httpd = ThreadingHTTPServer((addr, port), _make_handler(self))
+        self.httpd.daemon_threads = True
+        self.thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def webhook_url(self, name: str = "1") -> str:
+        return f"{self.base_url}/api/webhooks/{name}/mock"
+
+    def start(self) -> "MockServer":
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="wbc-mock", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def stats(self) -> dict:
+        site, sink = self.site, self.sink
+        with site.lock:
+            missed = len(site.pending)
+            made = site.changes_made
+            superseded = site.superseded
+            responses = {str(k): v for k, v in sorted(site.responses.items())}
+            requests = site.requests
+        lat = list(sink.latencies)
+        return {
+            "page_requests": requests,
+            "page_responses": responses,
+            "changes_made": made,
+            # 알림 전에 다시 바뀌어 합쳐진 변경 (0→2→3 이 0→3 알림 하나로)
+            "changes_superseded": superseded,
+            # 알림이 아직 오지 않은 공연 (처리 중이거나 놓친 것)
+            "changes_pending": missed,
+            "webhook_messages": len(sink.received),
+            "webhook_rate_limited": sink.rate_limited,
+            "webhook_rejected": sink.rejected,
+            "latency_sec": {
+                "count": len(lat),
+                "p50": _quantile(lat, 0.5),
+                "p95": _quantile(lat, 0.95),
+                "max": max(lat) if lat else None,
+            },
+        }
+
+
+def _make_handler(server: MockServer):
+    from http.server import BaseHTTPRequestHandler
+
+    class _Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status: int, headers: dict, body: bytes, content_type: str = "text/html; charset=utf-8"):
+            self.send_response(status)
+            if body:
+                self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for k, v in headers.items():
+                self.send_header(k, v)
+            self.end_headers()
+            if body:
+                self.wfile.write(body)
+
+        def _json(self, obj):
+            self._send(200, {}, json.dumps(obj, ensure_ascii=False).encode("utf-8"), "application/json")
+
+        def do_GET(self):
+            path = urlsplit(self.path).path
+            if path == "/_mock/stats":
+                self._json(server.stats())
+            elif path == "/_mock/webhooks":
+                with server.sink.lock:
+                    self._json(list(server.sink.received))
+            else:
+                status, headers, body, delay = server.site.handle(self.headers.get("If-None-Match"))
+                if delay > 0:
+                    time.sleep(delay)
+                self._send(status, headers, body)
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            path = urlsplit(self.path).path
+            if not path.startswith("/api/webhooks/"):
+                self._send(404, {}, b"")
+                return
+            status, headers, out = server.sink.handle(path, body)
+            self._send(status, headers, out, "application/json")
+
+        def log_message(self, *args):
+            pass
+
+    return _Handler
+
+
+def build_server(args) -> MockServer:
+    script = json.loads(Path(args.script).read_text(encoding="utf-8")) if args.script else None
+    site = MockSite(
+        load_fixture(args.fixture, args.synthetic, args.seed),
+        script=script,
+        change_every=args.change_every,
+        changes_per_step=args.changes,
+        fail_rate=args.fail_rate,
+        fail_codes=[int(x) for x in args.fail_codes.split(",") if x.strip()],
+        retry_after=args.retry_after,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        etag=not args.no_etag,
+        seed=args.seed,
+    )
+    sink = WebhookSink(site, args.bucket_limit, args.bucket_window, args.sink_file)
+    return MockServer(site, sink, args.port, args.addr)
+
+
+def add_arguments(ap: argparse.ArgumentParser):
+    ap.add_argument("--port", type=int, default=8800, help="포트 (기본 8800, 0 이면 임의)")
+    ap.add_argument("--addr", default="127.0.0.1", help="바인드 주소 (기본 127.0.0.1)")
+    ap.add_argument("--fixture", help="고정 데이터: 페이지 .html 또는 공연 목록 .json (기본 html/wbc_last.html)")
+    ap.add_argument("--synthetic", type=int, default=0, help="고정 데이터 대신 합성 공연 N건")
+    ap.add_argument("--script", help="요청 번호별 건수 변경/장애 스크립트(JSON)")
+    ap.add_argument("--change-every", type=int, default=0, help="페이지 요청 N번마다 임의 공연 건수 변경")
+    ap.add_argument("--changes", type=int, default=1, help="한 번에 바꿀 공연 수 (기본 1)")
+    ap.add_argument("--fail-rate", type=float, default=0.0, help="임의 오류 응답 비율 (0~1)")
+    ap.add_argument("--fail-codes", default="403,429", help="임의 오류 응답 코드 (기본 403,429)")
+    ap.add_argument("--retry-after", type=float, default=0.0, help="오류 응답의 Retry-After(초)")
+    ap.add_argument("--latency-ms", type=float, default=0.0, help="페이지 응답 지연(ms)")
+    ap.add_argument("--jitter-ms", type=float, default=0.0, help="지연에 더할 0~N ms 난수")
+    ap.add_argument("--no-etag", action="store_true", help="ETag 를 주지 않음 (data-page 해시 생략 경로 확인용)")
+    ap.add_argument("--bucket-limit", type=int, default=5, help="웹훅 버킷당 허용 요청 수 (기본 5)")
+    ap.add_argument("--bucket-window", type=float, default=2.0, help="웹훅 버킷 초기화 간격(초, 기본 2)")
+    ap.add_argument("--sink-file", help="받은 웹훅 payload 를 JSONL 로 기록할 파일")
+    ap.add_argument("--seed", type=int, default=0, help="난수 seed")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="tradead / Discord 웹훅 로컬 대역 서버")
+    add_arguments(ap)
+    args = ap.parse_args(argv)
+    server = build_server(args).start()
+    print(f"대역 서버 시작: {server.base_url}")
+    print(f"  페이지: {server.base_url}/wbc2026 (공연 {len(server.site.concerts)}건)")
+    print(f"  웹훅:   {server.webhook_url()}")
+    print(f"  통계:   {server.base_url}/_mock/stats")
+    try:
+        while True:
+            time.sleep(60)
+            print("[통계]", json.dumps(server.stats(), ensure_ascii=False))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print("[통계]", json.dumps(server.stats(), ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+모니터 파이프라인 오프라인 리플레이 벤치마크
+저장된 HTML 스냅샷(html/*.html, 스냅샷 보관함의 *.html.gz / *.html.zst) 또는 합성 페이지를 네트워크 없이
+parse_counts → detect_changes → payload 생성 순서로 흘려보내고
+단계별 시간, 메모리 할당(tracemalloc), 초당 처리 스냅샷 수를 출력한다.
+
+사용 예:
+  python bench/replay.py                        # html/ 폴더의 스냅샷 리플레이
+  python bench/replay.py snapshots/ -r 20       # 다른 폴더, 20회 반복
+  python bench/replay.py html/snapshots --check # 보관된 파싱 실패 스냅샷을 현재 파서로 다시 파싱
+  python bench/replay.py --synthetic 10,100,1000,10000
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import wbc_monitor  # noqa: E402
+from bench.synth import make_page  # noqa: E402
+from wbc_snapshots import SNAPSHOT_SUFFIXES, SnapshotArchive, read_snapshot  # noqa: E402
+
+STAGES = ("parse", "diff", "payload")
+
+
+def load_snapshots(directory: Path) -> list[tuple[str, str]]:
+    """폴더의 *.html 과 압축 스냅샷(wbc_snapshots)을 (이름, 내용) 리스트로 로드 (이름순)"""
+    paths = [p for p in directory.iterdir() if p.name.endswith((".html",) + SNAPSHOT_SUFFIXES)] if directory.is_dir() else []
+    return [(p.name, read_snapshot(p)) for p in sorted(paths)]
+
+
+def check_snapshots(directory: Path) -> int:
+    """
+    보관된 스냅샷을 현재 파서로 다시 파싱해 결과를 출력.
+    반환: 여전히 파싱에 실패하는 스냅샷 수
+    """
+    archive = SnapshotArchive(directory)
+    failed = 0
+    for name, text in load_snapshots(directory):
+        meta = archive.meta(directory / name)
+        counts, debug_msg = wbc_monitor.parse_counts(text)
+        if counts:
+            result = f"공연 {len(counts)}건"
+        else:
+            failed += 1
+            result = f"실패 — {debug_msg or '결과 없음'}"
+        saved = ""
+        if meta:
+            saved = f" [저장 당시 HTTP {meta.get('status')}, {meta.get('debug_msg') or '원인 없음'}]"
+        print(f"  {name}: {result}{saved}")
+    return failed
+
+
+def _run_pipeline(pages: list[str], stats: dict, trace_alloc: bool):
+    """pages 를 순서대로 한 번 처리. 직전 페이지 결과가 다음 페이지의 이전 상태가 됨"""
+    old_counts: list = []
+    for page in pages:
+        changes = new_counts = None
+        for stage in STAGES:
+            if trace_alloc:
+                tracemalloc.start()
+            t0 = time.perf_counter()
+            if stage == "parse":
+                new_counts, _ = wbc_monitor.parse_counts(page)
+            elif stage == "diff":
+                changes = wbc_monitor.detect_changes(old_counts, new_counts)
+            else:
+                wbc_monitor.build_discord_payload(changes, new_counts)
+            sec = time.perf_counter() - t0
+            if trace_alloc:
+                # 할당 측정은 단계마다 따로 시작해 피크를 단계별로 구분
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                stats[stage]["alloc_peak"] = max(stats[stage]["alloc_peak"], peak)
+            else:
+                stats[stage]["sec"] += sec
+        old_counts = new_counts
+
+
+def replay(pages: list[str], repeat: int = 1, trace_alloc: bool = True) -> dict:
+    """
+    pages 를 repeat 번 파이프라인에 흘려보낸다.
+    시간은 tracemalloc 없이 재고, 할당은 별도 1회 패스에서 잰다 (tracemalloc 이 시간을 부풀리므로).
+    반환: {"stages": {stage: {"sec": 합계, "alloc_peak": 최대 바이트}}, "snapshots": 처리 수, "wall": 전체 시간}
+    """
+    stats = {s: {"sec": 0.0, "alloc_peak": 0} for s in STAGES}
+    wall0 = time.perf_counter()
+    for _ in range(repeat):
+        _run_pipeline(pages, stats, trace_alloc=False)
+    wall = time.perf_counter() - wall0
+    if trace_alloc:
+        _run_pipeline(pages, stats, trace_alloc=True)
+    return {"stages": stats, "snapshots": len(pages) * repeat, "wall": wall}
+
+
+def print_report(label: str, result: dict):
+    n = result["snapshots"] or 1
+    print(f"== {label} — 스냅샷 {result['snapshots']}개")
+    for stage in STAGES:
+        s = result["stages"][stage]
+        print(
+            f"  {stage:8s} 평균 {s['sec'] / n * 1000:9.3f} ms   "
+            f"최대 할당 {s['alloc_peak'] / 1024:9.1f} KiB"
+        )
+    wall = result["wall"]
+    print(f"  처리량   {result['snapshots'] / wall if wall else 0:9.1f} 스냅샷/초")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="wbc_monitor 오프라인 리플레이 벤치마크")
+    ap.add_argument("directory", nargs="?", default=str(ROOT / "html"), help="HTML 스냅샷 폴더 (기본: html/)")
+    ap.add_argument("-r", "--repeat", type=int, default=10, help="반복 횟수 (기본 10)")
+    ap.add_argument("--synthetic", help="합성 페이지 공연 수 목록, 예: 10,100,1000,10000")
+    ap.add_argument("--no-alloc", action="store_true", help="tracemalloc 측정 생략")
+    ap.add_argument("--check", action="store_true", help="벤치마크 대신 스냅샷별 파싱 결과 출력 (실패가 있으면 종료 코드 1)")
+    args = ap.parse_args(argv)
+
+    if args.synthetic:
+        for size in (int(x) for x in args.synthetic.split(",") if x.strip()):
+            # 매 페이지마다 일부 건수가 바뀌도록 서로 다른 seed 로 몇 장 생성
+            pages = [make_page(size, seed=i) for i in range(4)]
+            print_report(f"합성 {size}건", replay(pages, args.repeat, not args.no_alloc))
+        return
+
+    snapshots = load_snapshots(Path(args.directory))
+    if not snapshots:
+        print(f"[오류] '{args.directory}' 에 *.html 스냅샷이 없습니다")
+        sys.exit(1)
+    if args.check:
+        failed = check_snapshots(Path(args.directory))
+        print(f"== 스냅샷 {len(snapshots)}개 중 파싱 실패 {failed}개")
+        sys.exit(1 if failed else 0)
+    pages = [text for _, text in snapshots]
+    print_report(f"{args.directory}", replay(pages, args.repeat, not args.no_alloc))
+
+
+if __name__ == "__main__":
+    main()
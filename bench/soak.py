@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+모니터 소크 테스트 / 종단 지연 측정
+bench/mock_server.py 대역 서버를 같은 프로세스에 띄우고 wbc_monitor.run_once 를 간격 없이 반복해
+며칠치 조회 주기를 몇 분 안에 흘려보낸다. 실제 알림 스레드·HTTP 세션·이력 저장소를 그대로 쓴다.
+- 주기적으로 RSS, 살아 있는 객체 수(gc), 선택적으로 tracemalloc 현재 할당량을 찍어 메모리 증가를 확인
+- 끝나면 대역 서버 통계(변경 → 웹훅 도착 지연 p50/p95/max, 429/400 수)를 출력
+
+사용 예:
+  python bench/soak.py --days 7 --interval 60 --change-every 5     # 7일치(10080주기)
+  python bench/soak.py --cycles 2000 --synthetic 500 --fail-rate 0.02 --trace
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import wbc_monitor  # noqa: E402
+from bench.mock_server import add_arguments, build_server  # noqa: E402
+from wbc_events import Event  # noqa: E402
+
+
+def rss_bytes() -> int | None:
+    """현재 RSS (리눅스 /proc 기준, 그 외 None)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _sample(cycle: int, started: float, trace: bool) -> dict:
+    s = {"cycle": cycle, "elapsed": time.perf_counter() - started, "rss": rss_bytes(), "objects": len(gc.get_objects())}
+    if trace:
+        s["traced"] = tracemalloc.get_traced_memory()[0]
+    return s
+
+
+def _mib(value) -> str:
+    return "-" if value is None else f"{value / 1024 / 1024:8.1f}"
+
+
+def soak(event: Event, cycles: int, sample_every: int, trace: bool, out) -> list[dict]:
+    """run_once 를 cycles 번 반복하며 sample_every 주기마다 메모리 표본 기록"""
+    samples = []
+    if trace:
+        tracemalloc.start()
+    started = time.perf_counter()
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        for cycle in range(1, cycles + 1):
+            wbc_monitor.run_once(event)
+            if cycle % sample_every == 0 or cycle == cycles:
+                gc.collect()
+                s = _sample(cycle, started, trace)
+                samples.append(s)
+                print(
+                    f"  {cycle:7d}주기 {s['elapsed']:8.1f}s  RSS {_mib(s['rss'])} MiB  "
+                    f"객체 {s['objects']:9d}  추적 {_mib(s.get('traced'))} MiB",
+                    file=out, flush=True,
+                )
+        # 남은 알림을 모두 보낸 뒤 통계
+        wbc_monitor.get_notifier().stop()
+    if trace:
+        tracemalloc.stop()
+    return samples
+
+
+def growth(samples: list[dict], key: str) -> float | None:
+    """워밍업(앞 10%) 이후 1000주기당 증가량. 표본이 부족하면 None"""
+    rows = [s for s in samples if s.get(key) is not None]
+    if len(rows) < 3:
+        return None
+    start = rows[max(1, len(rows) // 10)]
+    end = rows[-1]
+    if end["cycle"] == start["cycle"]:
+        return None
+    return (end[key] - start[key]) / (end["cycle"] - start["cycle"]) * 1000
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="모니터 소크 테스트 (로컬 대역 서버 사용)")
+    add_arguments(ap)
+    ap.set_defaults(port=0, change_every=5)
+    ap.add_argument("--cycles", type=int, default=0, help="조회 주기 수")
+    ap.add_argument("--days", type=float, default=1.0, help="--cycles 가 없을 때 흉내 낼 일수 (기본 1)")
+    ap.add_argument("--interval", type=int, default=60, help="일수 → 주기 수 환산용 체크 간격(초, 기본 60)")
+    ap.add_argument("--sample-every", type=int, default=0, help="메모리 표본 간격(주기, 기본 전체의 1/20)")
+    ap.add_argument("--trace", action="store_true", help="tracemalloc 할당량도 기록 (느려짐)")
+    ap.add_argument("--json", action="store_true", help="표본과 통계를 JSON 으로 출력")
+    args = ap.parse_args(argv)
+
+    cycles = args.cycles or max(1, int(args.days * 86400 / args.interval))
+    server = build_server(args).start()
+    with tempfile.TemporaryDirectory(prefix="wbc-soak-") as tmp:
+        event = Event(
+            "wbc2026",
+            url=f"{server.base_url}/wbc2026",
+            title="WBC 2026 (soak)",
+            target_ids=wbc_monitor.TARGET_CONCERT_IDS,
+            webhook=server.webhook_url(),
+            state_file=Path(tmp) / "wbc_state.json",
+            history_file=Path(tmp) / "wbc_history.jsonl",
+        )
+        out = sys.stderr if args.json else sys.stdout
+        print(f"소크 테스트: {cycles}주기, 공연 {len(server.site.concerts)}건, 대역 서버 {server.base_url}", file=out)
+        samples = soak(event, cycles, args.sample_every or max(1, cycles // 20), args.trace, out)
+    stats = server.stats()
+    server.stop()
+
+    result = {
+        "cycles": cycles,
+        "samples": samples,
+        "growth_per_1000_cycles": {k: growth(samples, k) for k in ("rss", "objects", "traced")},
+        "server": stats,
+    }
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+        return
+    g = result["growth_per_1000_cycles"]
+    print("== 메모리 (워밍업 이후 1000주기당 증가)")
+    print(f"  RSS  {_mib(g['rss'])} MiB   객체 {g['objects'] if g['objects'] is not None else '-'}   추적 {_mib(g['traced'])} MiB")
+    lat = stats["latency_sec"]
+    print("== 변경 → 알림 도착")
+    print(
+        f"  변경 {stats['changes_made']}건 (알림 전 재변경으로 합쳐짐 {stats['changes_superseded']}건), "
+        f"알림에서 확인 {lat['count']}건, 미확인 공연 {stats['changes_pending']}건"
+    )
+    if lat["count"]:
+        print(f"  지연 p50 {lat['p50']:.3f}s  p95 {lat['p95']:.3f}s  최대 {lat['max']:.3f}s")
+    print(
+        f"== 대역 서버: 페이지 응답 {stats['page_responses']}, 웹훅 메시지 {stats['webhook_messages']}, "
+        f"429 {stats['webhook_rate_limited']}, 400 {stats['webhook_rejected']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+합성 tradead 페이지 생성
+실제 페이지와 같은 Inertia 형식(div#app[data-page])으로 공연 N건을 만든다.
+"""
+
+import html
+import json
+import random
+
+_HEAD = '<!doctype html>\n<html lang="ja">\n<head><meta charset="UTF-8"><title>synthetic</title></head>\n<body>\n'
+_TAIL = "\n</body>\n</html>\n"
+
+
+def make_concert(concert_id: int, rng: random.Random) -> dict:
+    """실제 concerts 항목과 같은 키를 가진 공연 1건"""
+    month = 3 + (concert_id // 28) % 9
+    day = 1 + concert_id % 28
+    hour = (12, 18, 19)[concert_id % 3]
+    minute = (concert_id // 252) % 60  # 공연 수가 많아도 날짜·시간이 겹치지 않도록
+    return {
+        "id": concert_id,
+        "tour_id": 82,
+        "name": f"チーム{concert_id % 20:02d} vs チーム{(concert_id * 7) % 20:02d}",
+        "venue_name": "東京ドーム",
+        "concert_date": f"2026-{month:02d}-{day:02d}",
+        "start_time": f"{hour:02d}:{minute:02d}",
+        "listings_count": rng.choice((0, 0, 0, rng.randint(1, 40))),
+        "concert_date_web_format": f"2026年{month:02d}月{day:02d}日",
+        "start_time_web_format": f"{hour:02d}:{minute:02d}",
+        "is_holiday": False,
+    }
+
+
+def make_data_page(concerts: list[dict]) -> dict:
+    return {
+        "component": "web/buy/bidding/Index",
+        "props": {
+            "errors": [],
+            "auth": {"user": None},
+            "artist": {"id": "synthetic"},
+            "concerts": concerts,
+            "year": 2026,
+        },
+        "url": "/synthetic",
+        "version": "synthetic",
+    }
+
+
+def render_page(data_page: dict) -> str:
+    """data-page dict 를 실제 페이지처럼 (공백 없는 JSON 을) 엔티티 escape 해 HTML 로 감싼다"""
+    attr = html.escape(json.dumps(data_page, ensure_ascii=False, separators=(",", ":")), quote=True)
+    return f'{_HEAD}<div id="app" data-page="{attr}"></div>{_TAIL}'
+
+
+def make_page(n: int, seed: int = 0) -> str:
+    """공연 n건짜리 합성 페이지. seed 가 다르면 listings_count 만 달라짐"""
+    rng = random.Random(seed)
+    concerts = [make_concert(1000 + i, rng) for i in range(n)]
+    return render_page(make_data_page(concerts))
@@ -0,0 +1,58 @@
+"""
+테스트 공용 fixture
+mock_env: 대역 판매 사이트·웹훅 서버(bench/mock_server) + 묶기 지연 없는 Notifier 로 모니터 종단 경로를 실제 HTTP 로 돌림
+"""
+
+import pytest
+
+import wbc_monitor
+import wbc_notify
+import wbc_transport
+from bench.mock_server import MockServer, MockSite, WebhookSink, load_fixture
+from wbc_events import Event
+from wbc_notify import Notifier
+
+
+class MockEnv:
+    """대역 서버 하나와 그 서버를 보는 Event 를 만드는 도우미"""
+
+    def __init__(self, script, tmp_path):
+        self.site = MockSite(load_fixture(), script=script)
+        self.server = MockServer(self.site, WebhookSink(self.site), port=0).start()
+        self.notifier = Notifier(wbc_monitor._build_target_payload, window=0).start()
+        self.tmp_path = tmp_path
+
+    def event(self, slug="wbc2026", **kwargs) -> Event:
+        """대역 서버의 페이지·웹훅을 쓰는 Event. 상태·이력 파일은 tmp_path 안 (여러 번 만들면 같은 파일을 공유)"""
+        kwargs.setdefault("url", f"{self.server.base_url}/{slug}")
+        kwargs.setdefault("webhook", self.server.webhook_url())
+        kwargs.setdefault("state_file", self.tmp_path / "state.json")
+        kwargs.setdefault("history_file", self.tmp_path / "history.jsonl")
+        return Event(slug, **kwargs)
+
+    @property
+    def received(self) -> list[dict]:
+        return self.server.sink.received
+
+    def close(self):
+        self.notifier.stop()
+        self.server.stop()
+        wbc_transport.close_session()
+
+
+@pytest.fixture
+def mock_env(tmp_path, monkeypatch):
+    """mock_env(script) → MockEnv. Notifier 는 wbc_monitor._notifier 로 바꿔 끼우고 끝나면 모두 정리"""
+    pytest.importorskip("requests")
+    monkeypatch.setattr(wbc_notify, "_buckets", {})
+    envs = []
+
+    def start(script=None) -> MockEnv:
+        env = MockEnv(script, tmp_path)
+        monkeypatch.setattr(wbc_monitor, "_notifier", env.notifier)
+        envs.append(env)
+        return env
+
+    yield start
+    for env in envs:
+        env.close()
@@ -0,0 +1,163 @@
+"""
+이력 분석(wbc_analytics) 테스트: 손으로 계산한 FIFO 게시 시간·속도, numpy / array 경로 일치, --days 기준값
+"""
+
+import json
+import math
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+import wbc_analytics
+from wbc_analytics import analyze, load_series
+
+T0 = datetime(2026, 3, 2, 10, 0)  # 월요일 10시
+PATHS = [pytest.param(False, id="array"), pytest.param(True, id="numpy")]
+
+
+def _rec(dt, cid, count, name=None):
+    rec = {"t": dt.isoformat(), "id": cid, "count": count}
+    if name is not None:
+        rec.update(date="03/07", time="19:00", name=name)
+    return rec
+
+
+def _at(minutes):
+    return T0 + timedelta(minutes=minutes)
+
+
+HAND = [
+    _rec(_at(0), 1, 2, name="c1"),  # 첫 기록: 거래 아님, 매물 2 게시 시작
+    _rec(_at(0), 2, 3, name="c2"),
+    _rec(_at(10), 1, 5),  # +3 등록
+    _rec(_at(20), 2, None),  # 공연 2 사라짐: 남은 3 은 게시 시간 통계에서 제외
+    _rec(_at(30), 1, 1),  # -4: FIFO 로 0분 매물 2 (30분), 10분 매물 2 (20분)
+    _rec(_at(60), 1, 0),  # -1: 10분 매물 1 (50분)
+]
+
+
+@pytest.mark.parametrize("use_numpy", PATHS)
+def test_hand_computed_fifo_dwell_and_rates(use_numpy):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    result = analyze(load_series(HAND), use_numpy=use_numpy)
+    c1 = result["concerts"][1]
+    assert c1["name"] == "c1" and c1["last_count"] == 0
+    assert (c1["arrivals"], c1["depletions"], c1["still_listed"]) == (3, 5, 0)
+    assert c1["hours"] == pytest.approx(1.0)
+    assert c1["arrivals_per_hour"] == pytest.approx(3.0)
+    assert c1["depletions_per_hour"] == pytest.approx(5.0)
+    # (2×30 + 2×20 + 1×50) / 5
+    assert c1["dwell_mean_min"] == pytest.approx(30.0)
+    assert c1["dwell_median_min"] == pytest.approx(30.0)
+
+    c2 = result["concerts"][2]
+    assert c2["last_count"] is None and (c2["arrivals"], c2["depletions"]) == (0, 0)
+    assert c2["hours"] == pytest.approx(20 / 60)
+    assert c2["dwell_mean_min"] is None and c2["still_listed"] == 0
+
+    assert result["heatmap"]["arrivals"][0][10] == 3
+    assert result["heatmap"]["depletions"][0][10:12] == [4, 1]
+    assert sum(map(sum, result["heatmap"]["arrivals"])) == 3
+    assert result["change_gap_sec"]["p10"] == pytest.approx(1200) and result["change_gap_sec"]["p90"] == pytest.approx(1800)
+    assert result["dwell_min"] == {"p10": pytest.approx(20.0), "p50": pytest.approx(30.0)}
+    assert result["suggested_interval_sec"] == 600
+
+
+def _random_history(seed, n=3000, concerts=12):
+    rng = random.Random(seed)
+    counts = {}
+    t = T0
+    out = []
+    for _ in range(n):
+        t += timedelta(seconds=rng.choice((30, 60, 60, 120, 900)))
+        cid = rng.randrange(concerts)
+        cur = counts.get(cid)
+        if cur is None:
+            counts[cid] = c = rng.choice((0, rng.randint(1, 20)))
+            out.append(_rec(t, cid, c, name=f"c{cid}"))
+        elif rng.random() < 0.03:
+            del counts[cid]
+            out.append(_rec(t, cid, None))
+        else:
+            counts[cid] = c = max(0, cur + rng.randint(-5, 5))
+            out.append(_rec(t, cid, c))
+    return out
+
+
+def _close(a, b, path="result"):
+    if isinstance(a, dict):
+        assert a.keys() == b.keys(), path
+        for k in a:
+            _close(a[k], b[k], f"{path}.{k}")
+    elif isinstance(a, (list, tuple)):
+        assert len(a) == len(b), path
+        for i, (x, y) in enumerate(zip(a, b)):
+            _close(x, y, f"{path}[{i}]")
+    elif isinstance(a, float) or isinstance(b, float):
+        assert a == pytest.approx(b, rel=1e-9, abs=1e-9), path
+    else:
+        assert a == b, path
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_numpy_and_array_paths_agree(seed):
+    pytest.importorskip("numpy")
+    series = load_series(_random_history(seed))
+    fast = analyze(series, use_numpy=True)
+    slow = analyze(series, use_numpy=False)
+    _close(fast, slow)
+    assert any(c["dwell_mean_min"] for c in fast["concerts"].values())
+
+
+@pytest.mark.parametrize("use_numpy", PATHS)
+def test_since_keeps_previous_value_as_baseline(use_numpy):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    records = [
+        _rec(_at(0), 1, 5, name="c1"),
+        _rec(_at(0), 2, 4, name="c2"),  # since 이후 기록이 없는 공연은 빠짐
+        _rec(_at(60), 1, 7),
+        _rec(_at(180), 1, 10),
+        _rec(_at(240), 1, 6),
+    ]
+    series = load_series(records, since=_at(120))
+    assert series.keys == [1]
+    # since 직전 값(7)이 since 시각의 기준 레코드로 들어가 첫 변화량(+3)이 남음
+    assert list(series.count) == [7, 10, 6]
+    assert series.t[0] == pytest.approx(_at(120).timestamp())
+    assert series.info[1]["name"] == "c1"
+    c1 = analyze(series, use_numpy=use_numpy)["concerts"][1]
+    assert (c1["arrivals"], c1["depletions"]) == (3, 4)
+    assert c1["hours"] == pytest.approx(2.0)
+
+
+def test_concert_filter():
+    series = load_series(HAND, concert=2)
+    assert series.keys == [2] and len(series) == 2
+    assert math.isnan(series.count[1])
+
+
+def test_cli_days_json(tmp_path, capsys):
+    now = datetime.now()
+    path = tmp_path / "history.jsonl"
+    records = [
+        _rec(now - timedelta(days=10), 1519, 2, name="old"),
+        _rec(now - timedelta(days=5), 1519, 9),
+        _rec(now - timedelta(days=1), 1519, 12),
+        _rec(now - timedelta(hours=2), 1519, 4),
+    ]
+    path.write_text("".join(json.dumps(r) + "\n" for r in records), encoding="utf-8")
+    wbc_analytics.main([str(path), "--days", "3", "--json"])
+    result = json.loads(capsys.readouterr().out)
+    assert result["records"] == 3
+    c = result["concerts"]["1519"]
+    assert (c["arrivals"], c["depletions"], c["last_count"]) == (3, 8, 4)
+    assert c["name"] == "old"
+
+
+def test_cli_missing_file(tmp_path, capsys):
+    with pytest.raises(SystemExit):
+        wbc_analytics.main([str(tmp_path / "nope.jsonl")])
+    assert "이력 파일이 없습니다" in capsys.readouterr().out
@@ -0,0 +1,128 @@
+"""
+detect_changes / build_counts 성질 테스트
+hypothesis 없이 seed 를 고정한 난수로 이전/현재 상태 쌍을 많이 만들어,
+단순한 기준 구현(oracle)과 같은 결과인지와 항상 지켜야 하는 성질을 확인한다.
+실패하면 테스트 id 의 seed 로 같은 입력을 재현할 수 있다.
+"""
+
+import random
+
+import pytest
+
+import wbc_monitor
+from bench.synth import make_concert
+from wbc_events import Event
+from wbc_notify import coalesce
+from wbc_records import Concert
+
+SEEDS = range(300)
+TARGET_IDS = {1519, 1520}
+EVENT = Event("wbc-test", title="WBC TEST", target_ids=TARGET_IDS)
+
+
+def _random_state(rng: random.Random, ids: list[int]) -> list[Concert]:
+    """ids 중 일부로 만든 상태. 0 이 자주 나오도록 (실제 페이지도 대부분 0)"""
+    picked = [i for i in ids if rng.random() < 0.8]
+    rng.shuffle(picked)
+    return [
+        Concert(i, "03/05", "19:00", f"공연{i}", rng.choice((0, 0, 0, 1, 2, rng.randint(3, 50))))
+        for i in picked
+    ]
+
+
+def _pair(seed: int):
+    rng = random.Random(seed)
+    ids = rng.sample(range(1500, 1540), rng.randint(0, 25)) + rng.choice(([], [1519], [1519, 1520]))
+    ids = list(dict.fromkeys(ids))
+    return rng, _random_state(rng, ids), _random_state(rng, ids)
+
+
+def _oracle(old: list[Concert], new: list[Concert]) -> list[tuple]:
+    """기준 구현: 없던 공연은 0 에서 시작한 것으로 보고, 건수가 다르면 변경"""
+    before = {c.id: c.count for c in old}
+    out = []
+    for c in new:
+        prev = before.get(c.id)
+        if (prev if prev is not None else 0) != c.count:
+            out.append((c.id, 0 if prev is None else prev, c.count))
+    return out
+
+
+def _summary(changes):
+    return [(n.id, o.count, n.count) for o, n in changes]
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_matches_oracle(seed):
+    _, old, new = _pair(seed)
+    assert _summary(wbc_monitor.detect_changes(old, new)) == _oracle(old, new)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_invariants(seed):
+    _, old, new = _pair(seed)
+    changes = wbc_monitor.detect_changes(old, new)
+    old_ids = {c.id for c in old}
+    new_ids = {c.id for c in new}
+    for o, n in changes:
+        # 사라진 공연은 알리지 않고, 변경 항목의 new 는 현재 상태 그대로
+        assert n.id in new_ids
+        assert o.count != n.count
+        # 새로 생긴 공연은 0 → 양수로만 보고 (건수 0 인 신규 공연은 변경 아님)
+        if n.id not in old_ids:
+            assert o.count == 0 and n.count > 0 and o.key == n.key
+    # 같은 상태끼리는 변경 없음, old 를 dict(HistoryStore.latest 형태)로 줘도 결과 같음
+    assert wbc_monitor.detect_changes(new, new) == []
+    assert wbc_monitor.detect_changes({c.key: c for c in old}, new) == changes
+    # 예전 상태 파일(dict 리스트)도 같은 결과
+    assert wbc_monitor.detect_changes([c.to_dict() for c in old], new) == changes
+
+
+@pytest.mark.parametrize("seed", SEEDS[:100])
+def test_coalesce_equals_end_to_end_diff(seed):
+    # 알림 스레드가 s0→s1, s1→s2 변경을 합친 결과 == s0→s2 를 바로 비교한 결과 (공연 목록이 같을 때)
+    rng = random.Random(seed)
+    ids = rng.sample(range(1500, 1540), rng.randint(1, 20))
+    states = [[Concert(i, "03/05", "19:00", "", rng.choice((0, 0, 1, 5))) for i in ids] for _ in range(3)]
+    steps = [(wbc_monitor.detect_changes(a, b), b) for a, b in zip(states, states[1:])]
+    merged, last_counts = coalesce(steps)
+    assert sorted(_summary(merged)) == sorted(_summary(wbc_monitor.detect_changes(states[0], states[2])))
+    assert last_counts is states[2]
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_mention_only_for_target_zero_to_positive(seed):
+    _, old, new = _pair(seed)
+    changes = wbc_monitor.detect_changes(old, new)
+    if not changes:
+        return
+    payload = wbc_monitor.build_discord_payload(changes, new, EVENT)
+    expected = any(n.id in TARGET_IDS and o.count == 0 and n.count > 0 for o, n in changes)
+    assert (payload["content"] == "@everyone") is expected
+    assert ("allowed_mentions" in payload) is expected
+
+
+@pytest.mark.parametrize("seed", SEEDS[:100])
+def test_build_counts_dedups_by_id(seed):
+    rng = random.Random(seed)
+    raw = [make_concert(rng.randint(1000, 1030), rng) for _ in range(rng.randint(1, 60))]
+    counts = wbc_monitor.build_counts(raw, EVENT)
+    # 처음 나온 레코드를 유지하고 순서 보존
+    first = {}
+    for c in raw:
+        first.setdefault(c["id"], c)
+    assert [c.id for c in counts] == list(first)
+    assert [c.count for c in counts] == [first[i]["listings_count"] for i in first]
+
+
+def test_zero_to_positive_on_target_mentions_everyone():
+    old = [Concert(1519, "03/05", "19:00", "韓国 vs 日本", 0), Concert(1530, "03/06", "19:00", "", 0)]
+    new = [Concert(1519, "03/05", "19:00", "韓国 vs 日本", 3), Concert(1530, "03/06", "19:00", "", 2)]
+    changes = wbc_monitor.detect_changes(old, new)
+    assert _summary(changes) == [(1519, 0, 3), (1530, 0, 2)]
+    payload = wbc_monitor.build_discord_payload(changes, new, EVENT)
+    assert payload["content"] == "@everyone"
+    assert payload["allowed_mentions"] == {"parse": ["everyone"]}
+    # 양수 → 양수는 멘션 없음
+    payload = wbc_monitor.build_discord_payload(wbc_monitor.detect_changes(new, [new[0].with_count(5)]), new, EVENT)
+    assert payload["content"] is None
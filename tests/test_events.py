@@ -0,0 +1,73 @@
+"""
+이벤트 설정(wbc_events.load_events) 테스트: 잘못된 설정, 같은 slug, 웹훅·간격 기본값, 설정 파일이 없을 때 기본 이벤트 하나
+"""
+
+import json
+
+import pytest
+
+import wbc_monitor
+from wbc_events import DEFAULT_SLUG, MIN_INTERVAL_SEC, load_events
+
+
+def _config(tmp_path, data) -> str:
+    path = tmp_path / "events.json"
+    path.write_text(data if isinstance(data, str) else json.dumps(data), encoding="utf-8")
+    return str(path)
+
+
+def test_loads_events_with_defaults(tmp_path, monkeypatch):
+    monkeypatch.setenv("OTHER_WEBHOOK_URL", "https://discord.test/other")
+    path = _config(tmp_path, {"events": [
+        {"slug": "wbc2026", "title": "WBC 2026", "target_ids": [1519, 1520], "interval": 90},
+        {"slug": "other2026", "webhook_env": "OTHER_WEBHOOK_URL"},
+        {"slug": "third", "interval": 5},
+    ]})
+    wbc, other, third = load_events(path, default_webhook="https://discord.test/default", default_interval=60)
+    assert (wbc.title, wbc.target_ids, wbc.interval) == ("WBC 2026", {1519, 1520}, 90)
+    assert wbc.webhook == "https://discord.test/default"
+    assert other.webhook == "https://discord.test/other" and other.interval == 60
+    assert third.interval == MIN_INTERVAL_SEC
+    # 여러 이벤트면 로그 접두어와 이벤트별 상태 파일
+    assert [ev.tag for ev in (wbc, other)] == ["[wbc2026] ", "[other2026] "]
+    assert wbc.state_file.name == "wbc_state.json" and other.state_file.name == "wbc_state_other2026.json"
+    assert other.outbox_file.name == "wbc_outbox_other2026.jsonl"
+
+
+def test_plain_list_and_single_event(tmp_path):
+    (ev,) = load_events(_config(tmp_path, [{"slug": "solo", "webhook": " https://discord.test/x "}]))
+    assert ev.tag == "" and ev.webhook == "https://discord.test/x"
+    assert ev.url.endswith("/solo")
+
+
+@pytest.mark.parametrize("data", [
+    pytest.param("{not json", id="invalid-json"),
+    pytest.param({"events": []}, id="empty"),
+    pytest.param({"other": 1}, id="no-events-key"),
+    pytest.param({"events": {"slug": "wbc2026"}}, id="events-not-list"),
+    pytest.param({"events": ["wbc2026"]}, id="entry-not-object"),
+    pytest.param({"events": [{"title": "no slug"}]}, id="missing-slug"),
+])
+def test_malformed_config_raises_value_error(tmp_path, data):
+    with pytest.raises(ValueError):
+        load_events(_config(tmp_path, data))
+
+
+def test_duplicate_slug(tmp_path):
+    path = _config(tmp_path, {"events": [{"slug": "wbc2026"}, {"slug": "other"}, {"slug": "wbc2026"}]})
+    with pytest.raises(ValueError, match="같은 slug"):
+        load_events(path)
+
+
+def test_missing_file(tmp_path):
+    with pytest.raises(OSError):
+        load_events(tmp_path / "nope.json")
+
+
+def test_get_events_falls_back_to_default_event(monkeypatch, tmp_path):
+    monkeypatch.setattr(wbc_monitor, "EVENTS_FILE", "")
+    (ev,) = wbc_monitor.get_events()
+    assert ev is wbc_monitor.default_event() and ev.slug == DEFAULT_SLUG
+
+    monkeypatch.setattr(wbc_monitor, "EVENTS_FILE", _config(tmp_path, {"events": [{"slug": "a"}, {"slug": "b"}]}))
+    assert [ev.slug for ev in wbc_monitor.get_events()] == ["a", "b"]
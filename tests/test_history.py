@@ -0,0 +1,184 @@
+"""
+이력 저장소(wbc_history) 테스트: 체크포인트 + 로그 꼬리 재적용, 잘린 줄, 사라진 공연, 압축과 비정상 종료
+"""
+
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+import wbc_history
+from wbc_history import HistoryStore, iter_log
+from wbc_records import Concert
+
+
+def _c(cid, count, name=None):
+    return Concert(cid, "03/07", "19:00", name or f"c{cid}", count)
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return tmp_path / "state.json", tmp_path / "history.jsonl"
+
+
+def _store(paths, **kwargs):
+    return HistoryStore(*paths, **kwargs)
+
+
+def _state(store):
+    return {k: c.count for k, c in store.latest.items()}
+
+
+def test_update_reports_changes_and_new_supply(paths):
+    store = _store(paths)
+    changes = store.update([_c(1, 0), _c(2, 3)])
+    # 새 공연은 건수가 있을 때만 (0 → n) 으로 알림
+    assert [(o.count, n.count, n.key) for o, n in changes] == [(0, 3, 2)]
+    assert store.added == [1, 2]
+    changes = store.update([_c(1, 5), _c(2, 3)])
+    assert [(o.count, n.count) for o, n in changes] == [(0, 5)]
+    assert store.update([_c(1, 5), _c(2, 3)]) == []
+    assert store.added == [] and store.removed == []
+
+
+def test_reload_replays_log_tail_after_checkpoint(paths):
+    store = _store(paths, checkpoint_every=3)
+    for i in range(1, 6):
+        store.update([_c(1, i), _c(2, 10 * i)])
+    # update 마다 레코드 2개, 쌓인 레코드가 3개 이상이면 체크포인트 → 마지막 update 의 2개만 꼬리로 남음
+    assert store._pending == 2
+    reloaded = _store(paths, checkpoint_every=3)
+    assert _state(reloaded) == {1: 5, 2: 50}
+    assert reloaded._pending == 2
+    assert reloaded._log_offset < paths[1].stat().st_size
+
+
+def test_reload_without_checkpoint_replays_whole_log(paths):
+    store = _store(paths, checkpoint_every=1000)
+    store.update([_c(1, 2), _c(2, 0)])
+    store.update([_c(1, 4, name="renamed"), _c(2, 0)])
+    assert not paths[0].exists()
+    reloaded = _store(paths)
+    assert reloaded.get(1) == _c(1, 4, name="renamed")
+    assert _state(reloaded) == {1: 4, 2: 0}
+
+
+def test_truncated_last_line_is_ignored(paths):
+    store = _store(paths)
+    store.update([_c(1, 2)])
+    with open(paths[1], "a", encoding="utf-8") as f:
+        f.write('{"t": "2026-03-07T19:00:00", "id": 1, "cou')
+    assert _state(_store(paths)) == {1: 2}
+
+
+def test_removed_concert_is_logged_and_replayed(paths):
+    store = _store(paths)
+    store.update([_c(1, 2), _c(2, 1)])
+    store.update([_c(2, 1)])
+    assert store.removed == [1]
+    assert [r.get("count", "?") for r in iter_log(paths[1]) if r["id"] == 1] == [2, None]
+    assert _state(_store(paths)) == {2: 1}
+
+
+def test_checkpoint_longer_than_log_trusts_checkpoint(paths):
+    store = _store(paths, checkpoint_every=1)
+    store.update([_c(1, 2)])
+    paths[1].write_text("")
+    assert _state(_store(paths)) == {1: 2}
+
+
+def test_compact_drops_duplicates_and_old_records(paths):
+    store = _store(paths, retention_days=7)
+    old = datetime.now() - timedelta(days=30)
+    store.update([_c(1, 1), _c(2, 5)], now=old)
+    store.update([_c(1, 2), _c(2, 5)], now=old + timedelta(minutes=1))
+    store.update([_c(1, 3), _c(2, 5)])
+    store.compact()
+    recs = list(iter_log(paths[1]))
+    # 보관 기간이 지난 레코드는 공연별 마지막 상태 하나(기준 레코드)로 줄어듦
+    assert [(r["id"], r["count"]) for r in recs] == [(2, 5), (1, 2), (1, 3)]
+    assert wbc_history._read_gen(paths[1]) == 1
+    reloaded = _store(paths)
+    assert _state(reloaded) == {1: 3, 2: 5} and reloaded._log_gen == 1
+
+
+def test_compacted_log_alone_keeps_concert_info(paths):
+    store = _store(paths, retention_days=7)
+    old = datetime.now() - timedelta(days=30)
+    # 정보 필드는 처음 등장할 때만 기록됨 → 보관 기간 밖
+    store.update([_c(1, 1), _c(2, 5), _c(3, 2)], now=old)
+    store.update([_c(1, 2), _c(2, 5)], now=old + timedelta(minutes=1))
+    store.update([_c(1, 4, name="renamed"), _c(2, 5)], now=old + timedelta(minutes=2))
+    store.update([_c(1, 6, name="renamed"), _c(2, 5)])
+    store.compact()
+
+    # 체크포인트 없이 로그만으로 다시 만들어도 같은 상태
+    paths[0].unlink()
+    reloaded = _store(paths)
+    assert reloaded.get(1) == _c(1, 6, name="renamed")
+    assert reloaded.get(2) == _c(2, 5) and reloaded.get(3) is None
+    assert reloaded.latest == store.latest
+
+    from wbc_analytics import load_series
+
+    series = load_series(list(iter_log(paths[1])))
+    assert series.info[1]["name"] == "renamed" and series.info[2]["date"] == "03/07"
+    # 다시 압축해도 기준 레코드는 그대로
+    before = list(iter_log(paths[1]))
+    store.compact()
+    assert list(iter_log(paths[1])) == before
+
+
+def test_crash_between_compact_and_checkpoint(paths, monkeypatch):
+    store = _store(paths, checkpoint_every=1000, retention_days=7)
+    old = datetime.now() - timedelta(days=30)
+    for i in range(1, 11):
+        store.update([_c(1, i), _c(2, 1)], now=old)
+    store.checkpoint()
+    # 체크포인트 뒤 꼬리: 압축하면 앞쪽 오래된 레코드가 빠져 이 레코드들의 위치가 앞으로 당겨짐
+    store.update([_c(1, 10), _c(2, 7)])
+    store.update([_c(1, 11), _c(2, 7)])
+    before = paths[0].read_bytes()
+
+    # 압축한 로그로 교체한 직후(체크포인트 전) 종료
+    monkeypatch.setattr(HistoryStore, "checkpoint", lambda self: None)
+    store.compact()
+    monkeypatch.undo()
+    assert paths[0].read_bytes() == before
+    assert wbc_history._read_gen(paths[1]) == 1
+
+    reloaded = _store(paths, checkpoint_every=1000)
+    assert _state(reloaded) == {1: 11, 2: 7}
+    assert reloaded._log_gen == 1
+    # 이후 기록·체크포인트는 새 세대 기준
+    reloaded.update([_c(1, 12), _c(2, 7)])
+    reloaded.checkpoint()
+    again = _store(paths)
+    assert _state(again) == {1: 12, 2: 7} and again._pending == 0
+
+
+def test_crash_before_log_replace_keeps_old_pair(paths, monkeypatch):
+    store = _store(paths, checkpoint_every=2)
+    for i in range(1, 4):
+        store.update([_c(1, i)])
+
+    def crash(path, text):
+        if path == paths[1]:
+            raise OSError("disk full")
+
+    monkeypatch.setattr(HistoryStore, "_atomic_write", staticmethod(crash))
+    with pytest.raises(OSError):
+        store.compact()
+    monkeypatch.undo()
+    reloaded = _store(paths)
+    assert _state(reloaded) == {1: 3} and reloaded._log_gen == 0
+
+
+def test_compacted_log_keeps_appending(paths):
+    store = _store(paths, checkpoint_every=1000, compact_bytes=300)
+    for i in range(40):
+        store.update([_c(1, i % 3), _c(2, 1)])
+    assert store._log_gen >= 1
+    assert os.path.getsize(paths[1]) < 40 * 60
+    assert _state(_store(paths)) == _state(store)
+    assert sum(1 for r in iter_log(paths[1]) if "gen" in r) == 0
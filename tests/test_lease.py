@@ -0,0 +1,154 @@
+"""
+리더 임대(wbc_lease) 테스트: 획득·연장·만료 인계·반납, 파일 저장소 잠금, 인계 후 거짓 알림 없음
+"""
+
+import threading
+
+import pytest
+
+import wbc_lease
+import wbc_monitor
+import wbc_notify
+from wbc_lease import FileLeaseStore, LeaderElector, MemoryLeaseStore
+
+
+class Clock:
+    def __init__(self, t=1000.0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+
+def _pair(store, clock, ttl=60):
+    changes = []
+    a = LeaderElector(store, "a", ttl=ttl, clock=clock, on_change=lambda leader, rec: changes.append(("a", leader, rec["epoch"])))
+    b = LeaderElector(store, "b", ttl=ttl, clock=clock, on_change=lambda leader, rec: changes.append(("b", leader, rec["epoch"])))
+    return a, b, changes
+
+
+@pytest.fixture(params=["memory", "file"])
+def store(request, tmp_path):
+    if request.param == "file":
+        if wbc_lease.fcntl is None:
+            pytest.skip("fcntl 없음")
+        return FileLeaseStore(tmp_path / "lease.json")
+    return MemoryLeaseStore()
+
+
+def test_single_leader_takeover_and_release(store):
+    clock = Clock()
+    a, b, changes = _pair(store, clock)
+    assert a.ensure() and not b.ensure()
+    clock.t += 50
+    assert a.renew() and not b.ensure()  # 연장됐으므로 아직 a
+    clock.t += 100
+    # a 가 멈춤 → 만료 → b 가 가져감 (epoch 증가)
+    assert b.ensure() and not a.ensure()
+    assert not a.renew()
+    assert store.read()["holder"] == "b" and store.read()["epoch"] == 2
+    b.release()
+    assert a.ensure()
+    assert changes == [("a", True, 1), ("b", False, 1), ("b", True, 2), ("a", False, 2), ("a", True, 3)]
+
+
+def test_ensure_reports_only_transitions(store):
+    clock = Clock()
+    a, _, changes = _pair(store, clock)
+    for _ in range(5):
+        assert a.ensure()
+        clock.t += 10
+    assert changes == [("a", True, 1)]
+
+
+def test_file_store_serializes_concurrent_claims(tmp_path):
+    if wbc_lease.fcntl is None:
+        pytest.skip("fcntl 없음")
+    path = tmp_path / "lease.json"
+    electors = [LeaderElector(FileLeaseStore(path), f"r{i}", ttl=60) for i in range(8)]
+    barrier = threading.Barrier(len(electors))
+    results = {}
+
+    def claim(e):
+        barrier.wait()
+        results[e.holder] = e.ensure()
+
+    threads = [threading.Thread(target=claim, args=(e,)) for e in electors]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sum(results.values()) == 1
+    assert results[FileLeaseStore(path).read()["holder"]]
+
+
+def test_failover_resumes_from_persisted_state(mock_env):
+    env = mock_env({"steps": [{"request": 2, "set": {"1519": 3}}]})
+    # 두 복제본이 같은 상태·이력 파일을 봄
+    a_events, b_events = [env.event()], [env.event()]
+    clock = Clock()
+    store = MemoryLeaseStore()
+    a = LeaderElector(store, "a", ttl=60, clock=clock, on_change=lambda *_: wbc_monitor.reset_for_failover(a_events))
+    b = LeaderElector(store, "b", ttl=60, clock=clock, on_change=lambda *_: wbc_monitor.reset_for_failover(b_events))
+
+    def tick(elector, events):
+        if elector.ensure():
+            return wbc_monitor.run_once(events[0])
+        return None
+
+    # 대기 복제본이 미리 (빈) 상태를 읽어 둔 경우에도 인계 때 다시 읽어야 함
+    wbc_monitor.get_history(b_events[0])
+    assert tick(a, a_events) == 200  # 첫 조회: 새 공급 알림
+    assert tick(b, b_events) is None
+    assert tick(a, a_events) == 200  # 1519: 0 → 3
+    clock.t += 120  # a 정지 → 임대 만료
+    assert tick(b, b_events) == 200  # b 인계: 같은 페이지, 알림 없어야 함
+    assert tick(a, a_events) is None
+    env.notifier.stop()
+
+    received = [[c["concert_id"] for c in r["changes"]] for r in env.received]
+    assert received == [[1526, 1515, 1516], [1519]]
+    assert b_events[0].history.get(1519).count == 3
+
+
+def test_lease_store_is_abstract():
+    with pytest.raises(TypeError):
+        wbc_lease.LeaseStore()
+
+
+def test_store_error_counts_as_standby(capsys):
+    class BrokenStore(MemoryLeaseStore):
+        def update(self, fn):
+            raise OSError("stale NFS handle")
+
+    assert wbc_monitor.check_lease(None)
+    assert not wbc_monitor.check_lease(LeaderElector(BrokenStore(), "a", ttl=60))
+    assert "임대 확인 실패" in capsys.readouterr().out
+
+
+def test_losing_lease_cancels_queued_outbox_deliveries(tmp_path, monkeypatch):
+    from wbc_events import Event
+    from wbc_notify import Notifier
+    from wbc_outbox import Outbox
+    from wbc_records import Concert
+
+    sent = []
+    monkeypatch.setattr(wbc_notify, "deliver", lambda webhook, payload, **kw: sent.append(payload) or True)
+    notifier = Notifier(lambda changes, counts, ctx: {"content": "x"}, window=0)
+    monkeypatch.setattr(wbc_monitor, "_notifier", notifier)
+    event = Event("wbc2026", state_file=tmp_path / "state.json", history_file=tmp_path / "history.jsonl")
+    event.outbox = box = Outbox(event.outbox_file)
+    change = (Concert(1, "03/07", "19:00", "c1", 0), Concert(1, "03/07", "19:00", "c1", 3))
+    entry = box.add([change], [change[1]])
+    (hook,) = box.begin(entry, ["https://discord.test/api/webhooks/1/abc"])
+    # 알림 스레드가 꺼내기 전에 임대를 잃음
+    notifier.submit(hook, [change], [change[1]], None, on_done=box.callback(entry, hook))
+    size = event.outbox_file.stat().st_size
+    wbc_monitor.reset_for_failover([event])
+    notifier.start().stop()
+
+    assert sent == [] and notifier.cancelled == 1
+    assert event.outbox is None and box.closed
+    assert event.outbox_file.stat().st_size == size
+    # 파일에는 미전송으로 남아 다음 리더가 보냄
+    assert [e.seq for e in Outbox(event.outbox_file).due()] == [entry.seq]
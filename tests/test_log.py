@@ -0,0 +1,83 @@
+"""
+구조화 로그(wbc_log) 테스트: JSON 줄 형식, cycle id, 단계별 시간(중첩 제외), 추적 끄기
+"""
+
+import json
+import time
+
+import pytest
+
+import wbc_log
+import wbc_monitor
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    path = tmp_path / "wbc.log"
+    wbc_log.setup(path, level="DEBUG", trace=True, slow_ms=50)
+    yield path
+    wbc_log.shutdown()
+    wbc_log.set_tracing(False)
+
+
+def _records(path) -> list[dict]:
+    wbc_log.shutdown()  # 리스너가 큐를 모두 비운 뒤 읽기
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_cycle_summary_with_exclusive_stages(log_file):
+    cycle = wbc_log.start_cycle("wbc2026")
+    with wbc_log.stage("diff"):
+        time.sleep(0.02)
+        with wbc_log.stage("persist"):
+            time.sleep(0.03)
+    wbc_log.annotate(outcome="changed", changes=2)
+    wbc_log.log("changes", changes=[[1519, 0, 2]])
+    wbc_log.end_cycle(cycle, status=200)
+    wbc_log.log("outside")
+
+    records = _records(log_file)
+    stages = [r for r in records if r["msg"] == "stage"]
+    assert [s["stage"] for s in stages] == ["persist", "diff"]
+    summary = next(r for r in records if r["msg"] == "cycle")
+    assert summary["cycle"] == cycle.id and summary["event"] == "wbc2026"
+    assert summary["status"] == 200 and summary["outcome"] == "changed" and summary["changes"] == 2
+    # 바깥 단계(diff)는 안쪽(persist) 시간을 뺀 값
+    assert 15 <= summary["stages"]["diff"] < 30 <= summary["stages"]["persist"]
+    assert summary["ms"] >= 50 and summary["slow"] and summary["level"] == "warning"
+    assert next(r for r in records if r["msg"] == "changes")["cycle"] == cycle.id
+    assert "cycle" not in next(r for r in records if r["msg"] == "outside")
+
+
+def test_tracing_off_is_a_shared_noop(log_file):
+    wbc_log.set_tracing(False)
+    cycle = wbc_log.start_cycle("wbc2026")
+    assert wbc_log.stage("decode") is wbc_log.stage("fetch")
+    with wbc_log.stage("decode"):
+        pass
+    wbc_log.end_cycle(cycle)
+    summary = next(r for r in _records(log_file) if r["msg"] == "cycle")
+    assert "stages" not in summary
+
+
+def test_disabled_logging_does_nothing():
+    assert not wbc_log.enabled()
+    assert wbc_log.start_cycle("wbc2026") is None
+    wbc_log.log("ignored")
+    wbc_log.end_cycle(None)
+
+
+def test_run_once_traces_every_stage(log_file, mock_env):
+    env = mock_env({"steps": [{"request": 2, "set": {"1519": 2}}]})
+    event = env.event()
+    for _ in range(3):
+        wbc_monitor.run_once(event)
+    env.notifier.stop()
+
+    records = _records(log_file)
+    cycles = [r for r in records if r["msg"] == "cycle"]
+    assert [c["outcome"] for c in cycles] == ["changed", "changed", "not_modified"]
+    assert len({c["cycle"] for c in cycles}) == 3
+    assert {"fetch", "scan", "unescape", "decode", "build", "diff", "persist", "notify"} <= set(cycles[1]["stages"])
+    assert set(cycles[2]["stages"]) == {"fetch"}
+    assert any(r["msg"] == "deliver" and r["ok"] for r in records)
@@ -0,0 +1,59 @@
+"""
+대역 서버(bench/mock_server)로 모니터 종단 경로 확인
+페이지 조회 → 파싱 → 비교 → 알림 스레드 → 웹훅 도착까지 실제 HTTP 로 한 번 흘려보낸다.
+"""
+
+import json
+
+import pytest
+
+import wbc_monitor
+from bench.mock_server import WebhookSink
+
+
+@pytest.fixture
+def mock(mock_env):
+    env = mock_env({"steps": [
+        {"request": 2, "set": {"1519": 3}},
+        {"request": 3, "status": 429, "retry_after": 7},
+        {"request": 5, "set": {"1526": 0}},
+    ]})
+    event = env.event(title="WBC MOCK", target_ids={1519, 1520})
+    return env.server, env.notifier, event
+
+
+def test_end_to_end_detection_and_notification(mock):
+    server, notifier, event = mock
+    # 1: 첫 조회(이미 매물이 있는 공연 3건을 새 공급으로 알림), 2: 1519 변경, 3: 스크립트 429
+    assert [wbc_monitor.run_once(event) for _ in range(3)] == [200, 200, 429]
+    assert event.retry_after == 7
+    # 4: ETag 같음 → 304, 5: 1526 변경
+    assert [wbc_monitor.run_once(event) for _ in range(2)] == [304, 200]
+    notifier.stop()
+
+    received = server.sink.received
+    assert [[c["concert_id"] for c in r["changes"]] for r in received] == [[1526, 1515, 1516], [1519], [1526]]
+    mention = received[1]["payload"]
+    assert mention["content"] == "@everyone"
+    assert "0件 → **3件**" in mention["embeds"][0]["description"]
+    assert received[2]["payload"]["content"] is None
+
+    stats = server.stats()
+    assert stats["changes_made"] == 2
+    assert stats["changes_pending"] == 0
+    assert stats["latency_sec"]["count"] == 2
+    assert stats["page_responses"] == {"200": 3, "304": 1, "429": 1}
+
+
+def test_webhook_sink_rate_limit_and_limits():
+    sink = WebhookSink(bucket_limit=2, bucket_window=60)
+    ok = json.dumps({"embeds": [{"title": "t", "description": "d"}]}).encode()
+    assert sink.handle("/api/webhooks/1/x", ok)[0] == 204
+    status, headers, _ = sink.handle("/api/webhooks/1/x", ok)
+    assert status == 204 and headers["X-RateLimit-Remaining"] == "0"
+    status, headers, body = sink.handle("/api/webhooks/1/x", ok)
+    assert status == 429 and json.loads(body)["retry_after"] > 0
+    # 버킷은 웹훅별
+    too_big = json.dumps({"embeds": [{"description": "x" * 5000}]}).encode()
+    assert sink.handle("/api/webhooks/2/y", too_big)[0] == 400
+    assert len(sink.received) == 2
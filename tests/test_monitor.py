@@ -0,0 +1,143 @@
+"""
+run_once 주기 테스트 (네트워크 없음): 페이지는 고정 데이터(bench/fixtures)를 렌더링해 fetch_page 대신 돌려준다.
+공연별 게이지 정리, 304 / 같은 data-page 해시 단축 경로
+"""
+
+import copy
+
+import pytest
+
+import wbc_monitor
+import wbc_transport
+from bench.mock_server import MockSite, load_fixture
+from bench.synth import render_page
+from wbc_events import Event
+
+
+class Site:
+    """fetch_page 대역: data-page dict 를 고쳐 가며 그대로 렌더링"""
+
+    def __init__(self):
+        self.data = copy.deepcopy(load_fixture())
+        self.concerts = self.data["props"]["concerts"]
+
+    def __call__(self, event):
+        return 200, render_page(self.data)
+
+    def pop(self, concert_id) -> dict:
+        (i,) = [i for i, c in enumerate(self.concerts) if c["id"] == concert_id]
+        return self.concerts.pop(i)
+
+
+@pytest.fixture
+def site(monkeypatch):
+    site = Site()
+    monkeypatch.setattr(wbc_monitor, "fetch_page", site)
+    return site
+
+
+@pytest.fixture
+def event(tmp_path):
+    # 웹훅이 없으면 알림은 경고만 남기고 아웃박스에서 바로 완료 처리됨
+    return Event("wbc-test", state_file=tmp_path / "state.json", history_file=tmp_path / "history.jsonl")
+
+
+def _gauge_ids(slug) -> set[str]:
+    lines = wbc_monitor.CONCERT_LISTINGS.render()
+    return {line.split('concert_id="')[1].split('"')[0] for line in lines if f'event="{slug}"' in line}
+
+
+def test_concert_gauges_follow_page_membership(site, event):
+    wbc_monitor.run_once(event)
+    all_ids = {str(c["id"]) for c in site.concerts}
+    assert _gauge_ids(event.slug) == all_ids
+
+    gone = site.pop(1519)
+    wbc_monitor.run_once(event)
+    assert event.history.removed == [1519]
+    assert _gauge_ids(event.slug) == all_ids - {"1519"}
+
+    # 건수 0 으로 돌아와도 (알림 대상 변경이 아니어도) 게이지는 다시 생김
+    gone["listings_count"] = 0
+    site.concerts.append(gone)
+    wbc_monitor.run_once(event)
+    assert event.history.added == [1519] and event.history.removed == []
+    assert _gauge_ids(event.slug) == all_ids
+    assert wbc_monitor.CONCERT_LISTINGS.get(event=event.slug, concert_id=1519) == 0
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers, body: bytes):
+        self.status_code = status_code
+        self.headers = headers
+        self.text = body.decode("utf-8")
+
+    def raise_for_status(self):
+        assert self.status_code < 400
+
+
+@pytest.fixture
+def mock_site(monkeypatch, tmp_path):
+    """transport.get 을 MockSite 로 연결 (조건부 GET 헤더 그대로 전달). 요청 헤더를 기록"""
+    site = MockSite(load_fixture())
+    requests = []
+
+    def get(url, headers=None, **kwargs):
+        requests.append(dict(headers or {}))
+        status, resp_headers, body, _ = site.handle((headers or {}).get("If-None-Match"))
+        return FakeResponse(status, resp_headers, body)
+
+    monkeypatch.setattr(wbc_transport, "get", get)
+    monkeypatch.setattr(wbc_monitor, "SNAPSHOT_DIR", tmp_path / "snapshots")
+    monkeypatch.setattr(wbc_monitor, "_snapshots", None)
+    yield site, requests
+    if wbc_monitor._snapshots is not None:
+        wbc_monitor._snapshots.stop()
+
+
+def test_not_modified_skips_parse_and_diff(mock_site, event, monkeypatch):
+    site, requests = mock_site
+    assert wbc_monitor.run_once(event) == 200
+    assert event.validators == {"If-None-Match": '"v0"'}
+
+    with monkeypatch.context() as m:
+        m.setattr(wbc_monitor, "_parse_if_changed", lambda *a: pytest.fail("304 인데 파싱함"))
+        assert wbc_monitor.run_once(event) == 304
+    assert requests[-1]["If-None-Match"] == '"v0"'
+    assert event.stats["not_modified"] == 1
+    assert wbc_monitor.SHORT_CIRCUITS.get(event=event.slug, reason="not_modified") >= 1
+
+    site.set_count(1519, 7)
+    assert wbc_monitor.run_once(event) == 200
+    assert event.history.get(1519).count == 7 and event.validators["If-None-Match"] == '"v1"'
+
+
+def test_unchanged_page_hash_skips_decode(mock_site, event, monkeypatch):
+    site, _ = mock_site
+    site.etag = False
+    wbc_monitor.run_once(event)
+    assert event.validators == {} and event.last_page_hash is not None
+
+    with monkeypatch.context() as m:
+        m.setattr(wbc_monitor, "decode_concerts", lambda raw: pytest.fail("같은 원문을 다시 디코딩함"))
+        assert wbc_monitor.run_once(event) == 200
+    assert event.stats["unchanged_hash"] == 1
+
+    site.set_count(1519, 7)
+    wbc_monitor.run_once(event)
+    assert event.stats["unchanged_hash"] == 1 and event.history.get(1519).count == 7
+
+
+def test_parse_failure_drops_validators(mock_site, event, monkeypatch):
+    site, requests = mock_site
+    wbc_monitor.run_once(event)
+    assert event.validators
+    # 깨진 응답의 검증값으로 304 를 받으면 고쳐진 페이지를 계속 건너뛰므로 버려야 함
+    site.set_count(1519, 7)
+    with monkeypatch.context() as m:
+        m.setattr(wbc_monitor, "decode_concerts", lambda raw: (None, "깨짐"))
+        assert wbc_monitor.run_once(event) == 200
+    assert event.validators == {}
+    wbc_monitor.run_once(event)
+    assert "If-None-Match" not in requests[-1]
+    assert event.history.get(1519).count == 7
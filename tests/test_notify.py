@@ -0,0 +1,184 @@
+"""
+Discord 전송 테스트 (가짜 웹훅)
+transport.post 를 요청을 기록하는 가짜로 바꿔 네트워크 없이
+payload 분할, 429/버킷 헤더 처리, 재시도, send_discord → 알림 스레드 경로를 확인한다.
+"""
+
+import random
+
+import pytest
+
+import wbc_monitor
+import wbc_notify
+import wbc_transport
+from wbc_events import Event
+from wbc_notify import EMBED_DESCRIPTION_MAX, EMBEDS_PER_MESSAGE, MESSAGE_EMBED_CHARS, Notifier
+from wbc_records import Concert
+
+WEBHOOK = "https://discord.test/api/webhooks/1/abc"
+
+
+class FakeResponse:
+    def __init__(self, status_code=204, headers=None, body=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self._body = body
+        self.text = "" if body is None else str(body)
+
+    def json(self):
+        if self._body is None:
+            raise ValueError("no body")
+        return self._body
+
+
+class FakeWebhook:
+    """보낸 payload 를 기록하고, 미리 넣어 둔 응답을 순서대로 돌려주는 웹훅"""
+
+    def __init__(self, responses=()):
+        self.responses = list(responses)
+        self.posts: list[dict] = []
+
+    def __call__(self, url, kind="discord", json=None, **kwargs):
+        assert url == WEBHOOK
+        self.posts.append(json)
+        return self.responses.pop(0) if self.responses else FakeResponse()
+
+
+@pytest.fixture
+def webhook(monkeypatch):
+    hook = FakeWebhook()
+    monkeypatch.setattr(wbc_transport, "post", hook)
+    monkeypatch.setattr(wbc_notify, "_buckets", {})
+    return hook
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    # 재시도 대기는 실제로 자지 않고 요청한 시간만 기록
+    calls = []
+    monkeypatch.setattr(wbc_notify.time, "sleep", calls.append)
+    return calls
+
+
+def _big_payload(rng: random.Random, n_lines: int, line_len: int = 60) -> dict:
+    lines = ["• " + "x" * rng.randint(1, line_len) for _ in range(n_lines)]
+    return {
+        "content": "@everyone",
+        "allowed_mentions": {"parse": ["everyone"]},
+        "embeds": [{"title": "WBC 2026 티켓 매수 건수 변경", "description": "\n".join(lines), "color": 0x00AA00}],
+    }
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_split_payload_respects_discord_limits(seed):
+    rng = random.Random(seed)
+    payload = _big_payload(rng, rng.randint(1, 1500), rng.choice((60, 500, 5000)))
+    messages = wbc_notify.split_payload(payload)
+    for i, msg in enumerate(messages):
+        assert 1 <= len(msg["embeds"]) <= EMBEDS_PER_MESSAGE
+        assert sum(wbc_notify._embed_chars(e) for e in msg["embeds"]) <= MESSAGE_EMBED_CHARS
+        assert all(len(e["description"]) <= EMBED_DESCRIPTION_MAX for e in msg["embeds"])
+        # 멘션은 첫 메시지에만
+        assert ("content" in msg) is (i == 0)
+        assert ("allowed_mentions" in msg) is (i == 0)
+    # 잘라내지 않고 나누기만 함 (줄 경계에서 나뉜 조각을 다시 이으면 원문)
+    parts = [e["description"] for m in messages for e in m["embeds"]]
+    assert "".join(parts).replace("\n", "") == payload["embeds"][0]["description"].replace("\n", "")
+
+
+def test_deliver_posts_every_part(webhook, sleeps):
+    payload = _big_payload(random.Random(1), 800)
+    assert wbc_notify.deliver(WEBHOOK, payload)
+    assert webhook.posts == wbc_notify.split_payload(payload)
+    assert len(webhook.posts) > 1
+    assert sleeps == []
+
+
+def test_deliver_honours_429_retry_after(webhook, sleeps, monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(wbc_notify.time, "monotonic", lambda: clock[0])
+    webhook.responses = [FakeResponse(429, {"Retry-After": "9"}, {"retry_after": 1.5}), FakeResponse(204)]
+    assert wbc_notify.deliver(WEBHOOK, {"embeds": [{"title": "t", "description": "d"}]})
+    assert len(webhook.posts) == 2
+    # 본문 retry_after 가 헤더보다 우선, 429 는 지수 백오프를 더하지 않음
+    assert sleeps == [1.5]
+
+
+def test_deliver_waits_for_exhausted_bucket(webhook, sleeps, monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(wbc_notify.time, "monotonic", lambda: clock[0])
+    webhook.responses = [FakeResponse(204, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset-After": "2.5"})]
+    assert wbc_notify.deliver(WEBHOOK, _big_payload(random.Random(2), 800))
+    # 첫 메시지 뒤 버킷이 비었으므로 두 번째 메시지 전에 Reset-After 만큼 대기
+    assert sleeps[0] == 2.5
+
+
+def test_deliver_does_not_retry_other_4xx(webhook, sleeps):
+    webhook.responses = [FakeResponse(400, body={"message": "Invalid Form Body"})]
+    assert not wbc_notify.deliver(WEBHOOK, {"embeds": [{"title": "t", "description": "d"}]})
+    assert len(webhook.posts) == 1
+
+
+def test_deliver_backs_off_on_5xx(webhook, sleeps):
+    webhook.responses = [FakeResponse(502)] * 10
+    assert not wbc_notify.deliver(WEBHOOK, {"embeds": [{"title": "t", "description": "d"}]}, max_attempts=4)
+    assert len(webhook.posts) == 4
+    assert sleeps == [1.0, 2.0, 4.0]
+
+
+def test_deliver_with_progress_stops_at_first_failure(webhook, sleeps):
+    payload = _big_payload(random.Random(1), 800)
+    messages = wbc_notify.split_payload(payload)
+    assert len(messages) > 2
+    webhook.responses = [FakeResponse(204), FakeResponse(400)]
+    progress = []
+    assert not wbc_notify.deliver(WEBHOOK, payload, on_part=progress.append)
+    assert progress == [1] and webhook.posts == messages[:2]
+
+    # 이어 보내기: 보낸 메시지는 건너뜀
+    assert wbc_notify.deliver(WEBHOOK, payload, start=1, on_part=progress.append)
+    assert webhook.posts[2:] == messages[1:]
+    assert progress == list(range(1, len(messages) + 1))
+
+
+def test_outbox_split_payload_resumes_from_failed_part(webhook, sleeps, tmp_path):
+    from wbc_outbox import Outbox
+
+    payload = _big_payload(random.Random(1), 800)
+    messages = wbc_notify.split_payload(payload)
+    change = (Concert(1, "03/07", "19:00", "c1", 0), Concert(1, "03/07", "19:00", "c1", 3))
+    notifier = Notifier(lambda changes, counts, ctx: payload, window=0)
+    box = Outbox(tmp_path / "outbox.jsonl")
+    entry = box.add([change], [])
+    box.begin(entry, [WEBHOOK])
+    webhook.responses = [FakeResponse(204), FakeResponse(400)]
+    notifier._flush([(WEBHOOK, [change], [], None, box.callback(entry, WEBHOOK))])
+    assert len(webhook.posts) == 2 and entry.attempts == 1
+
+    # 재시작 후 재시도: 두 번째 메시지부터
+    reloaded = Outbox(tmp_path / "outbox.jsonl")
+    again = reloaded.pending[entry.seq]
+    assert reloaded.begin(again, [WEBHOOK]) == [WEBHOOK]
+    notifier._flush([(WEBHOOK, [change], [], None, reloaded.callback(again, WEBHOOK))])
+    assert webhook.posts[2:] == messages[1:]
+    assert len(reloaded) == 0 and len(Outbox(tmp_path / "outbox.jsonl")) == 0
+
+
+def test_send_discord_through_notifier(webhook, monkeypatch):
+    notifier = Notifier(wbc_monitor._build_target_payload, window=0.05).start()
+    monkeypatch.setattr(wbc_monitor, "_notifier", notifier)
+    event = Event("wbc-test", title="WBC TEST", target_ids={1519}, webhook=WEBHOOK)
+    s0 = [Concert(1519, "03/05", "19:00", "韓国 vs 日本", 0), Concert(1530, "03/06", "12:00", "", 4)]
+    s1 = [s0[0].with_count(2), s0[1]]
+    s2 = [s0[0].with_count(3), s0[1].with_count(1)]
+    # 창(window) 안의 두 변경은 한 메시지로 합쳐짐 (처음 old, 마지막 new)
+    wbc_monitor.send_discord(wbc_monitor.detect_changes(s0, s1), s1, event)
+    wbc_monitor.send_discord(wbc_monitor.detect_changes(s1, s2), s2, event)
+    notifier.stop()
+    assert notifier.sent == 1
+    assert len(webhook.posts) == 1
+    msg = webhook.posts[0]
+    assert msg["content"] == "@everyone"
+    body = msg["embeds"][0]["description"]
+    assert "0件 → **3件**" in body
+    assert "4件 → **1件**" in body
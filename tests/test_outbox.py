@@ -0,0 +1,244 @@
+"""
+알림 아웃박스(wbc_outbox) 테스트: 상태 저장 전후 비정상 종료, 웹훅 장애 재시도, 웹훅별 ack, 압축
+페이지는 대역 서버의 MockSite 를 직접 부르고(네트워크 없음), 전송은 가짜 deliver 로 기록한다.
+"""
+
+import pytest
+
+import wbc_monitor
+import wbc_notify
+import wbc_outbox
+from bench.mock_server import MockSite, load_fixture
+from wbc_events import Event
+from wbc_history import HistoryStore
+from wbc_notify import Notifier
+from wbc_outbox import Outbox
+from wbc_records import Concert
+
+HOOK = "https://discord.test/api/webhooks/1/abc"
+
+
+class Clock:
+    def __init__(self, t=1000.0):
+        self.t = t
+
+    def __call__(self):
+        return self.t
+
+
+def _c(cid, count):
+    return Concert(cid, "03/07", "19:00", f"c{cid}", count)
+
+
+class Deliveries:
+    """가짜 deliver: 성공한 payload 를 기록. fail 이 참이면 실패 반환"""
+
+    def __init__(self):
+        self.sent: list[dict] = []
+        self.fail = False
+
+    def __call__(self, webhook, payload, start=0, on_part=None):
+        if self.fail:
+            return False
+        self.sent.append(payload)
+        return True
+
+
+@pytest.fixture
+def monitor(tmp_path, monkeypatch):
+    """run_once 를 MockSite 에 직접 연결하고, 재시작할 때마다 새 Event·알림 스레드를 만드는 환경"""
+    site = MockSite(load_fixture(), etag=False)
+    deliveries = Deliveries()
+    sent_changes = []
+
+    def build(changes, new_counts, target):
+        sent_changes.append([(n.key, o.count, n.count) for o, n in changes])
+        return {"content": None, "embeds": [{"description": "x"}]}
+
+    monkeypatch.setattr(wbc_notify, "deliver", deliveries)
+    monkeypatch.setattr(wbc_monitor, "fetch_page", lambda ev: (200, site.handle(None)[2].decode("utf-8")))
+    monkeypatch.setattr(wbc_monitor, "_notifier", None)
+
+    def restart():
+        if wbc_monitor._notifier is not None:
+            wbc_monitor._notifier.stop()
+        wbc_monitor._notifier = Notifier(build, window=0).start()
+        return Event("wbc2026", webhook=HOOK, state_file=tmp_path / "state.json", history_file=tmp_path / "history.jsonl")
+
+    yield site, deliveries, sent_changes, restart
+    if wbc_monitor._notifier is not None:
+        wbc_monitor._notifier.stop()
+
+
+def _settle():
+    wbc_monitor._notifier.stop()
+    wbc_monitor._notifier.start()
+
+
+def test_crash_after_state_save_redelivers_once(monitor, monkeypatch):
+    site, deliveries, sent, restart = monitor
+    event = restart()
+    wbc_monitor.run_once(event)
+    _settle()
+    assert len(sent) == 1  # 첫 조회: 새 공급
+
+    # 상태는 저장됐지만 알림 스레드가 보내기 전에 죽음
+    site.set_count(1519, 3)
+    monkeypatch.setattr(Notifier, "submit", lambda *a, **k: None)
+    wbc_monitor.run_once(event)
+    monkeypatch.undo()
+    monkeypatch.setattr(wbc_notify, "deliver", deliveries)
+    monkeypatch.setattr(wbc_monitor, "fetch_page", lambda ev: (200, site.handle(None)[2].decode("utf-8")))
+
+    event = restart()
+    wbc_monitor.run_once(event)  # 페이지는 그대로 → 새 변경 없음, 아웃박스의 미전송 알림만 보냄
+    wbc_monitor.run_once(event)
+    _settle()
+    assert sent[1:] == [[(1519, 0, 3)]]
+    assert len(event.outbox) == 0
+
+
+def test_crash_before_state_save_does_not_duplicate(monitor, monkeypatch):
+    site, deliveries, sent, restart = monitor
+    event = restart()
+    wbc_monitor.run_once(event)
+    _settle()
+
+    # 아웃박스에는 기록했지만 이력 로그를 쓰기 전에 죽음
+    site.set_count(1519, 3)
+
+    def crash(self, lines):
+        raise OSError("disk gone")
+
+    monkeypatch.setattr(HistoryStore, "_append", crash)
+    monkeypatch.setattr(Notifier, "submit", lambda *a, **k: None)
+    with pytest.raises(OSError):
+        wbc_monitor.run_once(event)
+    monkeypatch.undo()
+    monkeypatch.setattr(wbc_notify, "deliver", deliveries)
+    monkeypatch.setattr(wbc_monitor, "fetch_page", lambda ev: (200, site.handle(None)[2].decode("utf-8")))
+
+    event = restart()
+    wbc_monitor.run_once(event)  # 같은 변경을 다시 감지 → 아웃박스가 이미 가진 키라 넣지 않음
+    _settle()
+    assert sent[1:] == [[(1519, 0, 3)]]
+    assert event.outbox.duplicates == 1
+    assert event.history.get(1519).count == 3
+
+
+def test_webhook_outage_retries_with_backoff(monitor, monkeypatch):
+    site, deliveries, sent, restart = monitor
+    clock = Clock()
+    event = restart()
+    event.outbox = Outbox(event.outbox_file, clock=clock)
+    deliveries.fail = True
+    wbc_monitor.run_once(event)
+    _settle()
+    entry = next(iter(event.outbox.pending.values()))
+    assert entry.attempts == 1 and entry.retry_at == clock.t + wbc_outbox.RETRY_BASE_SEC
+
+    wbc_monitor.run_once(event)  # 아직 재시도 시각 전
+    _settle()
+    assert entry.attempts == 1
+    deliveries.fail = False
+    clock.t += wbc_outbox.RETRY_BASE_SEC
+    wbc_monitor.run_once(event)
+    _settle()
+    assert len(sent) == 2 and len(deliveries.sent) == 1 and len(event.outbox) == 0
+
+
+def test_outage_backlog_is_coalesced_into_one_message(monitor):
+    site, deliveries, sent, restart = monitor
+    clock = Clock()
+    event = restart()
+    event.outbox = Outbox(event.outbox_file, clock=clock)
+    deliveries.fail = True
+    wbc_monitor.run_once(event)
+    for n in (3, 4, 5):
+        site.set_count(1519, n)
+        wbc_monitor.run_once(event)
+    _settle()
+    assert len(event.outbox) == 4 and deliveries.sent == []
+
+    # 장애가 끝난 뒤 밀린 항목들은 묶기 창 안에서 한 메시지로 합쳐짐
+    deliveries.fail = False
+    clock.t += wbc_outbox.RETRY_BASE_SEC
+    wbc_monitor._notifier.window = 0.2
+    wbc_monitor.run_once(event)
+    _settle()
+    assert len(deliveries.sent) == 1 and len(event.outbox) == 0
+    assert sent[-1] == sent[0] + [(1519, 0, 5)]  # 처음 old, 마지막 new
+
+
+def test_outbox_dedup_keeps_real_repeats(tmp_path):
+    box = Outbox(tmp_path / "outbox.jsonl")
+    assert box.add([(_c(1, 0), _c(1, 3))], []) is not None
+    assert box.add([(_c(1, 0), _c(1, 3))], []) is None  # 같은 변경 재감지
+    assert box.add([(_c(1, 3), _c(1, 0))], []) is not None
+    assert box.add([(_c(1, 0), _c(1, 3)), (_c(2, 0), _c(2, 1))], []) is not None
+    assert [len(e.changes) for e in box.pending.values()] == [1, 1, 2]
+    reloaded = Outbox(tmp_path / "outbox.jsonl")
+    assert [e.seq for e in reloaded.pending.values()] == [1, 2, 3]
+    assert reloaded.add([(_c(2, 0), _c(2, 1))], []) is None
+
+
+def test_partial_ack_resends_only_failed_webhook(tmp_path):
+    box = Outbox(tmp_path / "outbox.jsonl")
+    entry = box.add([(_c(1, 0), _c(1, 3))], [_c(1, 3)])
+    assert box.begin(entry, ["hook-a", "hook-b"]) == ["hook-a", "hook-b"]
+    box.delivered(entry, "hook-a", True)
+    box.delivered(entry, "hook-b", False)
+    assert entry.attempts == 1
+
+    reloaded = Outbox(tmp_path / "outbox.jsonl")
+    again = reloaded.pending[entry.seq]
+    assert reloaded.begin(again, ["hook-a", "hook-b"]) == ["hook-b"]
+    reloaded.delivered(again, "hook-b", True)
+    assert len(reloaded) == 0 and len(Outbox(tmp_path / "outbox.jsonl")) == 0
+    assert "hook-a" not in (tmp_path / "outbox.jsonl").read_text()  # 웹훅 URL 대신 해시만 기록
+
+
+def test_old_entries_are_dropped(tmp_path):
+    clock = Clock()
+    box = Outbox(tmp_path / "outbox.jsonl", max_age_sec=3600, clock=clock)
+    box.add([(_c(1, 0), _c(1, 3))], [])
+    clock.t += 3601
+    assert box.due() == [] and box.dropped == 1
+    assert len(Outbox(tmp_path / "outbox.jsonl")) == 0
+
+
+def test_compaction_bounds_file_and_keeps_state(tmp_path):
+    path = tmp_path / "outbox.jsonl"
+    box = Outbox(path, compact_bytes=4096)
+    stuck = box.add([(_c(99, 0), _c(99, 5))], [_c(99, 5)])
+    box.begin(stuck, ["hook"])
+    for i in range(1, 500):
+        entry = box.add([(_c(1, i - 1), _c(1, i))], [_c(1, i)])
+        box.begin(entry, ["hook"])
+        box.delivered(entry, "hook", True)
+        assert path.stat().st_size < 8192
+    reloaded = Outbox(path)
+    assert list(reloaded.pending) == [stuck.seq]
+    assert reloaded.add([(_c(1, 498), _c(1, 499))], []) is None
+    assert reloaded.add([(_c(1, 499), _c(1, 500))], []).seq == 501
+
+
+def test_concert_that_leaves_and_returns_is_notified_again(tmp_path):
+    box = Outbox(tmp_path / "outbox.jsonl")
+    store = HistoryStore(tmp_path / "state.json", tmp_path / "history.jsonl")
+
+    def journal(changes, removed):
+        box.add(changes, [], removed)
+
+    store.update([_c(1, 0), _c(2, 1)], journal=journal)
+    store.update([_c(1, 3), _c(2, 1)], journal=journal)
+    store.update([_c(2, 1)], journal=journal)  # 1 이 페이지에서 사라짐
+    assert "1" not in box.last and "1" not in Outbox(tmp_path / "outbox.jsonl").last
+    changes = store.update([_c(1, 3), _c(2, 1)], journal=journal)  # 같은 건수로 돌아옴
+    assert [(o.count, n.count) for o, n in changes] == [(0, 3)]
+    assert [[(n.key, o.count, n.count) for o, n in e.changes] for e in box.pending.values()] == [
+        [(2, 0, 1)], [(1, 0, 3)], [(1, 0, 3)],
+    ]
+    assert box.duplicates == 0
+    # 상태 저장 전에 죽어 같은 변경을 다시 감지하면 여전히 한 번만
+    assert box.add(changes, []) is None
@@ -0,0 +1,116 @@
+"""
+parse_counts 골든 파일 테스트
+html/wbc_last.html(실제 페이지 캡처)의 파싱 결과를 tests/golden/wbc_last.json 과 비교한다.
+파서를 의도적으로 바꿨다면 WBC_UPDATE_GOLDEN=1 로 실행해 골든 파일을 다시 만든다.
+"""
+
+import html
+import json
+import os
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+import wbc_extract
+import wbc_monitor
+from wbc_records import Concert
+
+ROOT = Path(__file__).resolve().parent.parent
+PAGE = ROOT / "html" / "wbc_last.html"
+GOLDEN = Path(__file__).resolve().parent / "golden" / "wbc_last.json"
+
+
+@pytest.fixture(scope="module")
+def page() -> str:
+    return PAGE.read_text(encoding="utf-8")
+
+
+def _golden(counts: list[Concert]) -> list[Concert]:
+    if os.environ.get("WBC_UPDATE_GOLDEN"):
+        GOLDEN.write_text(
+            json.dumps([c.to_dict() for c in counts], ensure_ascii=False, indent=2) + "\n", encoding="utf-8"
+        )
+    return [Concert.from_dict(d) for d in json.loads(GOLDEN.read_text(encoding="utf-8"))]
+
+
+def test_parse_counts_matches_golden(page):
+    counts, debug_msg = wbc_monitor.parse_counts(page)
+    assert debug_msg == ""
+    assert counts == _golden(counts)
+
+
+def _stdlib_json(monkeypatch, loads=json.loads):
+    """wbc_extract 가 보는 wbc_json 만 표준 json 으로 바꿔 부분 디코딩 경로를 타게 함"""
+    monkeypatch.setattr(wbc_extract, "wbc_json", SimpleNamespace(orjson=None, loads=loads))
+
+
+def test_stdlib_and_orjson_paths_agree(page, monkeypatch):
+    # orjson 유무에 따라 부분 디코딩(raw_decode) / 전체 디코딩 경로가 갈리므로 둘 다 같은 결과여야 함
+    expected, _ = wbc_monitor.parse_counts(page)
+    _stdlib_json(monkeypatch)
+    counts, _ = wbc_monitor.parse_counts(page)
+    assert counts == expected
+
+
+def _full_decode_forbidden(text):
+    raise AssertionError("전체 디코딩 경로로 떨어짐")
+
+
+def _data_page(data: dict, **dumps_kwargs) -> str:
+    return f'<div id="app" data-page="{html.escape(json.dumps(data, **dumps_kwargs))}"></div>'
+
+
+CONCERT = {"id": 7, "name": "c7", "date": "03/07", "time": "19:00", "listings_count": 2}
+
+
+def test_partial_decode_only_accepts_props_concerts(monkeypatch):
+    _stdlib_json(monkeypatch, _full_decode_forbidden)
+    page = _data_page({
+        "component": "x",
+        "props": {
+            "artist": {"name": "a", "concerts": []},
+            "related": {"concerts": [{"id": 1, "name": "other"}]},
+            "concerts": [CONCERT],
+        },
+    }, separators=(",", ":"))
+    concerts, debug_msg = wbc_extract.decode_concerts(wbc_extract.find_data_page(page)[0])
+    assert debug_msg == "" and concerts == [CONCERT]
+
+
+def test_partial_decode_skips_whitespace(monkeypatch):
+    _stdlib_json(monkeypatch, _full_decode_forbidden)
+    page = _data_page({"props": {"concerts": [CONCERT]}}, indent=2)
+    concerts, _ = wbc_extract.decode_concerts(wbc_extract.find_data_page(page)[0])
+    assert concerts == [CONCERT]
+
+
+def test_empty_props_concerts_is_reported(monkeypatch):
+    _stdlib_json(monkeypatch)
+    page = _data_page({"props": {"related": {"concerts": [{"id": 1}]}, "concerts": []}})
+    concerts, debug_msg = wbc_extract.decode_concerts(wbc_extract.find_data_page(page)[0])
+    assert concerts is None
+    assert "concerts 배열이 비어있습니다" in debug_msg and "related" in debug_msg
+
+
+def test_bs4_fallback_matches_scanner(page):
+    pytest.importorskip("bs4")
+    raw, _ = wbc_extract.find_data_page(page)
+    raw_bs4, debug_msg = wbc_extract._find_data_page_bs4(page)
+    assert debug_msg == ""
+    assert html.unescape(raw_bs4) == html.unescape(raw)
+
+
+@pytest.mark.parametrize(
+    "broken, message",
+    [
+        ("<html><body>Access denied</body></html>", "div#app"),
+        ('<div id="app" class="x">', "data-page"),
+        ('<div id="app" data-page="{&quot;props&quot;: {}}"></div>', "concerts"),
+        ('<div id="app" data-page="{not json"></div>', "JSON"),
+    ],
+)
+def test_parse_failures_explain_themselves(broken, message):
+    counts, debug_msg = wbc_monitor.parse_counts(broken)
+    assert counts == []
+    assert message in debug_msg
@@ -0,0 +1,103 @@
+"""
+성능 회귀 게이트
+파싱(parse_counts)·비교(detect_changes) 경로 시간을 같은 머신에서 잰 보정 작업 시간으로 나눈 비율로 비교한다.
+머신 속도가 달라도 비율은 거의 같으므로, 기준 비율의 PERF_TOLERANCE 배(기본 2배)를 넘으면 실패.
+- 기준 비율은 JSON 백엔드(wbc_json.BACKEND)별로 따로 둔다 (orjson 유무로 파싱 경로가 다름)
+- 코드를 빠르게 만들었다면 WBC_PERF_REPORT=1 로 실행해 출력된 비율로 BASELINES 를 갱신
+- 느린/바쁜 CI 에서는 WBC_PERF_TOLERANCE 로 허용 배수를 늘리거나 WBC_PERF_SKIP=1 로 생략
+"""
+
+import json
+import os
+import time
+
+import pytest
+
+import wbc_json
+import wbc_monitor
+from bench.synth import make_page
+
+PERF_TOLERANCE = float(os.environ.get("WBC_PERF_TOLERANCE", "2.0"))
+REPEAT = 7
+PAGE_CONCERTS = 2000
+
+# 작업 시간 / 보정 작업 시간 (로컬 측정값, 반복 중 최솟값 기준)
+BASELINES = {
+    "orjson": {"parse": 4.0, "diff": 2.5},
+    "json": {"parse": 4.4, "diff": 2.7},
+}
+
+pytestmark = pytest.mark.skipif(bool(os.environ.get("WBC_PERF_SKIP")), reason="WBC_PERF_SKIP 설정됨")
+
+
+def _best(fn, repeat: int = REPEAT) -> float:
+    """repeat 번 실행 중 가장 짧은 시간(초). 최솟값이 다른 프로세스 간섭에 가장 덜 흔들림"""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+_CALIBRATION_JSON = json.dumps(
+    [{"id": i, "name": f"공연{i}", "listings_count": i % 7, "concert_date": "2026-03-05"} for i in range(2000)],
+    ensure_ascii=False,
+)
+
+
+def _calibration():
+    """파이프라인과 비슷한 성격(표준 json 디코딩 + dict/객체 처리)의 고정 작업"""
+    total = 0
+    for _ in range(5):
+        records = json.loads(_CALIBRATION_JSON)
+        seen = {}
+        for r in records:
+            key = (r["id"], r["concert_date"])
+            if key not in seen:
+                seen[key] = (r["name"], int(r["listings_count"]))
+        total += sum(v[1] for v in seen.values())
+    return total
+
+
+@pytest.fixture(scope="module")
+def calibration() -> float:
+    return _best(_calibration, REPEAT * 3)
+
+
+@pytest.fixture(scope="module")
+def pages() -> list[str]:
+    return [make_page(PAGE_CONCERTS, seed=i) for i in range(2)]
+
+
+def _check(stage: str, sec: float, calibration: float):
+    ratio = sec / calibration
+    baseline = BASELINES.get(wbc_json.BACKEND, {}).get(stage)
+    if os.environ.get("WBC_PERF_REPORT"):
+        print(f"\n[perf] {wbc_json.BACKEND} {stage}: {sec * 1000:.3f} ms, 보정 {calibration * 1000:.3f} ms, 비율 {ratio:.3f}")
+    if not baseline:
+        pytest.skip(f"{wbc_json.BACKEND} 백엔드의 {stage} 기준 비율이 없습니다")
+    assert ratio <= baseline * PERF_TOLERANCE, (
+        f"{stage} 경로가 기준보다 {ratio / baseline:.2f}배 느립니다 "
+        f"(비율 {ratio:.3f}, 기준 {baseline:.3f}, 허용 {PERF_TOLERANCE}배)"
+    )
+
+
+def test_parse_speed(pages, calibration):
+    page = pages[0]
+    wbc_monitor.parse_counts(page)  # 모양 캐시 등 첫 호출 비용 제외
+    _check("parse", _best(lambda: wbc_monitor.parse_counts(page)), calibration)
+
+
+def test_diff_speed(pages, calibration):
+    old, _ = wbc_monitor.parse_counts(pages[0])
+    new, _ = wbc_monitor.parse_counts(pages[1])
+    assert wbc_monitor.detect_changes(old, new)
+    # 모니터는 매 주기 이력 저장소의 dict(state_key → Concert)와 비교
+    latest = {c.key: c for c in old}
+
+    def diff():
+        for _ in range(100):
+            wbc_monitor.detect_changes(latest, new)
+
+    _check("diff", _best(diff), calibration)
@@ -0,0 +1,122 @@
+"""
+프로파일 훅(wbc_profile) 테스트: 꺼져 있을 때 비용, N 주기 세션 결과 파일, 메트릭 포트 경로, SIGUSR1
+"""
+
+import json
+import os
+import signal
+import time
+import tracemalloc
+import urllib.error
+import urllib.request
+
+import pytest
+
+import wbc_metrics
+import wbc_profile
+
+
+@pytest.fixture(autouse=True)
+def clean(tmp_path, monkeypatch):
+    monkeypatch.setattr(wbc_profile, "PROFILE_DIR", tmp_path)
+    monkeypatch.setattr(wbc_profile, "SAMPLE_INTERVAL_SEC", 0.002)
+    yield
+    wbc_profile.cancel()
+
+
+def _workload():
+    # 프로파일·할당 결과에서 찾을 수 있는 이름
+    return [str(i) * 10 for i in range(2000)]
+
+
+def _cycles(n):
+    kept = []
+    for _ in range(n):
+        token = wbc_profile.cycle_begin()
+        try:
+            kept.append(_workload())
+            time.sleep(0.01)
+        finally:
+            wbc_profile.cycle_end(token)
+    return kept
+
+
+def test_inactive_cost_is_negligible():
+    assert not wbc_profile.active() and wbc_profile.cycle_begin() is None
+    n = 100000
+    t0 = time.perf_counter()
+    for _ in range(n):
+        wbc_profile.cycle_end(wbc_profile.cycle_begin())
+    per_call_us = (time.perf_counter() - t0) / n * 1e6
+    assert per_call_us < 5, f"꺼져 있을 때 주기당 {per_call_us:.2f}us"
+
+
+def test_session_profiles_next_n_cycles(tmp_path):
+    assert not tracemalloc.is_tracing()
+    wbc_profile.request(cycles=2, top=10)
+    assert wbc_profile.request().startswith("이미 진행 중")
+    kept = _cycles(2)
+    assert not wbc_profile.active() and not tracemalloc.is_tracing()
+
+    names = sorted(p.name.split("_", 2)[-1] for p in tmp_path.iterdir())
+    assert names == ["cpu.prof", "cpu.txt", "samples.txt", "stacks.txt", "tracemalloc.txt"]
+    text = {p.name.split("_", 2)[-1]: p.read_text(encoding="utf-8") for p in tmp_path.iterdir() if p.suffix == ".txt"}
+    assert "2주기 cProfile" in text["cpu.txt"] and "_workload" in text["cpu.txt"]
+    assert "test_profile.py" in text["tracemalloc.txt"] and "세션 중 증가" in text["tracemalloc.txt"]
+    assert "MainThread" in text["stacks.txt"]
+    # collapsed 형식: "스레드;파일:함수:줄;... 횟수"
+    main = [line for line in text["samples.txt"].splitlines() if line.startswith("MainThread;")]
+    assert main and all(line.rsplit(" ", 1)[1].isdigit() for line in main)
+    assert wbc_profile.status()["last"]["cycles"] == 2
+    assert len(kept) == 2
+
+
+def test_cycle_started_mid_session_is_not_counted(tmp_path):
+    token = wbc_profile.cycle_begin()  # 세션 시작 전에 시작한 주기
+    wbc_profile.request(cycles=1, kinds=["cpu"])
+    wbc_profile.cycle_end(token)
+    assert wbc_profile.active()
+    _cycles(1)
+    assert not wbc_profile.active()
+    assert sorted(p.suffix for p in tmp_path.iterdir()) == [".prof", ".txt"]
+
+
+def test_metrics_port_route(tmp_path):
+    wbc_metrics.add_route("/debug/profile", wbc_profile.http_handler)
+    server = wbc_metrics.start_server(0, "127.0.0.1")
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    def call(path, method="GET"):
+        req = urllib.request.Request(base + path, method=method, data=b"" if method == "POST" else None)
+        with urllib.request.urlopen(req, timeout=5) as r:
+            return r.status, r.read().decode("utf-8")
+
+    try:
+        assert json.loads(call("/debug/profile")[1])["active"] is False
+        status, body = call("/debug/profile?cycles=1&kinds=stacks", "POST")
+        assert status == 200 and "프로파일 시작" in body
+        assert json.loads(call("/debug/profile")[1])["kinds"] == ["stacks"]
+        assert "스택 저장" in call("/debug/profile?action=stacks", "POST")[1]
+        with pytest.raises(urllib.error.HTTPError) as e:
+            call("/debug/profile?cycles=x", "POST")
+        assert e.value.code == 400
+        with pytest.raises(urllib.error.HTTPError) as e:
+            call("/nope", "POST")
+        assert e.value.code == 404
+        assert call("/metrics")[0] == 200
+    finally:
+        server.shutdown()
+    _cycles(1)
+    assert len(list(tmp_path.glob("*_stacks.txt"))) == 2 and len(list(tmp_path.glob("*_samples.txt"))) == 1
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGUSR1"), reason="SIGUSR1 없음")
+def test_sigusr1_starts_session():
+    previous = signal.getsignal(signal.SIGUSR1)
+    try:
+        assert wbc_profile.install_signal()
+        os.kill(os.getpid(), signal.SIGUSR1)
+        time.sleep(0.05)
+        assert wbc_profile.status()["active"]
+    finally:
+        signal.signal(signal.SIGUSR1, previous)
@@ -0,0 +1,141 @@
+"""
+알림 규칙(wbc_rules) 테스트: 조건 일치, 웹훅별 라우팅, 멘션 합치기, 색인/캐시
+"""
+
+import json
+
+import pytest
+
+import wbc_monitor
+from wbc_events import Event
+from wbc_records import Concert
+from wbc_rules import Mention, Rule, RuleSet, load_rules
+
+EVENT_HOOK = "https://discord.test/event"
+JAPAN_HOOK = "https://discord.test/japan"
+
+
+def _event(slug="wbc2026", target_ids=()):
+    return Event(slug, title="WBC", target_ids=target_ids, webhook=EVENT_HOOK)
+
+
+def _c(concert_id, count, name="", date="03/05"):
+    return Concert(concert_id, date, "19:00", name, count)
+
+
+def _change(concert_id, old, new, name="", date="03/05"):
+    return _c(concert_id, old, name, date), _c(concert_id, new, name, date)
+
+
+@pytest.mark.parametrize(
+    "rule, change, expected",
+    [
+        (Rule(ids=[1519]), _change(1519, 0, 1), True),
+        (Rule(ids=[1519]), _change(1520, 0, 1), False),
+        (Rule(name_regex="日本"), _change(1, 0, 1, "韓国 vs 日本"), True),
+        (Rule(name_regex="日本"), _change(1, 0, 1, "韓国 vs 台湾"), False),
+        (Rule(date_from="2026-03-05", date_to="03/06"), _change(1, 0, 1, date="03/05"), True),
+        (Rule(date_from="03/06"), _change(1, 0, 1, date="03/05"), False),
+        (Rule(date_to="03/04"), _change(1, 0, 1, date="03/05"), False),
+        (Rule(date_from="03/01"), _change(1, 0, 1, date="?"), False),
+        (Rule(min_count=5), _change(1, 0, 5), True),
+        (Rule(min_count=5), _change(1, 0, 4), False),
+        (Rule(max_count=0), _change(1, 3, 0), True),
+        (Rule(cross_above=1), _change(1, 0, 2), True),
+        (Rule(cross_above=1), _change(1, 1, 2), False),
+        (Rule(cross_above=10), _change(1, 9, 10), True),
+        (Rule(min_delta=3), _change(1, 1, 4), True),
+        (Rule(min_delta=3), _change(1, 1, 3), False),
+        (Rule(max_delta=-10), _change(1, 15, 5), True),
+        (Rule(max_delta=-10), _change(1, 15, 6), False),
+        (Rule(events=["other"]), _change(1, 0, 1), False),
+        (Rule(events=["wbc2026"], ids=[1], name_regex="vs", min_count=1), _change(1, 0, 1, "A vs B"), True),
+    ],
+)
+def test_rule_conditions(rule, change, expected):
+    rules = RuleSet([rule], route_all=False)
+    assert bool(rules.matches("wbc2026", *change)) is expected
+
+
+def test_route_all_sends_everything_to_event_webhook():
+    event = _event()
+    rules = RuleSet([Rule(name_regex="日本", webhook=JAPAN_HOOK, mention="role:42")])
+    changes = [_change(1, 0, 3, "韓国 vs 日本"), _change(2, 5, 1, "韓国 vs 台湾")]
+    routes = {t.webhook: c for t, c in rules.route(event, changes).items()}
+    assert routes[EVENT_HOOK] == changes
+    assert routes[JAPAN_HOOK] == changes[:1]
+    # 멘션은 그 규칙의 웹훅으로 가는 메시지에만
+    assert not rules.mention(event, EVENT_HOOK, changes)
+    japan = rules.mention(event, JAPAN_HOOK, routes[JAPAN_HOOK])
+    assert japan.content() == "<@&42>"
+    assert japan.allowed_mentions() == {"roles": ["42"]}
+
+
+def test_route_all_off_sends_only_matched_changes():
+    event = _event()
+    rules = RuleSet([Rule(min_count=10)], route_all=False)
+    changes = [_change(1, 0, 3), _change(2, 5, 12)]
+    assert {t.webhook: c for t, c in rules.route(event, changes).items()} == {EVENT_HOOK: changes[1:]}
+    # 같은 (이벤트, 웹훅)은 같은 Target 객체 → 알림 스레드에서 합쳐짐
+    assert list(rules.route(event, changes)) == list(rules.route(event, changes[1:]))
+
+
+def test_event_target_ids_become_everyone_rule():
+    event = _event(target_ids={1519})
+    rules = RuleSet()
+    rules.add_event_targets([event])
+    rules.add_event_targets([event])
+    assert len(rules.rules) == 1
+    assert rules.mention(event, EVENT_HOOK, [_change(1519, 0, 1)]).content() == "@everyone"
+    assert not rules.mention(event, EVENT_HOOK, [_change(1519, 1, 2)])
+    assert not rules.mention(event, EVENT_HOOK, [_change(1520, 0, 1)])
+    # 다른 이벤트의 같은 공연 id 에는 적용하지 않음
+    other = _event("other2026")
+    assert not rules.mention(other, EVENT_HOOK, [_change(1519, 0, 1)])
+
+
+def test_mentions_merge():
+    m = Mention.parse(["here", "user:7"]) | Mention.parse("everyone") | Mention.parse(["role:1", "none"])
+    assert m.content() == "@everyone @here <@&1> <@7>"
+    assert m.allowed_mentions() == {"parse": ["everyone"], "roles": ["1"], "users": ["7"]}
+    with pytest.raises(ValueError):
+        Mention.parse("channel:1")
+
+
+def test_candidates_use_id_index_and_cache():
+    # id 규칙 1000개 + 정규식 규칙 몇 개: 공연 하나에 해당하는 후보는 자기 id 규칙과 일치하는 정규식 규칙뿐
+    rules = RuleSet([Rule(ids=[i]) for i in range(1000)] + [Rule(name_regex="日本"), Rule(name_regex="台湾")])
+    cands = rules.candidates("wbc2026", _c(5, 0, "韓国 vs 日本"))
+    assert [r.ids for r in cands if r.ids] == [frozenset({5})]
+    assert sum(1 for r in cands if r.pattern is not None) == 1
+    # 같은 공연은 캐시된 튜플을 그대로 사용
+    assert rules.candidates("wbc2026", _c(5, 3, "韓国 vs 日本")) is cands
+
+
+def test_load_rules(tmp_path, monkeypatch):
+    monkeypatch.setenv("JAPAN_WEBHOOK_URL", JAPAN_HOOK)
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({
+        "route_all": False,
+        "rules": [
+            {"name": "한일전", "ids": [1519], "cross_above": 1, "mention": "everyone"},
+            {"name": "일본", "name_regex": "日本", "webhook_env": "JAPAN_WEBHOOK_URL", "mention": ["role:9"]},
+        ],
+    }), encoding="utf-8")
+    rules = load_rules(path)
+    assert not rules.route_all
+    assert [r.name for r in rules.rules] == ["한일전", "일본"]
+    assert rules.rules[1].webhook == JAPAN_HOOK
+
+    path.write_text(json.dumps({"rules": [{"name_regex": "("}]}), encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_rules(path)
+
+
+def test_monitor_uses_rules(monkeypatch):
+    event = _event(target_ids={1519})
+    monkeypatch.setattr(wbc_monitor, "_rules", RuleSet([Rule(name_regex="日本", mention="role:42")]))
+    changes = [_change(1519, 0, 2, "韓国 vs 日本")]
+    payload = wbc_monitor.build_discord_payload(changes, [changes[0][1]], event)
+    assert payload["content"] == "@everyone <@&42>"
+    assert payload["allowed_mentions"] == {"parse": ["everyone"], "roles": ["42"]}
@@ -0,0 +1,192 @@
+"""
+스케줄러(wbc_scheduler) 테스트: 가짜 시계로 시작 분산, 지터, 백오프, 간격 늘리기·되돌리기, 늦은 시작
+"""
+
+import random
+from types import SimpleNamespace
+
+import pytest
+
+import wbc_scheduler
+from wbc_scheduler import Scheduler
+
+
+class FakeClock:
+    """sleep 하면 그만큼(+ overshoot) 시간이 흐르는 단조 시계"""
+
+    def __init__(self, t=100.0):
+        self.t = t
+        self.overshoot = 0.0
+        self.slept: list[float] = []
+
+    def __call__(self):
+        return self.t
+
+    def sleep(self, sec):
+        self.slept.append(sec)
+        self.t += sec + self.overshoot
+
+
+def _event(slug="wbc", interval=60.0, retry_after=0.0):
+    return SimpleNamespace(slug=slug, interval=interval, retry_after=retry_after)
+
+
+def _scheduler(events, clock, jitter=0.0, seed=0):
+    return Scheduler(events, clock=clock, sleep=clock.sleep, rng=random.Random(seed), jitter=jitter)
+
+
+def _runs(sched, clock, job, n):
+    """n 번 실행하고 (이벤트 slug, 시작 시각) 목록 반환"""
+    started = []
+
+    def record(ev):
+        started.append((ev.slug, clock()))
+        return job(ev)
+
+    for _ in range(n):
+        sched.run_pending(record)
+    return started
+
+
+def test_first_runs_are_spread_within_shortest_interval():
+    clock = FakeClock()
+    sched = _scheduler([_event("a", 60), _event("b", 120), _event("c", 90)], clock)
+    started = _runs(sched, clock, lambda ev: 200, 3)
+    assert started == [("a", 100.0), ("b", 120.0), ("c", 140.0)]
+
+
+def test_jitter_only_lengthens_interval():
+    clock = FakeClock()
+    sched = _scheduler([_event(interval=60)], clock, jitter=0.1, seed=1)
+    times = [t for _, t in _runs(sched, clock, lambda ev: 200, 50)]
+    gaps = [b - a for a, b in zip(times, times[1:])]
+    assert all(60 <= g <= 66 for g in gaps)
+    assert len(set(gaps)) > 1
+
+
+def test_backoff_doubles_and_resets_on_success():
+    clock = FakeClock()
+    statuses = iter([429, 429, 503, 200, 200])
+    sched = _scheduler([_event(interval=10)], clock)
+    times = [t for _, t in _runs(sched, clock, lambda ev: next(statuses), 5)]
+    gaps = [b - a for a, b in zip(times, times[1:])]
+    assert gaps == [20, 40, 80, 10]
+    assert sched.slots[0].errors == 0
+
+
+def test_retry_after_longer_than_backoff_wins():
+    clock = FakeClock()
+    ev = _event(interval=10, retry_after=300)
+    sched = _scheduler([ev], clock)
+    sched.run_pending(lambda e: 429)
+    assert sched.next_deadline() == 100 + 300
+
+
+def test_backoff_is_capped():
+    clock = FakeClock()
+    sched = _scheduler([_event(interval=600)], clock)
+    for _ in range(6):
+        sched.run_pending(lambda ev: 403)
+    deadline = sched.next_deadline()
+    sched.run_pending(lambda ev: 403)
+    assert sched.next_deadline() - deadline == wbc_scheduler.BACKOFF_MAX_SEC
+
+
+def test_sustained_errors_grow_interval_then_recover(capsys):
+    clock = FakeClock()
+    sched = _scheduler([_event(interval=10)], clock)
+    slot = sched.slots[0]
+    for _ in range(wbc_scheduler.SUSTAINED_ERRORS):
+        sched.run_pending(lambda ev: 429)
+    assert slot.scale == wbc_scheduler.GROW_FACTOR
+    assert "기본 간격을 15초로" in capsys.readouterr().out
+
+    for _ in range(wbc_scheduler.RECOVER_AFTER - 1):
+        sched.run_pending(lambda ev: 200)
+    assert slot.scale == wbc_scheduler.GROW_FACTOR
+    sched.run_pending(lambda ev: 200)
+    assert slot.scale == 1.0
+
+
+def test_scale_is_bounded():
+    clock = FakeClock()
+    sched = _scheduler([_event(interval=1)], clock)
+    for _ in range(wbc_scheduler.SUSTAINED_ERRORS * 20):
+        sched.run_pending(lambda ev: 500)
+    assert sched.slots[0].scale == wbc_scheduler.MAX_SCALE
+
+
+def test_sleep_error_does_not_accumulate():
+    clock = FakeClock()
+    clock.overshoot = 0.5  # 매번 0.5초 늦게 깨어남
+    sched = _scheduler([_event(interval=10)], clock)
+    times = [t for _, t in _runs(sched, clock, lambda ev: 200, 4)]
+    gaps = [b - a for a, b in zip(times, times[1:])]
+    # 늦게 시작한 만큼 다음 예정도 밀리지만, 간격은 최소 간격보다 짧아지지 않음
+    assert all(g >= 10 for g in gaps)
+    assert sched.stats["late_sec"] == pytest.approx(0.5 * 3)
+
+
+def test_late_start_keeps_minimum_gap():
+    clock = FakeClock()
+    sched = _scheduler([_event("a", 10), _event("b", 10)], clock)
+
+    def slow(ev):
+        if ev.slug == "a":
+            clock.t += 8  # a 가 오래 걸려 b 가 예정(105)보다 늦게(108) 시작
+        return 200
+
+    started = _runs(sched, clock, slow, 2)
+    assert started == [("a", 100.0), ("b", 108.0)]
+    deadlines = {slot.event.slug: t for t, _, slot in sched._heap}
+    assert deadlines == {"a": 110.0, "b": 118.0}
+
+
+def test_job_longer_than_interval_does_not_burst():
+    clock = FakeClock()
+    sched = _scheduler([_event(interval=10)], clock)
+
+    def slow(ev):
+        clock.t += 35
+        return 200
+
+    sched.run_pending(slow)
+    assert sched.next_deadline() == clock.t
+    sched.run_pending(slow)
+    assert clock.slept == []
+
+
+def test_exception_still_reschedules():
+    clock = FakeClock()
+    sched = _scheduler([_event(interval=10)], clock)
+
+    def boom(ev):
+        raise RuntimeError("x")
+
+    with pytest.raises(RuntimeError):
+        sched.run_pending(boom)
+    # 예외도 오류로 세어 백오프
+    assert sched.next_deadline() == 100 + 20 and sched.stats["runs"] == 1
+    assert sched.slots[0].errors == 1
+
+
+def test_consecutive_fetch_failures_extend_backoff():
+    clock = FakeClock()
+    statuses = iter([None, None, 503, None, 200, None])
+    sched = _scheduler([_event(interval=10)], clock)
+    times = [t for _, t in _runs(sched, clock, lambda ev: next(statuses), 6)]
+    gaps = [b - a for a, b in zip(times, times[1:])]
+    # 응답을 못 받은 실행(None)도 연속 오류로 이어져 간격이 계속 늘어나고, 성공해야 초기화
+    assert gaps == [20, 40, 80, 160, 10]
+    assert sched.slots[0].errors == 1
+
+
+def test_skipped_run_keeps_base_interval_and_streak():
+    clock = FakeClock()
+    statuses = iter([429, wbc_scheduler.SKIPPED, wbc_scheduler.SKIPPED, 429])
+    sched = _scheduler([_event(interval=10)], clock)
+    times = [t for _, t in _runs(sched, clock, lambda ev: next(statuses), 4)]
+    gaps = [b - a for a, b in zip(times, times[1:])]
+    # 조회하지 않은 실행은 기본 간격 뒤 다시 실행하며 연속 오류 수를 바꾸지 않음
+    assert gaps == [20, 10, 10]
+    assert sched.slots[0].errors == 2 and sched.slots[0].successes == 0
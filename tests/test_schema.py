@@ -0,0 +1,135 @@
+"""
+스키마 변경 감지(wbc_schema) 테스트: drift 이벤트 내용, 키 순서, broken 처리, 이벤트별 구분
+"""
+
+import html
+import json
+
+import pytest
+
+import wbc_monitor
+from wbc_events import Event
+from wbc_schema import SchemaResolver
+
+
+def _record(**extra):
+    rec = {
+        "id": 1,
+        "name": "c1",
+        "concert_date_web_format": "03/07",
+        "start_time_web_format": "19:00",
+        "listings_count": 3,
+    }
+    rec.update(extra)
+    return rec
+
+
+def _without(rec, *keys):
+    return {k: v for k, v in rec.items() if k not in keys}
+
+
+@pytest.fixture
+def drifts(monkeypatch):
+    """wbc_monitor 가 쓰는 resolver 를 drift 이벤트를 모으는 새 resolver 로 교체"""
+    seen = []
+    monkeypatch.setattr(wbc_monitor, "_resolver", SchemaResolver(on_drift=seen.append))
+    return seen
+
+
+def test_known_shape_is_silent_and_cached():
+    seen = []
+    resolver = SchemaResolver(on_drift=seen.append)
+    plan = resolver.resolve([_record()], "a")
+    assert plan.mapping() == {
+        "id": "id",
+        "date": "concert_date_web_format",
+        "time": "start_time_web_format",
+        "name": "name",
+        "count": "listings_count",
+    }
+    assert resolver.resolve([_record(listings_count=9)], "a") is plan
+    assert seen == [] and resolver.drifts == 0
+
+
+def test_key_reorder_is_not_drift():
+    seen = []
+    resolver = SchemaResolver(on_drift=seen.append)
+    rec = _record()
+    plan = resolver.resolve([rec], "a")
+    reordered = dict(reversed(list(rec.items())))
+    assert resolver.resolve([reordered], "a") is plan
+    assert seen == []
+
+
+def test_renamed_key_reports_added_removed_and_changed_fields():
+    seen = []
+    resolver = SchemaResolver(on_drift=seen.append)
+    resolver.resolve([_record()], "a")
+    renamed = _without(_record(concert_date="2026-03-07"), "concert_date_web_format")
+    plan = resolver.resolve([renamed], "a")
+    assert not plan.broken()
+    (drift,) = seen
+    assert drift["type"] == "schema_drift" and drift["event"] == "a"
+    assert drift["added"] == ["concert_date"] and drift["removed"] == ["concert_date_web_format"]
+    assert drift["changed_fields"] == {"date": ["concert_date_web_format", "concert_date"]}
+    assert drift["missing"] == [] and drift["broken"] is False
+
+
+def test_optional_field_missing_is_not_broken():
+    seen = []
+    resolver = SchemaResolver(on_drift=seen.append)
+    plan = resolver.resolve([_without(_record(), "name")], "a")
+    assert plan.missing == ["name"] and not plan.broken()
+    # 처음 본 모양이라도 빠진 필드가 있으면 알림 (이전 모양이 없으니 added 는 비움)
+    (drift,) = seen
+    assert drift["added"] == [] and drift["removed"] == [] and "changed_fields" not in drift
+
+
+def test_missing_count_is_broken_and_fails_parse(drifts):
+    assert wbc_monitor.build_counts([_record()])
+    assert wbc_monitor.build_counts([_without(_record(), "listings_count")]) == []
+    (drift,) = drifts
+    assert drift["broken"] is True and drift["missing"] == ["count"]
+    assert drift["removed"] == ["listings_count"]
+    assert "스키마 변경" in wbc_monitor._schema_debug_msg(wbc_monitor.DEFAULT_SLUG)
+
+
+def test_sources_are_tracked_separately():
+    seen = []
+    resolver = SchemaResolver(on_drift=seen.append)
+    resolver.resolve([_record()], "a")
+    resolver.resolve([_record(extra=1)], "b")
+    assert seen == []
+    resolver.resolve([_record(extra=1)], "a")
+    assert [d["event"] for d in seen] == ["a"]
+    assert resolver.current("b").fingerprint == resolver.current("a").fingerprint
+
+
+def test_bs4_fallback_reports_drift_for_its_event(drifts, tmp_path):
+    pytest.importorskip("bs4")
+    event = Event("other", state_file=tmp_path / "s.json", history_file=tmp_path / "h.jsonl")
+    data = {"props": {"concerts": [_without(_record(), "listings_count")]}}
+    # 따옴표 없는 id 는 스캐너가 못 찾아 BeautifulSoup 대체 경로로 감
+    page = f'<div id=app data-page="{html.escape(json.dumps(data))}"></div>'
+    counts, debug_msg, page_hash = wbc_monitor._parse_if_changed(page, None, event)
+    assert counts == [] and page_hash is None
+    assert "스키마 변경" in debug_msg
+    assert [d["event"] for d in drifts] == ["other"]
+
+
+def test_null_web_format_falls_back_per_record(drifts):
+    fallback = _record(concert_date_web_format=None, start_time_web_format=None,
+                       concert_date="2026年03月08日", start_time="18:00", id=2)
+    counts = wbc_monitor.build_counts([_record(), fallback])
+    assert [(c.date, c.time) for c in counts] == [("03/07", "19:00"), ("03/08", "18:00")]
+    assert drifts == []
+
+
+def test_records_of_another_shape_use_alternate_keys(drifts):
+    # 첫 레코드 모양으로 정한 키가 없는 레코드도 다른 후보 키로 읽음
+    other = _without(_record(id=2, concert_date="2026年03月08日", start_time="18:00"),
+                     "concert_date_web_format", "start_time_web_format")
+    counts = wbc_monitor.build_counts([_record(), other])
+    assert [(c.date, c.time) for c in counts] == [("03/07", "19:00"), ("03/08", "18:00")]
+    counts = wbc_monitor.build_counts([other, _record()])
+    assert [(c.date, c.time) for c in counts] == [("03/08", "18:00"), ("03/07", "19:00")]
@@ -0,0 +1,73 @@
+"""
+디버그 스냅샷 보관함(wbc_snapshots) 테스트: 메타데이터, 개수·크기 제한으로 오래된 것부터 삭제, 큐가 가득 찼을 때 버리기
+"""
+
+import os
+from datetime import datetime, timedelta
+
+from wbc_snapshots import SnapshotArchive, read_snapshot
+
+T0 = datetime(2026, 3, 7, 19, 0)
+
+
+def _html(i, size=200):
+    # 압축이 거의 안 되는 본문이라 파일 크기가 size 에 비례
+    return f"<p>{i}</p>" + os.urandom(size).hex()
+
+
+def _write(archive, n, size=200):
+    return [archive.write(_html(i, size), status=200, event="wbc", when=T0 + timedelta(seconds=i)) for i in range(n)]
+
+
+def test_write_keeps_html_and_meta(tmp_path):
+    archive = SnapshotArchive(tmp_path)
+    html = _html(0)
+    path = archive.write(html, status=503, debug_msg="data-page 없음", event="wbc", url="https://x", when=T0)
+    assert read_snapshot(path) == html
+    meta = archive.meta(path)
+    assert (meta["status"], meta["debug_msg"], meta["event"], meta["url"]) == (503, "data-page 없음", "wbc", "https://x")
+    assert meta["html_bytes"] == len(html) and meta["time"] == T0.isoformat()
+    assert [(p, m, h) for p, m, h in archive.iter_snapshots()] == [(path, meta, html)]
+
+
+def test_evicts_oldest_over_max_count(tmp_path):
+    archive = SnapshotArchive(tmp_path, max_count=3)
+    paths = _write(archive, 5)
+    assert archive.files() == paths[2:]
+    # 메타데이터도 함께 삭제
+    assert sorted(p.name for p in tmp_path.glob("*.json")) == [p.name.split(".")[0] + ".json" for p in paths[2:]]
+    assert [read_snapshot(p)[:8] for p in archive.files()] == ["<p>2</p>", "<p>3</p>", "<p>4</p>"]
+
+
+def test_evicts_oldest_over_max_bytes(tmp_path):
+    archive = SnapshotArchive(tmp_path, max_count=100, max_bytes=10**9)
+    (first,) = _write(archive, 1, size=1000)
+    size = first.stat().st_size
+    archive.max_bytes = int(size * 2.5)
+    paths = [first] + [
+        archive.write(_html(i, 1000), event="wbc", when=T0 + timedelta(seconds=i)) for i in range(1, 5)
+    ]
+    assert archive.files() == paths[-2:]
+    assert sum(p.stat().st_size for p in archive.files()) <= archive.max_bytes
+
+
+def test_newest_is_kept_even_if_too_large(tmp_path):
+    archive = SnapshotArchive(tmp_path, max_bytes=10)
+    paths = _write(archive, 3)
+    assert archive.files() == paths[-1:]
+
+
+def test_save_writes_in_background_and_drops_when_full(tmp_path, monkeypatch):
+    archive = SnapshotArchive(tmp_path, max_count=10, queue_size=2)
+    # 쓰기 스레드를 띄우지 않으면 큐가 비워지지 않음
+    monkeypatch.setattr(archive, "_start", lambda: None)
+    assert archive.save(_html(0), status=200, event="wbc")
+    assert archive.save(_html(1), status=200, event="wbc")
+    assert not archive.save(_html(2), status=200, event="wbc")
+    assert archive.dropped == 1 and archive.files() == []
+
+    monkeypatch.undo()
+    archive._start()
+    archive.stop()
+    assert [read_snapshot(p)[:8] for p in archive.files()] == ["<p>0</p>", "<p>1</p>"]
+    assert all(archive.meta(p)["event"] == "wbc" for p in archive.files())
@@ -0,0 +1,47 @@
+"""
+모니터 시작 시간 예산 (-X importtime)
+컨테이너가 자주 재배치되므로 wbc_monitor import 에 무거운 모듈이 끼어들지 않는지,
+전체 import 시간이 예산 안인지 확인한다. 예산은 WBC_STARTUP_BUDGET_MS 로 조정.
+"""
+
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# 실제 사용 시점에만 import 해야 하는 모듈
+LAZY_MODULES = ("requests", "urllib3", "bs4", "selenium", "plyer", "http.server", "numpy", "dataclasses")
+# 미리 컴파일된(.pyc) 상태의 wbc_monitor 누적 import 시간 예산(ms). 로컬 측정값 약 25ms
+BUDGET_MS = float(os.environ.get("WBC_STARTUP_BUDGET_MS", "120"))
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def _importtime(module: str) -> dict[str, int]:
+    """module 을 새 인터프리터에서 import 하고 {모듈: 누적 import 시간(us)} 반환"""
+    env = {k: v for k, v in os.environ.items() if k != "PYTHONDONTWRITEBYTECODE"}
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in out.stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            times[m.group(4)] = int(m.group(2))
+    return times
+
+
+def test_monitor_does_not_import_heavy_modules():
+    times = _importtime("wbc_monitor")
+    loaded = [name for name in LAZY_MODULES if name in times]
+    assert not loaded, f"wbc_monitor import 시 불필요하게 로드됨: {loaded}"
+
+
+def test_monitor_import_within_budget():
+    _importtime("wbc_monitor")  # 첫 실행에서 .pyc 생성 (Dockerfile 의 compileall 과 같은 상태)
+    best = min(_importtime("wbc_monitor")["wbc_monitor"] for _ in range(3)) / 1000
+    assert best <= BUDGET_MS, f"wbc_monitor import {best:.1f}ms > 예산 {BUDGET_MS:.0f}ms"
@@ -0,0 +1,118 @@
+"""
+변경 이벤트 스트림(wbc_stream) 테스트: seq 번호, Last-Event-ID 재접속 시 backlog 재전송, 느린 구독자 끊기, SSE 서버
+"""
+
+import http.client
+import json
+
+import pytest
+
+import wbc_stream
+from wbc_stream import ChangeStream
+
+
+def _items(*ids, event="wbc"):
+    return [{"type": "change", "event": event, "concert_id": i} for i in ids]
+
+
+def _drain(sub) -> list[dict]:
+    out = []
+    while (item := sub.get(timeout=0)) is not None:
+        out.append(item)
+    return out
+
+
+def test_publish_numbers_and_fans_out():
+    stream = ChangeStream()
+    a, b = stream.subscribe(), stream.subscribe(event_filter="other")
+    stream.publish(_items(1, 2))
+    stream.publish(_items(3, event="other"))
+    assert [(i["seq"], i["concert_id"]) for i in _drain(a)] == [(1, 1), (2, 2), (3, 3)]
+    assert [i["seq"] for i in _drain(b)] == [3]
+    assert stream.published == 3
+
+
+def test_last_event_id_replays_missed_backlog():
+    stream = ChangeStream(backlog=3)
+    stream.publish(_items(1, 2, 3, 4, 5))
+    # backlog 에는 seq 3~5 만 남음
+    assert [i["seq"] for i in _drain(stream.subscribe(last_id=3))] == [4, 5]
+    assert [i["seq"] for i in _drain(stream.subscribe(last_id=0))] == [3, 4, 5]
+    assert _drain(stream.subscribe(last_id=5)) == []
+    # last_id 없이 구독하면 이후 이벤트만
+    fresh = stream.subscribe()
+    stream.publish(_items(6))
+    assert [i["seq"] for i in _drain(fresh)] == [6]
+
+
+def test_replay_respects_event_filter():
+    stream = ChangeStream()
+    stream.publish(_items(1) + _items(2, event="other") + _items(3))
+    assert [i["seq"] for i in _drain(stream.subscribe(last_id=0, event_filter="wbc"))] == [1, 3]
+
+
+def test_slow_subscriber_is_dropped_without_blocking_others():
+    stream = ChangeStream(queue_size=2)
+    slow, fast = stream.subscribe(), stream.subscribe()
+    stream.publish(_items(1, 2))
+    assert [i["seq"] for i in _drain(fast)] == [1, 2]
+    stream.publish(_items(3))
+    assert slow.closed and not fast.closed
+    assert stream.dropped == 1 and stream.subscriber_count() == 1
+    # 끊긴 구독자는 받은 데까지 처리한 뒤 마지막 seq 로 재접속해 이어 받음
+    last = _drain(slow)[-1]["seq"]
+    stream.publish(_items(4))
+    resumed = stream.subscribe(last_id=last)
+    assert [i["seq"] for i in _drain(resumed)] == [3, 4]
+
+
+def test_jsonl_output(tmp_path):
+    path = tmp_path / "events.jsonl"
+    stream = ChangeStream(jsonl_path=path)
+    stream.publish(_items(1, 2))
+    stream.publish([])
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [(r["seq"], r["concert_id"]) for r in lines] == [(1, 1), (2, 2)]
+
+
+def _read_events(resp, n) -> list[tuple[str, dict]]:
+    """SSE 응답에서 이벤트 n 개의 (id, data) 읽기 (주석 줄은 건너뜀)"""
+    events, fields = [], {}
+    while len(events) < n:
+        line = resp.fp.readline().decode("utf-8").rstrip("\n")
+        if not line:
+            if "data" in fields:
+                events.append((fields["id"], json.loads(fields["data"])))
+            fields = {}
+        elif not line.startswith(":"):
+            key, _, value = line.partition(": ")
+            fields[key] = value
+    return events
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(wbc_stream, "HEARTBEAT_SEC", 0.2)
+    stream = ChangeStream()
+    server = wbc_stream.start_server(stream, 0)
+    yield stream, server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+def test_sse_reconnect_with_last_event_id(server):
+    stream, port = server
+    stream.publish(_items(1, 2, 3))
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    conn.request("GET", "/events", headers={"Last-Event-ID": "1"})
+    resp = conn.getresponse()
+    assert resp.status == 200 and resp.getheader("Content-Type").startswith("text/event-stream")
+    assert [(i, d["concert_id"]) for i, d in _read_events(resp, 2)] == [("2", 2), ("3", 3)]
+    stream.publish(_items(4))
+    assert [i for i, _ in _read_events(resp, 1)] == ["4"]
+    conn.close()
+
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    conn.request("GET", "/events?last_id=3&event=wbc")
+    assert [i for i, _ in _read_events(conn.getresponse(), 1)] == ["4"]
+    conn.close()
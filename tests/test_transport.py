@@ -0,0 +1,73 @@
+"""
+공유 HTTP 전송 계층(wbc_transport) 테스트: 로컬 HTTP 서버로 연결 재사용, 연결 시간 기록, 끊긴 keep-alive 재연결
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("requests")
+
+import wbc_transport  # noqa: E402
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_GET(self):
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        # /drop: Connection 헤더 없이 응답 뒤 연결을 닫음 (클라이언트 풀에는 살아 있는 것처럼 남음)
+        self.close_connection = self.path == "/drop"
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def base_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    wbc_transport.close_session()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    wbc_transport.close_session()
+    server.shutdown()
+    server.server_close()
+
+
+def test_session_reuses_connection_and_records_connect_time(base_url):
+    first = wbc_transport.get(f"{base_url}/a")
+    assert first.text == "ok"
+    t1 = wbc_transport.last_timing("vendor")
+    wbc_transport.get(f"{base_url}/b")
+    t2 = wbc_transport.last_timing("vendor")
+    assert t1["host"] == "127.0.0.1" and t1["status"] == 200
+    assert t1["connect"] > 0 and not t1["reused"]
+    assert t2["connect"] == 0.0 and t2["reused"]
+    assert 0 < t1["ttfb"] <= t1["total"]
+    assert wbc_transport.get_session() is wbc_transport.get_session()
+    assert "새 연결" in wbc_transport.format_timing(t1)
+    assert "연결 재사용" in wbc_transport.format_timing(t2)
+
+
+def test_dropped_keepalive_connection_counts_as_new(base_url):
+    wbc_transport.get(f"{base_url}/drop")
+    time.sleep(0.05)  # 서버가 소켓을 닫을 시간
+    # 풀에는 같은 연결 객체가 남아 있지만 urllib3 가 다시 연결함
+    wbc_transport.get(f"{base_url}/a")
+    t = wbc_transport.last_timing("vendor")
+    assert t["connect"] > 0 and not t["reused"]
+
+
+def test_timings_are_kept_per_kind(base_url):
+    wbc_transport.get(f"{base_url}/a", kind="discord")
+    wbc_transport.get(f"{base_url}/a")
+    assert wbc_transport.last_timing("discord")["kind"] == "discord"
+    assert wbc_transport.last_timing("vendor")["kind"] == "vendor"
+    assert wbc_transport.format_timing(None) == ""
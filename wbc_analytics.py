@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+매수 건수 이력 분석
+wbc_history.jsonl(HistoryStore.iter_history)의 건수 변경 기록으로 공연별로
+- 매물 등록(건수 증가)·소진(건수 감소) 합계와 시간당 속도
+- 매물이 올라와 있던 시간 (개별 매물을 구분할 수 없으므로 먼저 올라온 매물이 먼저 팔린다고 가정, FIFO)
+- 요일×시간대 등록/소진 히트맵
+- 변경 간격 분포와 체크 간격 참고값
+을 계산한다. numpy 가 있으면 벡터 연산, 없으면 표준 라이브러리 array 로 같은 결과를 낸다.
+
+사용 예:
+  python wbc_analytics.py                         # wbc_history.jsonl 전체
+  python wbc_analytics.py --days 7 --concert 1519
+  python wbc_analytics.py wbc_history_other.jsonl --json
+"""
+
+import argparse
+import math
+import sys
+import time
+from array import array
+from collections import deque
+from datetime import datetime, timedelta
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import wbc_json
+from wbc_history import iter_log
+
+HISTORY_FILE = Path(__file__).parent / "wbc_history.jsonl"
+WEEKDAYS = "월화수목금토일"
+# 체크 간격 참고값 하한 (wbc_events.MIN_INTERVAL_SEC 와 같음)
+MIN_INTERVAL_SEC = 30
+
+
+class Series:
+    """이력 레코드를 열 단위로 모은 것. 레코드는 시간 순"""
+
+    def __init__(self):
+        self.keys: list = []  # 공연 키 (id, 없으면 날짜_시간)
+        self.info: dict = {}  # 키 → {"date", "time", "name"}
+        self.t = array("d")  # epoch 초
+        self.k = array("l")  # keys 인덱스
+        self.count = array("d")  # 건수 (페이지에서 사라진 기록은 nan)
+        self.hour = array("b")
+        self.weekday = array("b")
+
+    def __len__(self):
+        return len(self.t)
+
+
+def load_series(records, since: datetime | None = None, concert=None, utc_offset: float = 0.0) -> Series:
+    """
+    이력 레코드(dict) 들을 Series 로. since 이전 기록은 건너뜀 (since 이전 마지막 값은 기준값으로 사용).
+    utc_offset: 히트맵 시간대 보정(시간). 기록 시각은 모니터가 돌던 시스템 시간대 기준
+    """
+    s = Series()
+    index: dict = {}
+    parsed: dict = {}  # 같은 주기의 레코드는 시각 문자열이 같으므로 한 번만 파싱
+    shift = timedelta(hours=utc_offset)
+    baseline: dict = {}
+    for rec in records:
+        key = rec["id"] if rec.get("id") is not None else rec.get("k")
+        if concert is not None and key != concert:
+            continue
+        ts = rec.get("t")
+        p = parsed.get(ts)
+        if p is None:
+            try:
+                dt = datetime.fromisoformat(ts)
+            except (TypeError, ValueError):
+                continue
+            local = dt + shift
+            p = parsed[ts] = (dt, dt.timestamp(), local.hour, local.weekday())
+        if since is not None and p[0] < since:
+            prev = baseline.get(key)
+            if prev is not None and "name" in prev and "name" not in rec:
+                # 공연 정보는 바뀔 때만 기록되므로 기준 레코드에 이어 붙임 (리포트에 이름이 빠지지 않도록)
+                rec = {**rec, "date": prev.get("date"), "time": prev.get("time"), "name": prev.get("name")}
+            baseline[key] = rec
+            continue
+        if key in baseline:
+            # since 직전 값을 기준 레코드로 넣어 첫 변화량이 사라지지 않게 함
+            prev = baseline.pop(key)
+            _append(s, index, key, prev, (since, since.timestamp(), 0, 0))
+        _append(s, index, key, rec, p)
+    return s
+
+
+def _append(s: Series, index: dict, key, rec: dict, p: tuple):
+    i = index.get(key)
+    if i is None:
+        i = index[key] = len(s.keys)
+        s.keys.append(key)
+        s.info[key] = {"date": None, "time": None, "name": None}
+    if "name" in rec:
+        s.info[key] = {"date": rec.get("date"), "time": rec.get("time"), "name": rec.get("name")}
+    count = rec.get("count")
+    s.t.append(p[1])
+    s.k.append(i)
+    s.count.append(float("nan") if count is None else float(count))
+    s.hour.append(p[2])
+    s.weekday.append(p[3])
+
+
+# ---- 변화량 ----
+
+def _flows_numpy(s: Series):
+    k = np.asarray(s.k)
+    c = np.asarray(s.count)
+    # 공연별로 모은 뒤 직전 기록과 비교 (stable 정렬이라 공연 안에서는 시간 순 유지)
+    order = np.argsort(k, kind="stable")
+    ks, cs = k[order], c[order]
+    prev = np.empty_like(cs)
+    prev[0] = np.nan
+    prev[1:] = cs[:-1]
+    prev[1:][ks[1:] != ks[:-1]] = np.nan
+    start = np.isnan(prev)
+    gone = np.isnan(cs)
+    d = np.where(start | gone, 0.0, cs - prev)
+    flow = d.copy()
+    appear = start & ~gone
+    flow[appear] = cs[appear]
+    drain = gone & ~start
+    flow[drain] = -prev[drain]
+    delta, f, dr = np.empty_like(d), np.empty_like(flow), np.empty_like(drain)
+    delta[order], f[order], dr[order] = d, flow, drain
+    return delta, f, dr
+
+
+def _flows_py(s: Series):
+    n = len(s)
+    delta = array("d", bytes(8 * n))
+    flow = array("d", bytes(8 * n))
+    drain = bytearray(n)
+    nan = float("nan")
+    last: dict = {}
+    for i, (k, c) in enumerate(zip(s.k, s.count)):
+        p = last.get(k, nan)
+        if math.isnan(p):
+            if not math.isnan(c):
+                flow[i] = c
+        elif math.isnan(c):
+            flow[i] = -p
+            drain[i] = 1
+        else:
+            delta[i] = flow[i] = c - p
+        last[k] = c
+    return delta, flow, drain
+
+
+def flows(s: Series, use_numpy: bool = True):
+    """
+    레코드별 (delta, flow, drain).
+    - delta: 건수 변화량 (양수: 등록, 음수: 소진). 공연의 첫 기록·사라짐·재등장은 거래가 아니므로 0
+    - flow: 게시 시간 계산용 흐름. delta 에 첫 기록/재등장 시 건수(+)와 사라질 때 남은 건수(-)를 더한 것
+    - drain: 공연이 페이지에서 사라진 기록 여부 (이때 빠진 매물은 게시 시간 통계에서 제외)
+    """
+    return _flows_numpy(s) if use_numpy else _flows_py(s)
+
+
+# ---- 집계 ----
+
+def _sum_by(index, weights, size: int) -> list[float]:
+    if np is not None and isinstance(weights, np.ndarray):
+        return np.bincount(np.asarray(index), weights=weights, minlength=size).tolist()
+    out = [0.0] * size
+    for i, w in zip(index, weights):
+        if w:
+            out[i] += w
+    return out
+
+
+def _split(delta):
+    if np is not None and isinstance(delta, np.ndarray):
+        return np.clip(delta, 0, None), np.clip(-delta, 0, None)
+    return array("d", (d if d > 0 else 0.0 for d in delta)), array("d", (-d if d < 0 else 0.0 for d in delta))
+
+
+def _first_last(s: Series, vec: bool) -> tuple[list, list]:
+    """키 인덱스별 첫 기록 시각과 마지막 기록 위치"""
+    if vec:
+        k = np.asarray(s.k)
+        _, first_i = np.unique(k, return_index=True)
+        _, rev_i = np.unique(k[::-1], return_index=True)
+        return np.asarray(s.t)[first_i].tolist(), (len(k) - 1 - rev_i).tolist()
+    first = [None] * len(s.keys)
+    last = [0] * len(s.keys)
+    for i, (t, k) in enumerate(zip(s.t, s.k)):
+        if first[k] is None:
+            first[k] = t
+        last[k] = i
+    return first, last
+
+
+def _dwell_numpy(s: Series, flow, drain) -> tuple[list, list]:
+    """
+    FIFO 게시 시간을 누적 등록/소진 곡선으로 계산.
+    누적 건수 구간 (lo, hi] 의 매물은 누적 등록이 처음 hi 에 이른 기록에 올라와
+    누적 소진이 처음 hi 에 이른 기록에 빠진 것
+    """
+    nk = len(s.keys)
+    k = np.asarray(s.k)
+    t = np.asarray(s.t)
+    order = np.argsort(k, kind="stable")
+    bounds = np.searchsorted(k[order], np.arange(nk + 1))
+    done, remaining = [], []
+    for i in range(nk):
+        idx = order[bounds[i]:bounds[i + 1]]
+        ti, fi, di = t[idx], flow[idx], drain[idx]
+        arr, dep = fi > 0, fi < 0
+        t_in, cum_in = ti[arr], np.cumsum(fi[arr])
+        t_out, cum_out, out_drain = ti[dep], np.cumsum(-fi[dep]), di[dep]
+        total_in = float(cum_in[-1]) if len(cum_in) else 0.0
+        matched = min(total_in, float(cum_out[-1]) if len(cum_out) else 0.0)
+        remaining.append(total_in - matched)
+        if matched <= 0:
+            done.append((np.empty(0), np.empty(0)))
+            continue
+        hi = np.unique(np.concatenate([cum_in, cum_out]))
+        hi = hi[hi <= matched]
+        width = np.diff(hi, prepend=0.0)
+        ia = np.searchsorted(cum_in, hi)
+        io = np.searchsorted(cum_out, hi)
+        keep = ~out_drain[io]
+        done.append((((t_out[io] - t_in[ia]) / 60)[keep], width[keep]))
+    return done, remaining
+
+
+def _dwell_py(s: Series, flow, drain) -> tuple[list, list]:
+    """FIFO 게시 시간. 등록 단위를 큐에 넣고 소진될 때 앞에서부터 꺼내 걸린 시간을 잰다"""
+    nk = len(s.keys)
+    queues = [deque() for _ in range(nk)]
+    done = [([], []) for _ in range(nk)]
+    for i, (t, k, f) in enumerate(zip(s.t, s.k, flow)):
+        if not f:
+            continue
+        q = queues[k]
+        if f > 0:
+            q.append([t, f])
+            continue
+        need = -f
+        minutes, units = done[k]
+        while need > 0 and q:
+            head = q[0]
+            take = min(need, head[1])
+            if not drain[i]:
+                minutes.append((t - head[0]) / 60)
+                units.append(take)
+            head[1] -= take
+            need -= take
+            if head[1] <= 0:
+                q.popleft()
+    return done, [sum(u for _, u in q) for q in queues]
+
+
+def _wquantiles(values, weights, qs, vec: bool) -> list[float | None]:
+    """가중 분위수: 누적 가중치가 처음 전체의 q 이상이 되는 값"""
+    if not len(values):
+        return [None] * len(qs)
+    if vec:
+        v = np.asarray(values, dtype=np.float64)
+        o = np.argsort(v, kind="stable")
+        v = v[o]
+        cw = np.cumsum(np.asarray(weights, dtype=np.float64)[o])
+        return [float(v[min(len(v) - 1, int(np.searchsorted(cw, cw[-1] * q)))]) for q in qs]
+    pairs = sorted(zip(values, weights), key=lambda p: p[0])
+    total = sum(weights)
+    out = []
+    for q in qs:
+        acc = 0.0
+        for v, w in pairs:
+            acc += w
+            if acc >= total * q:
+                break
+        out.append(v)
+    return out
+
+
+def _wmean(values, weights) -> float | None:
+    if np is not None and isinstance(weights, np.ndarray):
+        total = float(weights.sum())
+        return float(np.dot(values, weights)) / total if total else None
+    total = sum(weights)
+    return sum(v * w for v, w in zip(values, weights)) / total if total else None
+
+
+def analyze(s: Series, use_numpy: bool | None = None) -> dict:
+    """
+    Series 분석. use_numpy=None 이면 numpy 가 있을 때 사용. 반환:
+    {"records", "start", "end", "concerts": {키: 통계}, "heatmap": {"arrivals", "depletions"} (7×24),
+     "change_gap_sec": {"p10", "p50", "p90"}, "dwell_min": {"p10", "p50"}, "suggested_interval_sec"}
+    """
+    vec = np is not None if use_numpy is None else bool(use_numpy and np is not None)
+    n = len(s)
+    result = {"records": n, "start": None, "end": None, "concerts": {}, "heatmap": None,
+              "change_gap_sec": {}, "dwell_min": {}, "suggested_interval_sec": None}
+    if not n:
+        return result
+    delta, flow, drain = flows(s, vec)
+    pos, neg = _split(delta)
+    nk = len(s.keys)
+    arrivals = _sum_by(s.k, pos, nk)
+    depletions = _sum_by(s.k, neg, nk)
+    if vec:
+        cell = np.asarray(s.weekday, dtype=np.int_) * 24 + np.asarray(s.hour)
+    else:
+        cell = array("l", (w * 24 + h for w, h in zip(s.weekday, s.hour)))
+    heat_in = _sum_by(cell, pos, 7 * 24)
+    heat_out = _sum_by(cell, neg, 7 * 24)
+
+    t_end = s.t[-1]
+    first, last = _first_last(s, vec)
+    done, remaining = _dwell_numpy(s, flow, drain) if vec else _dwell_py(s, flow, drain)
+
+    for i, key in enumerate(s.keys):
+        j = last[i]
+        # 페이지에서 사라진 공연은 사라진 시각까지, 나머지는 마지막 기록 시각까지
+        end = s.t[j] if math.isnan(s.count[j]) else t_end
+        hours = max(0.0, end - first[i]) / 3600
+        minutes, units = done[i]
+        result["concerts"][key] = {
+            **s.info[key],
+            "last_count": None if math.isnan(s.count[j]) else int(s.count[j]),
+            "arrivals": int(arrivals[i]),
+            "depletions": int(depletions[i]),
+            "hours": hours,
+            "arrivals_per_hour": arrivals[i] / hours if hours else None,
+            "depletions_per_hour": depletions[i] / hours if hours else None,
+            "dwell_mean_min": _wmean(minutes, units),
+            "dwell_median_min": _wquantiles(minutes, units, (0.5,), vec)[0],
+            "still_listed": int(remaining[i]),
+        }
+
+    result["heatmap"] = {
+        "arrivals": [heat_in[d * 24:(d + 1) * 24] for d in range(7)],
+        "depletions": [heat_out[d * 24:(d + 1) * 24] for d in range(7)],
+    }
+    # 어떤 공연이든 건수가 바뀐 시각들 사이의 간격
+    if vec:
+        gaps = np.diff(np.unique(np.asarray(s.t)[delta != 0]))
+    else:
+        change_times = sorted({t for t, d in zip(s.t, delta) if d})
+        gaps = [b - a for a, b in zip(change_times, change_times[1:])]
+    qs = (0.1, 0.5, 0.9)
+    result["change_gap_sec"] = dict(zip(("p10", "p50", "p90"), _wquantiles(gaps, [1.0] * len(gaps), qs, vec)))
+    if vec:
+        all_min = np.concatenate([m for m, _ in done])
+        all_units = np.concatenate([u for _, u in done])
+    else:
+        all_min = [m for ms, _ in done for m in ms]
+        all_units = [u for _, us in done for u in us]
+    result["dwell_min"] = dict(zip(("p10", "p50"), _wquantiles(all_min, all_units, (0.1, 0.5), vec)))
+    result["start"] = datetime.fromtimestamp(s.t[0]).isoformat()
+    result["end"] = datetime.fromtimestamp(t_end).isoformat()
+    # 짧게 올라왔다 팔리는 매물(게시 시간 하위 10%)과 잦은 변경(간격 하위 10%)도 두 번은 볼 수 있는 간격
+    candidates = [v for v in (result["change_gap_sec"]["p10"],) if v]
+    if result["dwell_min"]["p10"]:
+        candidates.append(result["dwell_min"]["p10"] * 60)
+    if candidates:
+        result["suggested_interval_sec"] = max(MIN_INTERVAL_SEC, int(min(candidates) / 2))
+    return result
+
+
+# ---- 리포트 ----
+
+def _fmt(v, digits: int = 1) -> str:
+    return "-" if v is None else f"{v:.{digits}f}"
+
+
+def print_report(result: dict, top: int = 20):
+    print(f"== 이력 {result['records']}건, {result['start']} ~ {result['end']}")
+    concerts = sorted(result["concerts"].items(), key=lambda kv: -(kv[1]["arrivals"] + kv[1]["depletions"]))
+    print(f"{'공연':32s} {'현재':>5s} {'등록':>6s} {'소진':>6s} {'등록/h':>7s} {'소진/h':>7s} {'게시(분) 평균/중앙':>18s} {'게시중':>6s}")
+    for key, c in concerts[:top]:
+        label = f"{c['date'] or '?'} {c['time'] or '?'} {c['name'] or key}"[:32]
+        print(
+            f"{label:32s} {_fmt(c['last_count'], 0) if c['last_count'] is not None else '-':>5s} "
+            f"{c['arrivals']:6d} {c['depletions']:6d} {_fmt(c['arrivals_per_hour'], 2):>7s} "
+            f"{_fmt(c['depletions_per_hour'], 2):>7s} "
+            f"{_fmt(c['dwell_mean_min']) + ' / ' + _fmt(c['dwell_median_min']):>18s} {c['still_listed']:6d}"
+        )
+    if len(concerts) > top:
+        print(f"  ... 외 {len(concerts) - top}개 공연")
+
+    for label, grid in (("등록", result["heatmap"]["arrivals"]), ("소진", result["heatmap"]["depletions"])):
+        width = max(3, len(str(int(max(max(row) for row in grid))))) + 1
+        print(f"\n[{label} 히트맵] 요일 × 시 (건수 합)")
+        print("    " + "".join(f"{h:>{width}d}" for h in range(24)))
+        for d, row in enumerate(grid):
+            print(f"  {WEEKDAYS[d]} " + "".join(f"{int(v):>{width}d}" if v else " " * (width - 1) + "." for v in row))
+
+    g, dw = result["change_gap_sec"], result["dwell_min"]
+    print(
+        f"\n변경 간격(초) p10/p50/p90: {_fmt(g.get('p10'), 0)} / {_fmt(g.get('p50'), 0)} / {_fmt(g.get('p90'), 0)}, "
+        f"게시 시간(분) p10/p50: {_fmt(dw.get('p10'))} / {_fmt(dw.get('p50'))}"
+    )
+    if result["suggested_interval_sec"]:
+        print(f"체크 간격 참고값: {result['suggested_interval_sec']}초 (짧게 게시되는 매물도 놓치지 않을 정도)")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="매수 건수 이력 분석 리포트")
+    ap.add_argument("history", nargs="?", default=str(HISTORY_FILE), help="이력 파일 (기본: wbc_history.jsonl)")
+    ap.add_argument("--days", type=float, help="최근 N일만 분석")
+    ap.add_argument("--concert", type=int, help="이 공연 id 만 분석")
+    ap.add_argument("--utc-offset", type=float, default=0.0, help="히트맵 시간대 보정(시간). 예: 컨테이너가 UTC 면 9")
+    ap.add_argument("--top", type=int, default=20, help="표에 보여줄 공연 수 (기본 20)")
+    ap.add_argument("--json", action="store_true", help="결과를 JSON 으로 출력")
+    args = ap.parse_args(argv)
+
+    path = Path(args.history)
+    if not path.exists():
+        print(f"[오류] 이력 파일이 없습니다: {path}")
+        sys.exit(1)
+    since = datetime.now() - timedelta(days=args.days) if args.days else None
+    t0 = time.perf_counter()
+    series = load_series(iter_log(path), since=since, concert=args.concert, utc_offset=args.utc_offset)
+    t1 = time.perf_counter()
+    result = analyze(series)
+    t2 = time.perf_counter()
+    if args.json:
+        # JSON 객체 키는 문자열이어야 함 (공연 id 는 int)
+        result["concerts"] = {str(k): v for k, v in result["concerts"].items()}
+        print(wbc_json.dumps(result))
+        return
+    print_report(result, args.top)
+    print(f"(로드 {t1 - t0:.2f}s, 집계 {t2 - t1:.3f}s, {'numpy' if np is not None else 'array'})")
+
+
+if __name__ == "__main__":
+    main()
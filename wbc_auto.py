@@ -9,15 +9,19 @@ import os
 import sys
 import ctypes
 
+import wbc_log
+
 try:
     from plyer import notification
 except ImportError:
     notification = None
 
 try:
-    import requests
+    import requests  # noqa: F401  (wbc_notify 가 전송할 때 사용)
+    import wbc_notify
 except ImportError:
-    requests = None
+    # requests 미설치 시 Discord 알림 생략
+    wbc_notify = None
 
 # Discord 웹훅 — wbc_auto 전용 (모니터는 DISCORD_WEBHOOK_URL 사용)
 WBC_AUTO_DISCORD_WEBHOOK_URL = os.environ.get("WBC_AUTO_DISCORD_WEBHOOK_URL", "").strip()
@@ -40,13 +44,10 @@ def notify_windows(title, message, timeout=10):
 
 def notify_discord(title, message, is_error=False):
     """Discord 웹훅으로 @everyone 멘션과 함께 알림 전송."""
-    if not WBC_AUTO_DISCORD_WEBHOOK_URL or requests is None:
+    if not WBC_AUTO_DISCORD_WEBHOOK_URL or wbc_notify is None:
         return
     try:
-        # 임베드 description 최대 4096자 제한 — 초과 시 잘라서 전송
-        max_len = 4096
-        if len(message) > max_len:
-            message = message[: max_len - 20] + "\n...[잘림]"
+        # 임베드 description 4096자 제한 — 초과 시 여러 임베드/메시지로 나눠서 전송
         payload = {
             "content": "@everyone",
             "allowed_mentions": {"parse": ["everyone"]},
@@ -56,9 +57,7 @@ def notify_discord(title, message, is_error=False):
                 "color": 0xE74C3C if is_error else 0x00AA00,
             }],
         }
-        r = requests.post(WBC_AUTO_DISCORD_WEBHOOK_URL, json=payload, timeout=10)
-        if r.status_code not in (200, 204):
-            print(f"[Discord] 전송 실패: {r.status_code} {r.text[:200]}")
+        wbc_notify.deliver(WBC_AUTO_DISCORD_WEBHOOK_URL, payload)
     except Exception as e:
         print(f"[Discord] 오류: {e}")
 
@@ -259,6 +258,8 @@ if __name__ == "__main__":
         print("listings ID가 비어 있습니다. 종료합니다.")
         sys.exit(1)
     listings_url = f"https://tradead.tixplus.jp/wbc2026/buy/bidding/listings/{listing_id}"
+    # WBC_LOG_FILE 이 있으면 시도마다 JSON 로그 (WBC_TRACE=1 이면 단계별 시간 포함)
+    wbc_log.setup_from_env()
 
     # Chrome 드라이버 설정
     options = Options()
@@ -272,12 +273,18 @@ if __name__ == "__main__":
 
         # 로그인 이후만 반복: 리스팅 이동 → 티켓 클릭 → 결제 플로우 (에러 나면 여기서만 재시도)
         while True:
+            cycle = wbc_log.start_cycle(f"auto:{listing_id}")
             try:
-                driver.get(listings_url)
-                click_available_tickets(driver)
-                complete_purchase_flow(driver)
+                with wbc_log.stage("navigate"):
+                    driver.get(listings_url)
+                with wbc_log.stage("click"):
+                    click_available_tickets(driver)
+                with wbc_log.stage("purchase"):
+                    complete_purchase_flow(driver)
+                wbc_log.end_cycle(cycle, outcome="done")
                 break
             except Exception as e:
+                wbc_log.end_cycle(cycle, outcome="error", error=str(e))
                 # 요청대로: 에러 메시지만 알려주고, 로그인 이후 단계만 재시도
                 err_msg = f"Execution failed: {e}. 로그인 이후 단계부터 재시도합니다."
                 print(err_msg)
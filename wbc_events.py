@@ -0,0 +1,109 @@
+"""
+감시 대상 이벤트(tradead 이벤트 페이지) 설정
+하나의 프로세스가 여러 이벤트 slug 를 감시할 수 있도록, 이벤트마다
+URL·대상 공연 ID·웹훅·체크 간격과 상태 파일(네임스페이스), 실행 상태를 따로 둔다.
+
+설정 파일(JSON) 예:
+{
+  "events": [
+    {"slug": "wbc2026", "title": "WBC 2026", "target_ids": [1519, 1520], "interval": 60},
+    {"slug": "other2026", "webhook_env": "OTHER_WEBHOOK_URL", "interval": 90}
+  ]
+}
+"""
+
+import json
+import os
+from pathlib import Path
+
+SITE_URL = "https://tradead.tixplus.jp"
+DEFAULT_SLUG = "wbc2026"
+# 체크 간격 최소값(초). 너무 짧으면 서버가 봇으로 인식해 빈 페이지/차단할 수 있음
+MIN_INTERVAL_SEC = 30
+
+_BASE_DIR = Path(__file__).parent
+
+
+class Event:
+    """감시할 이벤트 페이지 하나의 설정과 실행 상태"""
+
+    def __init__(
+        self,
+        slug: str,
+        url: str | None = None,
+        title: str | None = None,
+        target_ids=(),
+        webhook: str = "",
+        interval: int = 60,
+        state_file: Path | None = None,
+        history_file: Path | None = None,
+    ):
+        self.slug = slug
+        self.url = url or f"{SITE_URL}/{slug}"
+        self.title = title or slug
+        self.target_ids = set(target_ids)
+        self.webhook = (webhook or "").strip()
+        self.interval = max(MIN_INTERVAL_SEC, int(interval))
+        # 기본 이벤트는 기존 파일 이름을 그대로 사용 (업그레이드해도 상태 유지)
+        suffix = "" if slug == DEFAULT_SLUG else f"_{slug}"
+        self.state_file = Path(state_file) if state_file else _BASE_DIR / f"wbc_state{suffix}.json"
+        self.history_file = Path(history_file) if history_file else _BASE_DIR / f"wbc_history{suffix}.jsonl"
+        # 알림 아웃박스는 이력 로그와 같은 폴더 (상태와 함께 공유 볼륨에 둠)
+        self.outbox_file = self.history_file.with_name(f"wbc_outbox{suffix}.jsonl")
+
+        # 실행 상태
+        self.tag = ""  # 로그 접두어. 여러 이벤트를 감시할 때 "[slug] "
+        self.validators: dict[str, str] = {}  # 조건부 GET 용 ETag / Last-Modified
+        self.last_page_hash: int | None = None  # 직전에 처리한 data-page 원문 해시
+        self.history = None  # HistoryStore (처음 사용할 때 로드)
+        self.outbox = None  # wbc_outbox.Outbox (처음 사용할 때 로드)
+        self.last_timing: dict | None = None  # 직전 페이지 요청 시간 기록
+        self.retry_after = 0.0  # 서버가 429/503 에 준 Retry-After(초). 스케줄러가 참고
+        # 주기 통계: 전체 주기, 304 응답으로 생략, data-page 해시 동일로 생략, 네트워크 제외 처리 시간 합
+        self.stats = {"cycles": 0, "not_modified": 0, "unchanged_hash": 0, "proc_sec": 0.0}
+
+    def __repr__(self):
+        return f"Event({self.slug!r}, interval={self.interval})"
+
+
+def load_events(path, default_webhook: str = "", default_interval: int = 60) -> list[Event]:
+    """
+    JSON 설정 파일에서 이벤트 목록 로드.
+    webhook 이 없으면 webhook_env 로 지정한 환경 변수, 그것도 없으면 default_webhook 사용
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    entries = data.get("events") if isinstance(data, dict) else data
+    if not entries:
+        raise ValueError(f"{path}: events 목록이 비어있습니다")
+    if not isinstance(entries, list):
+        raise ValueError(f"{path}: events 는 목록이어야 합니다")
+
+    events = []
+    seen = set()
+    for entry in entries:
+        if not isinstance(entry, dict):
+            raise ValueError(f"{path}: 이벤트 항목은 객체여야 합니다: {entry!r}")
+        slug = entry.get("slug")
+        if not slug:
+            raise ValueError(f"{path}: slug 가 없는 이벤트가 있습니다: {entry}")
+        if slug in seen:
+            raise ValueError(f"{path}: 같은 slug 가 두 번 있습니다: {slug}")
+        seen.add(slug)
+        webhook = entry.get("webhook")
+        if not webhook and entry.get("webhook_env"):
+            webhook = os.environ.get(entry["webhook_env"], "")
+        events.append(Event(
+            slug,
+            url=entry.get("url"),
+            title=entry.get("title"),
+            target_ids=entry.get("target_ids") or (),
+            webhook=webhook or default_webhook,
+            interval=entry.get("interval") or default_interval,
+            state_file=entry.get("state_file"),
+            history_file=entry.get("history_file"),
+        ))
+    if len(events) > 1:
+        for ev in events:
+            ev.tag = f"[{ev.slug}] "
+    return events
@@ -0,0 +1,152 @@
+"""
+data-page 속성 추출기
+BeautifulSoup 전체 트리를 만들지 않고 div#app 의 data-page 속성만 한 번 훑어서 찾고,
+그 조각만 unescape 한 뒤 props.concerts 부분만 JSON 디코딩한다.
+orjson 이 있으면(wbc_json) 부분 디코딩 대신 전체를 한 번에 디코딩하는 편이 더 빠르다.
+BeautifulSoup 은 대체 경로에서만 쓰므로 필요할 때 import 한다.
+"""
+
+import html
+import json
+import re
+
+import wbc_json
+import wbc_log
+
+_APP_MARKERS = ('id="app"', "id='app'")
+_ATTR_MARKERS = ('data-page="', "data-page='")
+_WS = re.compile(r"[ \t\n\r]*")
+
+_decoder = json.JSONDecoder()
+
+
+def find_data_page(html_text: str) -> tuple[str | None, str]:
+    """
+    div#app 의 data-page 속성 원문(HTML 엔티티 포함)을 찾는다.
+    반환: (속성 원문 또는 None, 디버그 메시지)
+    """
+    for marker in _APP_MARKERS:
+        pos = html_text.find(marker)
+        if pos != -1:
+            break
+    else:
+        return None, "div#app 요소를 찾을 수 없습니다"
+
+    # id 가 있는 태그의 시작/끝. 속성값 안의 < > 는 엔티티로 escape 되어 있으므로 그대로 찾아도 됨
+    tag_start = html_text.rfind("<", 0, pos)
+    tag_end = html_text.find(">", pos)
+    if tag_start == -1 or tag_end == -1 or not html_text.startswith("<div", tag_start):
+        return None, "div#app 요소를 찾을 수 없습니다"
+
+    for attr in _ATTR_MARKERS:
+        start = html_text.find(attr, tag_start, tag_end)
+        if start != -1:
+            start += len(attr)
+            end = html_text.find(attr[-1], start)
+            if end == -1:
+                return None, "data-page 속성이 닫히지 않았습니다"
+            return html_text[start:end], ""
+    return None, "div#app에 data-page 속성이 없습니다"
+
+
+def _member(text: str, pos: int, name: str) -> int | None:
+    """
+    text[pos] 에서 시작하는 JSON 객체의 최상위 멤버 name 값이 시작하는 위치. 없으면 None.
+    앞선 멤버의 값은 raw_decode 로 건너뛰므로 중첩 객체 안의 같은 이름 키에는 걸리지 않음
+    """
+    if text[pos] != "{":
+        return None
+    i = _WS.match(text, pos + 1).end()
+    if text[i] == "}":
+        return None
+    while True:
+        key, i = _decoder.raw_decode(text, i)
+        i = _WS.match(text, i).end()
+        if text[i] != ":":
+            return None
+        i = _WS.match(text, i + 1).end()
+        if key == name:
+            return i
+        _, i = _decoder.raw_decode(text, i)
+        i = _WS.match(text, i).end()
+        if text[i] != ",":
+            return None
+        i = _WS.match(text, i + 1).end()
+
+
+def _scan_concerts(data_json: str) -> list | None:
+    """props.concerts 배열만 잘라 디코딩. 위치를 못 찾거나 공연 목록 모양이 아니면 None"""
+    try:
+        props = _member(data_json, _WS.match(data_json).end(), "props")
+        if props is None:
+            return None
+        pos = _member(data_json, props, "concerts")
+        if pos is None:
+            return None
+        value, _ = _decoder.raw_decode(data_json, pos)
+    except (json.JSONDecodeError, IndexError):
+        return None
+    # 빈 배열은 전체 디코딩 경로에서 원인 메시지(props 키 목록)를 만들도록 넘김
+    if value and isinstance(value, list) and all(isinstance(c, dict) and "id" in c for c in value):
+        return value
+    return None
+
+
+def decode_concerts(raw: str) -> tuple[list[dict] | None, str]:
+    """
+    data-page 원문에서 props.concerts 배열만 디코딩 (props 객체의 최상위 멤버만 인정).
+    concerts 배열 위치를 바로 찾지 못하거나 비어 있으면 전체 JSON 을 디코딩한다.
+    반환: (concerts 리스트 또는 None, 디버그 메시지)
+    """
+    with wbc_log.stage("unescape"):
+        data_json = html.unescape(raw)
+
+    # 표준 json 은 concerts 배열만 잘라 디코딩 (orjson 은 raw_decode 가 없고 전체 디코딩도 충분히 빠름)
+    with wbc_log.stage("decode"):
+        if wbc_json.orjson is None:
+            concerts = _scan_concerts(data_json)
+            if concerts is not None:
+                return concerts, ""
+
+        try:
+            data = wbc_json.loads(data_json)
+        except ValueError as e:
+            return None, f"data-page JSON 파싱 실패: {e}. data-page 길이: {len(raw)}자"
+        except Exception as e:
+            return None, f"data-page 처리 중 오류: {e}"
+
+    props = data.get("props", {}) if isinstance(data, dict) else {}
+    concerts = props.get("concerts", [])
+    if not concerts:
+        return None, f"concerts 배열이 비어있습니다. props 키: {list(props.keys())}"
+    return concerts, ""
+
+
+def _find_data_page_bs4(html_text: str) -> tuple[str | None, str]:
+    """BeautifulSoup 으로 data-page 찾기 (스캐너가 실패했을 때만 사용)"""
+    try:
+        from bs4 import BeautifulSoup
+    except ImportError:
+        return None, "BeautifulSoup4가 설치되지 않았습니다. 'pip install beautifulsoup4' 실행 필요"
+    soup = BeautifulSoup(html_text, "html.parser")
+    app_div = soup.find("div", id="app")
+    if not app_div:
+        return None, "div#app 요소를 찾을 수 없습니다"
+    if "data-page" not in app_div.attrs:
+        return None, "div#app에 data-page 속성이 없습니다"
+    # bs4 는 이미 엔티티를 풀어 두므로 decode_concerts 에서 다시 unescape 해도 안전하도록 재escape
+    return html.escape(app_div["data-page"]), ""
+
+
+def extract_concerts(html_text: str) -> tuple[list[dict], str]:
+    """
+    HTML 에서 props.concerts 추출. 스캐너 → BeautifulSoup 순서로 시도.
+    반환: (concerts 리스트, 디버그 메시지)
+    """
+    raw, debug_msg = find_data_page(html_text)
+    if raw is None:
+        raw, debug_msg = _find_data_page_bs4(html_text)
+        if raw is None:
+            return [], debug_msg
+    concerts, debug_msg = decode_concerts(raw)
+    return concerts or [], debug_msg
@@ -0,0 +1,335 @@
+"""
+매수 건수 이력 저장소
+- wbc_history.jsonl: 건수가 바뀐 공연만 한 줄씩 추가(append-only)하는 이력 로그
+- wbc_state.json: 최신 상태 체크포인트. 임시 파일에 쓴 뒤 os.replace 로 원자적 교체
+메모리에는 공연 id → 최신 레코드 인덱스를 유지해 최신 건수 조회는 O(1).
+시작 시에는 체크포인트를 읽고, 체크포인트 이후에 추가된 로그 꼬리만 다시 적용한다.
+압축한 로그는 첫 줄에 세대 번호({"gen": N})를 두고 체크포인트에도 같은 번호를 기록한다.
+압축한 로그로 교체한 뒤 체크포인트를 쓰기 전에 죽으면 두 번호가 달라지므로, 그때는 체크포인트의
+오프셋(이전 로그 기준)을 버리고 로그 전체를 체크포인트 위에 다시 적용한다 (순서대로 적용하면 결과는 같음).
+"""
+
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import wbc_json
+import wbc_log
+from wbc_records import Concert, as_concert
+
+
+def record_key(c):
+    """이력/인덱스 키. 공연 id 가 있으면 id, 없으면 날짜_시간 (Concert 또는 dict)"""
+    if isinstance(c, Concert):
+        return c.key
+    cid = c.get("id")
+    return cid if cid is not None else f"{c.get('date')}_{c.get('time')}"
+
+
+def new_placeholder(c: Concert) -> Concert:
+    """이전 상태에 없던 공연의 '이전 값' (건수 0)"""
+    return c.with_count(0)
+
+
+_dumps = wbc_json.dumps
+
+
+class HistoryStore:
+    """append-only 이력 로그 + 원자적 체크포인트 + 메모리 인덱스"""
+
+    def __init__(
+        self,
+        checkpoint_path: Path,
+        log_path: Path,
+        checkpoint_every: int = 50,
+        compact_bytes: int = 8 * 1024 * 1024,
+        retention_days: int = 0,
+    ):
+        self.checkpoint_path = Path(checkpoint_path)
+        self.log_path = Path(log_path)
+        self.checkpoint_every = checkpoint_every  # 로그 레코드 N개마다 체크포인트
+        self.compact_bytes = compact_bytes  # 로그가 이 크기를 넘으면 압축
+        self.retention_days = retention_days  # 0 이면 이력을 모두 보관
+        self.latest: dict = {}  # record_key → 최신 레코드(Concert)
+        self.updated: str | None = None
+        # 마지막 update 에서 페이지에 새로 나타난 / 사라진 공연 키 (공연별 게이지 정리용)
+        self.added: list = []
+        self.removed: list = []
+        self._log_offset = 0  # 체크포인트에 반영된 로그 바이트 위치
+        self._log_gen = 0  # 로그 세대 (압축할 때마다 +1, 헤더 줄이 없는 로그는 0)
+        self._pending = 0  # 체크포인트 이후 추가된 레코드 수
+        self.load()
+
+    # ---- 조회 ----
+
+    def get(self, key):
+        """공연 키의 최신 레코드. 없으면 None"""
+        return self.latest.get(key)
+
+    def counts(self) -> list[Concert]:
+        """최신 상태 리스트 (마지막 조회 순서)"""
+        return list(self.latest.values())
+
+    # ---- 로드 ----
+
+    def load(self):
+        """체크포인트를 읽고, 체크포인트 이후의 로그 꼬리를 적용"""
+        self.latest = {}
+        self.updated = None
+        self._log_offset = 0
+        self._log_gen = 0
+        if self.checkpoint_path.exists():
+            try:
+                data = wbc_json.loads(self.checkpoint_path.read_bytes())
+                for d in data.get("counts") or []:
+                    c = Concert.from_dict(d)
+                    self.latest[c.key] = c
+                self.updated = data.get("updated")
+                self._log_offset = int(data.get("log_offset") or 0)
+                self._log_gen = int(data.get("log_gen") or 0)
+            except (IOError, ValueError):
+                pass
+        log_gen = _read_gen(self.log_path)
+        if log_gen != self._log_gen:
+            # 압축 직후 체크포인트 전에 종료됨 → 오프셋은 이전 로그 기준이라 쓸 수 없음
+            print(f"[이력] 로그 세대({log_gen})가 체크포인트({self._log_gen})와 달라 로그 전체를 다시 적용합니다")
+            self._log_offset = 0
+            self._log_gen = log_gen
+        self._pending = self._replay_tail()
+
+    def _replay_tail(self) -> int:
+        if not self.log_path.exists():
+            self._log_offset = 0
+            return 0
+        size = self.log_path.stat().st_size
+        if self._log_offset > size:
+            # 로그가 체크포인트보다 짧아짐(수동 삭제 등) → 체크포인트만 신뢰
+            self._log_offset = size
+            return 0
+        applied = 0
+        with open(self.log_path, "rb") as f:
+            f.seek(self._log_offset)
+            for line in f:
+                try:
+                    rec = wbc_json.loads(line)
+                except ValueError:
+                    # 비정상 종료로 잘린 마지막 줄은 무시
+                    continue
+                if _is_header(rec):
+                    continue
+                self._apply(rec)
+                applied += 1
+        return applied
+
+    def _apply(self, rec: dict):
+        key = rec["id"] if rec.get("id") is not None else rec.get("k")
+        if rec.get("count") is None:
+            self.latest.pop(key, None)
+        else:
+            cur = self.latest.get(key)
+            if cur is None:
+                cur = Concert(rec.get("id"), rec.get("date"), rec.get("time"), rec.get("name"), rec["count"])
+            elif "name" in rec:
+                # 정보 필드는 항상 함께 기록됨
+                cur = Concert(cur.id, rec.get("date"), rec.get("time"), rec.get("name"), rec["count"])
+            else:
+                cur = cur.with_count(rec["count"])
+            self.latest[key] = cur
+        self.updated = rec.get("t", self.updated)
+
+    # ---- 기록 ----
+
+    def update(
+        self, counts: list[Concert], now: datetime | None = None, journal=None
+    ) -> list[tuple[Concert, Concert]]:
+        """
+        새 조회 결과를 메모리 인덱스에 반영하고 바뀐 공연만 로그에 추가 (한 번 순회).
+        건수가 같은 공연은 아무것도 만들지 않는다.
+        journal: 알림 대상 변경이나 사라진 공연이 있으면 로그에 쓰기 직전에 journal(changes, removed) 호출
+        (알림 아웃박스).
+        여기서 예외가 나면 로그도 쓰지 않으므로 다음 주기에 같은 변경을 다시 감지한다
+        반환: 알림 대상 변경 (old_item, new_item) 리스트 — 건수가 바뀐 공연, 새로 생긴 공급(건수 > 0)
+        새로 나타난·사라진 공연 키는 self.added / self.removed 에 남는다
+        """
+        latest = self.latest
+        changes = []
+        added = []
+        removed = []
+        lines = []
+        ts = None
+        n_before = len(latest)
+        n_known = 0
+        for c in counts:
+            key = c.key
+            old = latest.get(key)
+            if old is not None:
+                n_known += 1
+                same_info = old.same_info(c)
+                if old.count == c.count and same_info:
+                    continue
+            if ts is None:
+                ts = (now or datetime.now()).isoformat()
+            rec = {"t": ts, "id": c.id}
+            if c.id is None:
+                rec["k"] = key
+            # 공연 정보(날짜·시간·이름)는 처음 등장하거나 바뀔 때만 기록
+            if old is None or not same_info:
+                rec["date"], rec["time"], rec["name"] = c.date, c.time, c.name
+            rec["count"] = c.count
+            lines.append(_dumps(rec))
+            if old is None:
+                added.append(key)
+                if c.count > 0:
+                    # 새로 생긴 공급
+                    changes.append((new_placeholder(c), c))
+            elif old.count != c.count:
+                changes.append((old, c))
+            latest[key] = c
+
+        # 기존 키를 모두 다시 만났으면 사라진 공연 없음 (집합을 만들지 않음)
+        if n_known < n_before:
+            present = {c.key for c in counts}
+            for key in [k for k in latest if k not in present]:
+                old = latest.pop(key)
+                removed.append(key)
+                if ts is None:
+                    ts = (now or datetime.now()).isoformat()
+                # 페이지에서 사라진 공연은 count=null 레코드로 기록
+                rec = {"t": ts, "id": old.id, "count": None}
+                if old.id is None:
+                    rec["k"] = key
+                lines.append(_dumps(rec))
+
+        self.updated = (now or datetime.now()).isoformat() if ts is None else ts
+        self.added, self.removed = added, removed
+        with wbc_log.stage("persist"):
+            if (changes or removed) and journal is not None:
+                journal(changes, removed)
+            if lines:
+                self._append(lines)
+                self._pending += len(lines)
+            if self._pending >= self.checkpoint_every:
+                self.checkpoint()
+            if self.compact_bytes and self._log_size() > self.compact_bytes:
+                self.compact()
+        return changes
+
+    def record(self, counts: list, now: datetime | None = None):
+        """update() 와 같지만 변경 내역은 버림 (save_state 용). 예전 형식의 dict 도 받음"""
+        self.update([as_concert(c) for c in counts], now)
+
+    def _append(self, lines: list[str]):
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _log_size(self) -> int:
+        try:
+            return self.log_path.stat().st_size
+        except OSError:
+            return 0
+
+    @staticmethod
+    def _atomic_write(path: Path, text: str):
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def checkpoint(self):
+        """최신 상태를 체크포인트 파일에 원자적으로 기록"""
+        self._log_offset = self._log_size()
+        self._atomic_write(self.checkpoint_path, _dumps({
+            "counts": [c.to_dict() for c in self.latest.values()],
+            "updated": self.updated,
+            "log_offset": self._log_offset,
+            "log_gen": self._log_gen,
+        }))
+        self._pending = 0
+
+    def compact(self):
+        """
+        이력 로그 압축: 같은 공연의 직전 값과 건수가 같은 중복 레코드와
+        보관 기간(retention_days)이 지난 레코드를 제거한 뒤 새 세대 헤더를 붙여 원자적으로 교체하고 체크포인트.
+        보관 기간이 지난 레코드를 뺀 공연은 그 시점의 마지막 상태(정보 필드 포함)를 기준 레코드 하나로 남긴다
+        (정보 필드는 처음 등장·변경 때만 기록되므로, 빼 버리면 로그만으로 다시 만들 때 날짜·이름을 잃음)
+        """
+        if not self.log_path.exists():
+            return
+        cutoff = None
+        if self.retention_days:
+            cutoff = (datetime.now() - timedelta(days=self.retention_days)).isoformat()
+        last_count: dict = {}
+        dropped: dict = {}  # 키 → 보관 기간이 지나 뺀 레코드들을 합친 마지막 상태
+        kept = []
+        with open(self.log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = wbc_json.loads(line)
+                except ValueError:
+                    continue
+                if _is_header(rec):
+                    continue
+                key = rec["id"] if rec.get("id") is not None else rec.get("k")
+                # 이름 등 정보 필드가 있는 레코드는 정보 변경 기록이므로 유지
+                if key in last_count and last_count[key] == rec.get("count") and "name" not in rec:
+                    continue
+                last_count[key] = rec.get("count")
+                if cutoff and rec.get("t", "") < cutoff:
+                    prev = dropped.get(key)
+                    if "name" not in rec and prev is not None and prev.get("count") is not None:
+                        rec = {**prev, "t": rec.get("t"), "count": rec.get("count")}
+                    dropped[key] = rec
+                    continue
+                kept.append(line.rstrip("\n"))
+        # 아직 페이지에 있는 공연의 기준 레코드 (모두 cutoff 이전이므로 남긴 레코드보다 앞에 시각 순으로)
+        base = sorted((r for r in dropped.values() if r.get("count") is not None), key=lambda r: r.get("t", ""))
+        gen = self._log_gen + 1
+        self._atomic_write(self.log_path, "\n".join([_dumps({"gen": gen})] + [_dumps(r) for r in base] + kept) + "\n")
+        self._log_gen = gen
+        # 압축해도 줄지 않는 경우 매 주기 압축하지 않도록 기준을 늘림
+        self.compact_bytes = max(self.compact_bytes, self._log_size() * 2)
+        self.checkpoint()
+
+    def close(self):
+        if self._pending:
+            self.checkpoint()
+
+    # ---- 이력 ----
+
+    def iter_history(self):
+        """로그 레코드 전체를 순서대로 반환 (시계열 분석용)"""
+        return iter_log(self.log_path)
+
+
+def _is_header(rec) -> bool:
+    """압축한 로그의 첫 줄 세대 헤더인지"""
+    return isinstance(rec, dict) and "gen" in rec and "t" not in rec
+
+
+def _read_gen(log_path: Path) -> int:
+    """로그 첫 줄의 세대 번호. 헤더가 없거나(압축 전 로그) 파일이 없으면 0"""
+    try:
+        with open(log_path, "rb") as f:
+            rec = wbc_json.loads(f.readline())
+    except (OSError, ValueError):
+        return 0
+    return int(rec["gen"]) if _is_header(rec) else 0
+
+
+def iter_log(log_path):
+    """이력 로그 파일의 레코드를 순서대로 반환. 파일이 없으면 빈 반복, 잘린 줄·세대 헤더는 건너뜀"""
+    log_path = Path(log_path)
+    if not log_path.exists():
+        return
+    with open(log_path, "rb") as f:
+        for line in f:
+            try:
+                rec = wbc_json.loads(line)
+            except ValueError:
+                continue
+            if not _is_header(rec):
+                yield rec
@@ -0,0 +1,29 @@
+"""
+JSON 백엔드
+orjson 이 설치되어 있으면 사용하고, 없으면 표준 json 으로 대체한다.
+dumps 는 두 경우 모두 공백 없는 한 줄 문자열(ensure_ascii=False)을 반환.
+디코딩 오류는 두 경우 모두 ValueError 의 하위 클래스.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+if orjson is not None:
+    def loads(data):
+        return orjson.loads(data)
+
+    def dumps(obj) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+
+else:
+    def loads(data):
+        return json.loads(data)
+
+    def dumps(obj) -> str:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
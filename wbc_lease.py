@@ -0,0 +1,217 @@
+"""
+여러 모니터 복제본 중 하나만 조회하도록 하는 리더 임대(lease)
+같은 상태 파일을 공유하는 컨테이너 두 개 이상을 띄울 때, 임대를 가진 하나(리더)만 run_once 를 실행한다.
+- 임대 레코드: holder(보유자 id), epoch(보유자가 바뀔 때마다 +1), expires / heartbeat(벽시계 초)
+- 리더는 하트비트 스레드가 ttl/3 마다 expires 를 연장. 프로세스가 죽거나 멈추면 ttl 뒤 만료됨
+- 대기 복제본은 자기 주기마다 임대를 확인하고, 만료됐으면 가져가 리더가 됨
+  (만료 후 한 간격 안에 인계). 리더가 바뀌면 on_change 로 알려 메모리 상태를 디스크에서 다시 읽게 함
+- 저장소는 교체 가능: 기본은 공유 파일 + fcntl 잠금(FileLeaseStore). LeaseStore 의 read / update 만 구현하면 됨
+만료 판단에 벽시계를 쓰므로 복제본 사이 시계 차이는 ttl 보다 충분히 작아야 한다.
+"""
+
+import abc
+import os
+import socket
+import threading
+import time
+from pathlib import Path
+
+import wbc_json
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+class LeaseStore(abc.ABC):
+    """임대 레코드 저장소. update(fn) 은 잠금 안에서 현재 레코드로 fn 을 호출하고, 반환값이 있으면 기록"""
+
+    @abc.abstractmethod
+    def read(self) -> dict | None:
+        """현재 레코드 (없으면 None)"""
+
+    @abc.abstractmethod
+    def update(self, fn) -> dict | None:
+        """fn(현재 레코드 또는 None) → 새 레코드(기록) 또는 None(그대로). 반환: 최종 레코드"""
+
+
+class MemoryLeaseStore(LeaseStore):
+    """한 프로세스 안에서만 공유되는 저장소 (테스트·단일 호스트 여러 스레드용)"""
+
+    def __init__(self):
+        self._record = None
+        self._lock = threading.Lock()
+
+    def read(self):
+        with self._lock:
+            return dict(self._record) if self._record else None
+
+    def update(self, fn):
+        with self._lock:
+            new = fn(dict(self._record) if self._record else None)
+            if new is not None:
+                self._record = dict(new)
+            return dict(self._record) if self._record else None
+
+
+class FileLeaseStore(LeaseStore):
+    """
+    공유 볼륨의 JSON 파일 하나. 읽기·쓰기는 flock(LOCK_EX) 안에서 하므로 여러 프로세스가 동시에 갱신해도 안전.
+    잠금은 파일 자체가 아니라 옆의 .lock 파일에 걸어, 기록은 임시 파일 + os.replace 로 원자적으로 교체
+    """
+
+    def __init__(self, path):
+        if fcntl is None:
+            raise RuntimeError("FileLeaseStore 는 fcntl 이 있는 OS(리눅스·macOS)에서만 쓸 수 있습니다")
+        self.path = Path(path)
+        self.lock_path = self.path.with_name(self.path.name + ".lock")
+
+    def _read(self) -> dict | None:
+        try:
+            data = wbc_json.loads(self.path.read_bytes())
+        except (OSError, ValueError):
+            return None
+        return data if isinstance(data, dict) and data.get("holder") else None
+
+    def read(self):
+        return self._read()
+
+    def update(self, fn):
+        with open(self.lock_path, "a+b") as lock:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            try:
+                cur = self._read()
+                new = fn(dict(cur) if cur else None)
+                if new is None:
+                    return cur
+                tmp = self.path.with_name(self.path.name + ".tmp")
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.write(wbc_json.dumps(new))
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, self.path)
+                return new
+            finally:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+
+def load_store(path: str, factory: str = "") -> LeaseStore:
+    """
+    임대 저장소 생성. factory 가 "모듈:함수" 면 그 함수(path) 결과를, 없으면 FileLeaseStore(path)
+    (예: 다른 공유 저장소를 쓰는 LeaseStore 구현을 WBC_LEASE_STORE 로 지정)
+    """
+    if not factory:
+        return FileLeaseStore(path)
+    import importlib
+
+    module, _, name = factory.partition(":")
+    return getattr(importlib.import_module(module), name or "make_store")(path)
+
+
+def default_holder() -> str:
+    """복제본 id: 호스트 이름(컨테이너 id) + pid"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class LeaderElector:
+    """
+    임대 획득·연장·반납. ensure() 는 조회 주기 직전에 메인 루프에서 부르고,
+    하트비트 스레드(start)는 긴 백오프 대기 중에도 리더가 임대를 잃지 않도록 연장만 한다.
+    리더 여부가 바뀌면(또는 다시 얻어 epoch 가 바뀌면) ensure() 를 부른 스레드에서 on_change(leader, record) 호출
+    """
+
+    def __init__(self, store: LeaseStore, holder: str | None = None, ttl: float = 60.0, clock=time.time, on_change=None):
+        self.store = store
+        self.holder = holder or default_holder()
+        self.ttl = float(ttl)
+        self.clock = clock
+        self.on_change = on_change
+        self.record: dict | None = None  # 마지막으로 본 임대 레코드
+        self._lock = threading.Lock()
+        self._reported = None  # on_change 로 마지막에 알린 (리더 여부, epoch). 첫 ensure 는 항상 알림
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def is_leader(self) -> bool:
+        rec = self.record
+        return bool(rec) and rec.get("holder") == self.holder and rec.get("expires", 0) > self.clock()
+
+    def _claim(self, cur: dict | None, acquire: bool) -> dict | None:
+        now = self.clock()
+        mine = cur is not None and cur.get("holder") == self.holder
+        if not mine:
+            if not acquire or (cur is not None and cur.get("expires", 0) > now):
+                return None  # 다른 복제본이 보유 중이거나, 연장만 하는 호출
+        epoch = cur.get("epoch", 0) if mine else (cur.get("epoch", 0) if cur else 0) + 1
+        return {
+            "holder": self.holder,
+            "epoch": epoch,
+            "acquired": cur.get("acquired", now) if mine else now,
+            "heartbeat": now,
+            "expires": now + self.ttl,
+        }
+
+    def ensure(self) -> bool:
+        """임대가 비었거나 만료됐으면 가져오고, 내 것이면 연장. 반환: 지금 리더인지"""
+        with self._lock:
+            self.record = self.store.update(lambda cur: self._claim(cur, acquire=True))
+            leader = self.is_leader
+            state = (leader, self.record.get("epoch") if leader else None)
+            changed = state != self._reported
+            self._reported = state
+        if changed and self.on_change is not None:
+            self.on_change(leader, self.record)
+        return leader
+
+    def renew(self) -> bool:
+        """내가 보유 중일 때만 연장 (하트비트용). 반환: 연장했는지"""
+        with self._lock:
+            self.record = self.store.update(lambda cur: self._claim(cur, acquire=False))
+            return self.is_leader
+
+    def release(self):
+        """보유 중이면 즉시 만료시켜 대기 복제본이 다음 주기에 바로 가져가게 함"""
+        self.stop()
+
+        def expire(cur):
+            if cur is None or cur.get("holder") != self.holder:
+                return None
+            return {**cur, "expires": 0}
+
+        with self._lock:
+            self.record = self.store.update(expire)
+
+    def start(self):
+        """하트비트 스레드 시작 (ttl/3 마다 renew)"""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._heartbeat, name="wbc-lease", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _heartbeat(self):
+        while not self._stop.wait(self.ttl / 3):
+            try:
+                self.renew()
+            except OSError as e:
+                # 공유 볼륨 일시 오류: 다음 하트비트에서 다시 시도 (그 사이 만료되면 메인 루프가 리더 상실을 처리)
+                print(f"[임대] 하트비트 실패: {e}")
+
+
+def from_env(min_interval: float, on_change=None) -> LeaderElector | None:
+    """WBC_LEASE_FILE / WBC_LEASE_ID / WBC_LEASE_TTL / WBC_LEASE_STORE 로 생성. WBC_LEASE_FILE 이 없으면 None"""
+    path = os.environ.get("WBC_LEASE_FILE", "")
+    if not path:
+        return None
+    # 기본 ttl 은 가장 짧은 체크 간격. 리더가 죽으면 ttl 뒤 만료, 대기 쪽은 한 간격 안에 인계
+    ttl = float(os.environ.get("WBC_LEASE_TTL", "0") or 0) or float(min_interval)
+    store = load_store(path, os.environ.get("WBC_LEASE_STORE", ""))
+    return LeaderElector(store, os.environ.get("WBC_LEASE_ID") or None, ttl=ttl, on_change=on_change)
@@ -0,0 +1,274 @@
+"""
+구조화 로그 (JSON lines)와 주기별 단계 추적
+사람이 읽는 print 로그는 그대로 두고, 집계·시간 분석용 기록을 한 줄에 JSON 하나로 따로 남긴다.
+- 모든 기록에 ts, level, msg 와 (주기 안이면) cycle id, event slug 가 붙음
+- 로그 호출은 큐에 넣기만 하고(QueueHandler) 파일 쓰기는 QueueListener 스레드가 함.
+  큐가 가득 차면 기다리지 않고 버리며 dropped 로 셈
+- 단계 추적(stage): fetch / scan / unescape / decode / build / diff / persist / notify 구간 시간을 재
+  단계마다 한 줄, 주기 끝에 단계별 합계를 담은 cycle 요약 한 줄을 남김 (중첩 구간은 안쪽 시간을 뺀 값)
+  추적이 꺼져 있으면 stage() 는 아무것도 하지 않는 공용 객체를 돌려주므로 비용이 거의 없음
+  실행 중 set_tracing() 이나 SIGUSR2 로 켜고 끌 수 있음
+setup() 을 부르기 전에는 log() 도 바로 반환하며, logging 모듈도 그때 처음 import 한다.
+"""
+
+import itertools
+import os
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime
+
+import wbc_json
+
+LOGGER_NAME = "wbc"
+QUEUE_SIZE = 10000
+
+_logger = None  # logging.Logger (setup 후)
+_listener = None
+_handler = None
+_tracing = False
+_slow_ms = 0.0
+_cycle_ids = itertools.count(1)
+_current: ContextVar = ContextVar("wbc_cycle", default=None)
+_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    return _logger is not None
+
+
+def tracing() -> bool:
+    return _tracing and _logger is not None
+
+
+def set_tracing(on: bool):
+    """단계 추적 켜기/끄기 (실행 중 변경 가능)"""
+    global _tracing
+    _tracing = bool(on)
+    log("tracing", tracing=_tracing)
+
+
+def dropped() -> int:
+    """큐가 가득 차 버린 기록 수"""
+    return _handler.dropped if _handler is not None else 0
+
+
+def _make_formatter():
+    import logging
+
+    class JsonFormatter(logging.Formatter):
+        def format(self, record):
+            out = {
+                "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+                "level": record.levelname.lower(),
+                "msg": record.getMessage(),
+            }
+            fields = getattr(record, "fields", None)
+            if fields:
+                out.update(fields)
+            if record.exc_info:
+                out["exc"] = self.formatException(record.exc_info)
+            return wbc_json.dumps(out)
+
+    return JsonFormatter()
+
+
+def _make_queue_handler(q):
+    from logging.handlers import QueueHandler
+
+    class DroppingQueueHandler(QueueHandler):
+        """큐가 가득 차면 기다리지 않고 버림 (로그 때문에 모니터 루프가 막히지 않도록)"""
+
+        dropped = 0
+
+        def enqueue(self, record):
+            try:
+                self.queue.put_nowait(record)
+            except Exception:
+                self.dropped += 1
+
+        def prepare(self, record):
+            # 포맷은 리스너 스레드에서 하므로 원본 레코드를 그대로 넘김
+            return record
+
+    return DroppingQueueHandler(q)
+
+
+def setup(path=None, level: str = "INFO", trace: bool = False, slow_ms: float = 0.0):
+    """
+    JSON 로그 시작. path 가 없거나 '-' 면 표준 오류로 출력.
+    trace: 단계 추적 시작 상태, slow_ms: 이보다 오래 걸린 주기의 요약은 warning 으로 기록
+    """
+    global _logger, _listener, _handler, _tracing, _slow_ms
+    import atexit
+    import logging
+    import queue
+    from logging.handlers import QueueListener
+
+    with _lock:
+        if _logger is not None:
+            return _logger
+        if path and path != "-":
+            target = logging.FileHandler(path, encoding="utf-8")
+        else:
+            target = logging.StreamHandler()
+        target.setFormatter(_make_formatter())
+        q = queue.Queue(maxsize=QUEUE_SIZE)
+        _handler = _make_queue_handler(q)
+        _listener = QueueListener(q, target, respect_handler_level=False)
+        _listener.start()
+        logger = logging.getLogger(LOGGER_NAME)
+        logger.setLevel(level.upper())
+        logger.addHandler(_handler)
+        logger.propagate = False
+        _tracing = trace
+        _slow_ms = slow_ms
+        _logger = logger
+        atexit.register(shutdown)
+    return logger
+
+
+def shutdown():
+    """남은 기록을 모두 쓰고 리스너 종료"""
+    global _logger, _listener, _handler
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+        if _logger is not None and _handler is not None:
+            _logger.removeHandler(_handler)
+        _logger = _listener = _handler = None
+
+
+def log(msg: str, level: str = "info", **fields):
+    """JSON 기록 한 줄. 진행 중인 주기가 있으면 cycle / event 를 붙임"""
+    logger = _logger
+    if logger is None:
+        return
+    cycle = _current.get()
+    if cycle is not None:
+        fields.setdefault("cycle", cycle.id)
+        fields.setdefault("event", cycle.event)
+    logger.log(_LEVELS.get(level, 20), msg, extra={"fields": fields})
+
+
+_LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40}
+
+
+# ---- 주기 / 단계 추적 ----
+
+class Cycle:
+    """조회 주기 하나의 id 와 단계별 시간(ms)"""
+
+    __slots__ = ("id", "event", "t0", "stages", "fields", "_stack", "_token")
+
+    def __init__(self, event: str):
+        self.id = next(_cycle_ids)
+        self.event = event
+        self.t0 = time.perf_counter()
+        self.stages: dict[str, float] = {}
+        self.fields: dict = {}
+        self._stack: list = []
+        self._token = None
+
+
+class _Stage:
+    __slots__ = ("cycle", "name", "t0", "child")
+
+    def __init__(self, cycle: Cycle, name: str):
+        self.cycle = cycle
+        self.name = name
+
+    def __enter__(self):
+        self.child = 0.0
+        self.cycle._stack.append(self)
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.t0
+        cycle = self.cycle
+        cycle._stack.pop()
+        if cycle._stack:
+            cycle._stack[-1].child += elapsed
+        ms = (elapsed - self.child) * 1000
+        cycle.stages[self.name] = cycle.stages.get(self.name, 0.0) + ms
+        log("stage", level="debug", stage=self.name, ms=round(ms, 3))
+        return False
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name: str):
+    """with stage("decode"): ... — 추적 중이고 주기 안일 때만 시간을 잼"""
+    if not _tracing:
+        return _NULL_STAGE
+    cycle = _current.get()
+    if cycle is None or _logger is None:
+        return _NULL_STAGE
+    return _Stage(cycle, name)
+
+
+def start_cycle(event: str) -> Cycle | None:
+    """주기 시작. 로그가 꺼져 있으면 None"""
+    if _logger is None:
+        return None
+    cycle = Cycle(event)
+    cycle._token = _current.set(cycle)
+    return cycle
+
+
+def annotate(**fields):
+    """진행 중인 주기의 요약에 필드 추가 (결과, 변경 수 등). 주기 밖이면 무시"""
+    cycle = _current.get()
+    if cycle is not None:
+        cycle.fields.update(fields)
+
+
+def end_cycle(cycle: Cycle | None, **fields):
+    """주기 요약 한 줄 (전체 시간, 추적 중이면 단계별 시간). 느린 주기는 warning"""
+    if cycle is None:
+        return
+    fields = {**cycle.fields, **fields}
+    total = (time.perf_counter() - cycle.t0) * 1000
+    fields["ms"] = round(total, 3)
+    if cycle.stages:
+        fields["stages"] = {k: round(v, 3) for k, v in cycle.stages.items()}
+    slow = bool(_slow_ms) and total >= _slow_ms
+    if slow:
+        fields["slow"] = True
+    log("cycle", level="warning" if slow else "info", **fields)
+    _current.reset(cycle._token)
+
+
+def install_signal():
+    """SIGUSR2 로 단계 추적 켜기/끄기 (지원하는 OS 에서만). 반환: 설치 여부"""
+    import signal
+
+    if not hasattr(signal, "SIGUSR2") or threading.current_thread() is not threading.main_thread():
+        return False
+    signal.signal(signal.SIGUSR2, lambda *_: set_tracing(not _tracing))
+    return True
+
+
+def setup_from_env():
+    """WBC_LOG_FILE / WBC_LOG_LEVEL / WBC_TRACE / WBC_SLOW_CYCLE_MS 로 설정. WBC_LOG_FILE 이 없으면 아무것도 안 함"""
+    path = os.environ.get("WBC_LOG_FILE", "")
+    if not path:
+        return None
+    return setup(
+        path,
+        level=os.environ.get("WBC_LOG_LEVEL", "INFO"),
+        trace=os.environ.get("WBC_TRACE", "") not in ("", "0"),
+        slow_ms=float(os.environ.get("WBC_SLOW_CYCLE_MS", "0") or 0),
+    )
@@ -0,0 +1,218 @@
+"""
+Prometheus 형식 메트릭 (표준 라이브러리만 사용)
+Counter / Gauge / Histogram 을 REGISTRY 에 등록해 두고,
+start_server(port) 로 띄운 HTTP 서버의 /metrics 에서 텍스트 형식으로 내보낸다.
+서버를 띄우지 않으면 값만 메모리에 쌓이고 별도 비용은 거의 없음 (http.server 도 띄울 때 import).
+add_route() 로 등록한 관리용 경로(프로파일 시작 등)는 같은 포트에서 루프백 요청에만 응답한다.
+"""
+
+import threading
+
+# 기본 히스토그램 구간(초)
+FETCH_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 15.0)
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels_text(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, doc: str, labels=(), registry=None):
+        self.name = name
+        self.doc = doc
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        self._values: dict = {}
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(n, "") for n in self.label_names)
+
+    def remove(self, **labels):
+        with self._lock:
+            self._values.pop(self._key(labels), None)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_value(key, value))
+        return lines
+
+    def _render_value(self, key, value) -> list[str]:
+        return [f"{self.name}{_labels_text(self.label_names, key)} {_fmt(value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, doc, labels=(), registry=None):
+        super().__init__(name, doc, labels, registry)
+        self._func = None
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, func):
+        """수집 시점에 func() 값을 읽는 게이지 (라벨 없는 경우)"""
+        self._func = func
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> list[str]:
+        if self._func is not None:
+            try:
+                self.set(self._func())
+            except Exception:
+                pass
+        return super().render()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, doc, labels=(), buckets=FAST_BUCKETS, registry=None):
+        super().__init__(name, doc, labels, registry)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [구간별 개수..., 합계, 전체 개수]
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, upper in enumerate(self.buckets):
+                if value <= upper:
+                    state[i] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    def _render_value(self, key, state) -> list[str]:
+        lines = []
+        cumulative = 0
+        for i, upper in enumerate(self.buckets):
+            cumulative += state[i]
+            labels = _labels_text(self.label_names, key, f'le="{_fmt(upper)}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        base = _labels_text(self.label_names, key)
+        lines.append(f"{self.name}_sum{base} {_fmt(state[-2])}")
+        lines.append(f"{self.name}_count{base} {state[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric):
+        with self._lock:
+            self._metrics.append(metric)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics)
+        lines = []
+        for m in metrics:
+            lines.extend(m.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# 관리용 경로 → handler(method, query) -> (상태 코드, 본문 문자열). query 는 parse_qs 결과
+_routes: dict = {}
+_LOOPBACK = ("127.0.0.1", "::1", "::ffff:127.0.0.1")
+
+
+def add_route(path: str, handler):
+    """메트릭 포트에 관리용 경로 추가 (GET / POST, 루프백 클라이언트만 허용)"""
+    _routes[path] = handler
+
+
+def _make_handler(registry: Registry):
+    from http.server import BaseHTTPRequestHandler
+
+    class _Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, body: bytes, content_type: str):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _route(self, method: str) -> bool:
+            path, _, query = self.path.partition("?")
+            handler = _routes.get(path)
+            if handler is None:
+                return False
+            if self.client_address[0] not in _LOOPBACK:
+                self.send_error(403)
+                return True
+            from urllib.parse import parse_qs
+
+            status, text = handler(method, parse_qs(query))
+            self._send(status, text.encode("utf-8"), "text/plain; charset=utf-8")
+            return True
+
+        def do_GET(self):
+            if self._route("GET"):
+                return
+            if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self._send(200, body, "text/plain; version=0.0.4; charset=utf-8")
+
+        def do_POST(self):
+            if not self._route("POST"):
+                self.send_error(404)
+
+        def log_message(self, *args):
+            pass
+
+    return _Handler
+
+
+def start_server(port: int, addr: str = "0.0.0.0", registry: Registry | None = None):
+    """백그라운드 스레드에서 /metrics HTTP 서버 시작. 반환: ThreadingHTTPServer"""
+    from http.server import ThreadingHTTPServer
+
+    server = ThreadingHTTPServer((addr, port), _make_handler(registry if registry is not None else REGISTRY))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="wbc-metrics", daemon=True).start()
+    return server
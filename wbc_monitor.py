@@ -2,31 +2,66 @@
 """
 WBC 2026 티켓 매수 건수 모니터링
 https://tradead.tixplus.jp/wbc2026 페이지의 매수가(件) 변경 시 Discord 알림 전송
+WBC_EVENTS_FILE 로 설정 파일을 주면 한 프로세스에서 여러 이벤트 페이지를 감시 (wbc_events 참고)
 """
 
 import os
 import re
-import json
 import time
-import html
-import requests
 from pathlib import Path
 from datetime import datetime
 
-try:
-    from bs4 import BeautifulSoup
-except ImportError:
-    BeautifulSoup = None
+from wbc_extract import decode_concerts, extract_concerts, find_data_page
+from wbc_history import HistoryStore, new_placeholder, record_key
+from wbc_records import Concert, as_concert, display_date, parse_count
+import wbc_log
+import wbc_metrics as metrics
+import wbc_profile
+import wbc_transport as transport
+from wbc_events import DEFAULT_SLUG, MIN_INTERVAL_SEC, Event, load_events
+from wbc_notify import Notifier
+from wbc_rules import Mention, RuleSet, Target, load_rules
+from wbc_scheduler import SKIPPED, Scheduler
+from wbc_schema import SchemaResolver
+from wbc_snapshots import SnapshotArchive
+import wbc_stream
 
 # 설정
 BASE_URL = "https://tradead.tixplus.jp/wbc2026"
 STATE_FILE = Path(__file__).parent / "wbc_state.json"
+# 건수 변경 이력(JSONL, append-only). STATE_FILE 은 최신 상태 체크포인트
+HISTORY_FILE = Path(__file__).parent / "wbc_history.jsonl"
+HISTORY_CHECKPOINT_EVERY = int(os.environ.get("WBC_HISTORY_CHECKPOINT_EVERY", "50"))
+HISTORY_RETENTION_DAYS = int(os.environ.get("WBC_HISTORY_RETENTION_DAYS", "0"))
 # 체크 간격(초). 너무 짧으면 서버가 봇으로 인식해 빈 페이지/차단할 수 있음
 _raw_interval = int(os.environ.get("WBC_INTERVAL", "60"))
-INTERVAL_SEC = max(30, _raw_interval)  # 최소 30초
+INTERVAL_SEC = max(MIN_INTERVAL_SEC, _raw_interval)  # 최소 30초
 DISCORD_WEBHOOK = os.environ.get("DISCORD_WEBHOOK_URL", "")
-
-# 한일전 / 한국 vs 대만 경기 ID
+# 여러 이벤트 감시 설정 파일(JSON). 없으면 위 설정으로 wbc2026 하나만 감시
+EVENTS_FILE = os.environ.get("WBC_EVENTS_FILE", "")
+# 알림 규칙 설정 파일(JSON). 없으면 이벤트의 target_ids 규칙만 사용 (wbc_rules 참고)
+RULES_FILE = os.environ.get("WBC_RULES_FILE", "")
+# 전체 이벤트 요약(처리량·지연) 출력 간격(초)
+SUMMARY_EVERY_SEC = int(os.environ.get("WBC_SUMMARY_EVERY", "600"))
+
+# 파싱 실패 응답 스냅샷 보관함 (압축, 개수/크기 제한). bench/replay.py 로 재현 가능
+SNAPSHOT_DIR = Path(os.environ.get("WBC_SNAPSHOT_DIR") or Path(__file__).parent / "html" / "snapshots")
+SNAPSHOT_MAX_COUNT = int(os.environ.get("WBC_SNAPSHOT_MAX_COUNT", "50"))
+SNAPSHOT_MAX_MB = float(os.environ.get("WBC_SNAPSHOT_MAX_MB", "50"))
+
+# Prometheus 메트릭 HTTP 포트. 비어 있으면 서버를 띄우지 않음
+METRICS_PORT = os.environ.get("WBC_METRICS_PORT", "")
+
+# 변경 이벤트 스트림 (wbc_stream). 포트를 주면 SSE(GET /events), 파일을 주면 JSONL 로 발행. 둘 다 없으면 비활성
+STREAM_PORT = os.environ.get("WBC_STREAM_PORT", "")
+STREAM_ADDR = os.environ.get("WBC_STREAM_ADDR", "127.0.0.1")
+STREAM_FILE = os.environ.get("WBC_STREAM_FILE", "")
+# 알림 아웃박스 (재시작·웹훅 장애에도 알림을 잃지 않음, wbc_outbox 참고). 0 이면 예전처럼 메모리 큐만 사용
+OUTBOX_ENABLED = os.environ.get("WBC_OUTBOX", "1") != "0"
+# 리더 임대 파일 (복제본 여러 개 중 하나만 조회, wbc_lease 참고). 비우면 사용 안 함
+LEASE_FILE = os.environ.get("WBC_LEASE_FILE", "")
+
+# 한일전 / 한국 vs 대만 경기 ID (0 → 1건 이상이면 @everyone. 알림 규칙 하나로 등록됨)
 TARGET_CONCERT_IDS = {1519, 1520}
 
 # 件(건) 숫자 추출 정규식
@@ -47,274 +82,700 @@ FETCH_HEADERS = {
 }
 
 
-# 403 시 재시도: 대기 시간(초) 및 최대 재시도 횟수
-FETCH_403_WAIT_SEC = 10
-FETCH_403_MAX_RETRIES = 2
-
-
-def fetch_page():
-    """페이지 HTML 가져오기. 403이면 10초 대기 후 최대 2번 재시도. 반환: (status_code, html_text)"""
-    last_response = None
-    for attempt in range(FETCH_403_MAX_RETRIES + 1):
-        r = requests.get(BASE_URL, headers=FETCH_HEADERS, timeout=15)
-        last_response = r
-        if r.status_code == 403 and attempt < FETCH_403_MAX_RETRIES:
-            print(f"[403 Forbidden] {FETCH_403_WAIT_SEC}초 후 재시도 ({attempt + 1}/{FETCH_403_MAX_RETRIES + 1})")
-            time.sleep(FETCH_403_WAIT_SEC)
-            continue
-        r.raise_for_status()
-        return r.status_code, r.text
-    if last_response is not None:
-        last_response.raise_for_status()
-    return 403, ""
+# 메트릭 (wbc_metrics). 서버를 띄우지 않아도 값은 쌓임
+FETCH_SECONDS = metrics.Histogram(
+    "wbc_fetch_seconds", "페이지 요청 시간(초)", ["event"], buckets=metrics.FETCH_BUCKETS
+)
+PARSE_SECONDS = metrics.Histogram("wbc_parse_seconds", "data-page 추출·디코딩 시간(초)", ["event"])
+DIFF_SECONDS = metrics.Histogram("wbc_diff_seconds", "이전 상태 비교·이력 기록 시간(초)", ["event"])
+HTTP_RESPONSES = metrics.Counter("wbc_http_responses_total", "페이지 응답 수 (HTTP 상태별)", ["event", "code"])
+CYCLES = metrics.Counter("wbc_cycles_total", "조회 주기 수", ["event"])
+SHORT_CIRCUITS = metrics.Counter(
+    "wbc_short_circuit_total", "처리를 생략한 주기 수 (not_modified: 304, unchanged_hash: data-page 동일)",
+    ["event", "reason"],
+)
+CONCERT_LISTINGS = metrics.Gauge("wbc_concert_listings", "공연별 현재 매수 건수", ["event", "concert_id"])
+NOTIFY_QUEUE_DEPTH = metrics.Gauge("wbc_notify_queue_depth", "전송 대기 중인 알림 수")
+SCHEMA_DRIFTS = metrics.Counter("wbc_schema_drift_total", "공연 레코드 모양(키 목록) 변경 감지 수", ["event"])
+STREAM_SUBSCRIBERS = metrics.Gauge("wbc_stream_subscribers", "변경 이벤트 스트림(SSE) 구독자 수")
+OUTBOX_PENDING = metrics.Gauge("wbc_outbox_pending", "아웃박스에서 전송을 기다리는 변경 묶음 수", ["event"])
+LEADER = metrics.Gauge("wbc_leader", "리더 임대 보유 여부 (1 이면 이 복제본이 조회, 임대 미사용이면 1)")
+
+_default_event: Event | None = None
+
+
+def default_event() -> Event:
+    """환경 변수/모듈 설정(BASE_URL, TARGET_CONCERT_IDS 등)으로 만든 기본 이벤트"""
+    global _default_event
+    if _default_event is None:
+        _default_event = Event(
+            DEFAULT_SLUG,
+            url=BASE_URL,
+            title="WBC 2026",
+            target_ids=TARGET_CONCERT_IDS,
+            webhook=DISCORD_WEBHOOK,
+            interval=INTERVAL_SEC,
+            state_file=STATE_FILE,
+            history_file=HISTORY_FILE,
+        )
+    return _default_event
 
 
-def parse_counts(html_text: str, debug: bool = False) -> tuple[list[dict], str]:
+def fetch_page(event: Event | None = None):
+    """
+    페이지 HTML 가져오기. 반환: (status_code, html_text)
+    이전 응답에 ETag/Last-Modified 가 있었으면 조건부 GET 을 보내고, 304 면 (304, "") 반환.
+    403/429/5xx 는 HTTPError 로 올려 스케줄러가 백오프하도록 함 (Retry-After 는 event.retry_after 에 저장)
+    """
+    event = event or default_event()
+    headers = FETCH_HEADERS
+    if event.validators:
+        headers = {**FETCH_HEADERS, **event.validators}
+    event.last_timing = None
+    event.retry_after = 0.0
+    r = transport.get(event.url, headers=headers)
+    event.last_timing = transport.last_timing("vendor")
+    if r.status_code == 304:
+        return 304, ""
+    if r.status_code >= 400:
+        event.retry_after = _parse_retry_after(r.headers.get("Retry-After"))
+    r.raise_for_status()
+    _remember_validators(event, r.headers)
+    return r.status_code, r.text
+
+
+def _parse_retry_after(value) -> float:
+    """Retry-After 헤더(초 단위만 지원)를 초로. 없거나 날짜 형식이면 0"""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _remember_validators(event: Event, resp_headers):
+    """응답의 ETag/Last-Modified 를 다음 조건부 요청용으로 저장"""
+    event.validators.clear()
+    etag = resp_headers.get("ETag")
+    if etag:
+        event.validators["If-None-Match"] = etag
+    last_modified = resp_headers.get("Last-Modified")
+    if last_modified:
+        event.validators["If-Modified-Since"] = last_modified
+
+
+def _on_schema_drift(drift: dict):
+    """공연 레코드 모양이 바뀌면 바로 알림 (로그·메트릭·이벤트 스트림)"""
+    SCHEMA_DRIFTS.inc(event=drift["event"])
+    wbc_log.log("schema_drift", level="warning" if drift["broken"] else "info", **{k: v for k, v in drift.items() if k != "type"})
+    if drift["added"] or drift["removed"]:
+        print(f"[스키마] {drift['event']}: 공연 레코드 키가 바뀌었습니다 — 추가 {drift['added']}, 삭제 {drift['removed']}")
+    for field, (old_key, new_key) in (drift.get("changed_fields") or {}).items():
+        print(f"       {field} 필드: {old_key} → {new_key}")
+    if drift["missing"]:
+        level = "[경고]" if drift["broken"] else "[참고]"
+        print(f"{level} {drift['event']}: 공연 레코드에서 찾지 못한 필드: {', '.join(drift['missing'])}")
+    stream = get_stream()
+    if stream is not None:
+        stream.publish([drift])
+
+
+# 레코드 모양별 필드 키 캐시 (wbc_schema)
+_resolver = SchemaResolver(on_drift=_on_schema_drift)
+
+
+def _schema_debug_msg(slug: str) -> str:
+    plan = _resolver.current(slug)
+    if plan is not None and plan.broken():
+        return f"공연 레코드에서 필수 필드를 찾지 못했습니다 (스키마 변경): {', '.join(plan.missing)}"
+    return ""
+
+
+def parse_counts(html_text: str, debug: bool = False, event: Event | None = None) -> tuple[list[Concert], str]:
     """
     data-page JSON 에서 날짜·시간·매수 건수(listings_count) 추출.
+    data-page 탐색/디코딩은 wbc_extract 참고 (BeautifulSoup 은 대체 경로로만 사용)
+    event 를 주면 스키마 변경 감지·디버그 메시지에 그 이벤트 slug 를 씀
     반환: (결과 리스트, 디버그 메시지)
     """
-    if not BeautifulSoup:
-        return [], "BeautifulSoup4가 설치되지 않았습니다. 'pip install beautifulsoup4' 실행 필요"
-
-    soup = BeautifulSoup(html_text, "html.parser")
-    app_div = soup.find("div", id="app")
-    if not app_div:
-        return [], "div#app 요소를 찾을 수 없습니다"
-    if "data-page" not in app_div.attrs:
-        return [], "div#app에 data-page 속성이 없습니다"
-
-    # HTML 엔티티(&quot; 등) 제거 후 JSON 파싱
-    raw = app_div["data-page"]
-    try:
-        data_json = html.unescape(raw)
-        data = json.loads(data_json)
-    except json.JSONDecodeError as e:
-        return [], f"data-page JSON 파싱 실패: {e}. data-page 길이: {len(raw)}자"
-    except Exception as e:
-        return [], f"data-page 처리 중 오류: {e}"
-
-    props = data.get("props", {})
-    concerts = props.get("concerts", [])
-    
+    concerts, debug_msg = extract_concerts(html_text)
     if not concerts:
-        return [], f"concerts 배열이 비어있습니다. props 키: {list(props.keys())}"
+        return [], debug_msg
+    counts = build_counts(concerts, event)
+    return counts, "" if counts else _schema_debug_msg(event.slug if event else DEFAULT_SLUG)
 
-    result: list[dict] = []
-    for c in concerts:
-        # listings_count: 그 경기의 총 리세일 매물 건수
-        count = c.get("listings_count", 0)
-        concert_id = c.get("id")
-        name = c.get("name") or ""
-        # 날짜/시간은 웹 포맷 사용
-        date_str = c.get("concert_date_web_format") or c.get("concert_date")
-        # "2026年03月02日" 같이 들어오면 보기 좋게 가공
-        if isinstance(date_str, str) and "年" in date_str and "月" in date_str and "日" in date_str:
-            # 2026年03月02日 -> 03-02 식으로 단순 변환
-            try:
-                # 연/월/일만 잘라 쓰거나, 그대로 써도 됨
-                # 여기서는 "03/02" 정도만 쓰자
-                _, rest = date_str.split("年", 1)
-                month, rest2 = rest.split("月", 1)
-                day = rest2.split("日", 1)[0]
-                date_display = f"{int(month):02d}/{int(day):02d}"
-            except Exception:
-                date_display = date_str
-        else:
-            date_display = date_str or "?"
-
-        time_str = c.get("start_time_web_format") or c.get("start_time") or "?"
-
-        result.append(
-            {
-                "id": concert_id,
-                "date": date_display,
-                "time": time_str,
-                "name": name,
-                "count": int(count) if isinstance(count, (int, float, str)) and str(count).isdigit() else 0,
-            }
-        )
 
-    # 키(date_time) 기준 중복 제거
+def build_counts(concerts: list[dict], event: Event | None = None) -> list[Concert]:
+    """
+    props.concerts 항목들을 Concert 리스트로 변환 (id 기준 중복 제거).
+    어떤 키를 읽을지는 레코드 모양마다 한 번 정해 둔 것을 사용 (wbc_schema)
+    """
+    plan = _resolver.resolve(concerts, event.slug if event else DEFAULT_SLUG)
+    if plan is None or plan.broken():
+        # id/건수 필드를 못 찾으면 건수가 전부 0 인 것처럼 알리지 않도록 파싱 실패로 처리
+        return []
+    # 날짜/시간은 웹 포맷 우선, listings_count: 그 경기의 총 리세일 매물 건수
+    id_key, date_key, time_key, name_key, count_key = plan.keys
+    _, date_alt, time_alt, _, _ = plan.alternates
+    unique: list[Concert] = []
     seen_keys = set()
-    unique: list[dict] = []
-    for c in result:
-        k = state_key(c)
+    for c in concerts:
+        # 값이 null 이거나 이 레코드에 키가 없으면 다른 후보 키로 (기존 `or` 대체와 같음)
+        # "2026年03月02日" 은 "03/02" 로 (문자열별 캐시)
+        date_str = c.get(date_key) or c.get(date_alt)
+        rec = Concert(
+            c.get(id_key),
+            display_date(date_str) if isinstance(date_str, str) else (date_str or "?"),
+            c.get(time_key) or c.get(time_alt) or "?",
+            c.get(name_key) or "",
+            parse_count(c.get(count_key, 0)),
+        )
+        # 공연 id 기준 중복 제거 (같은 날짜·시간에 다른 공연이 있어도 둘 다 유지)
+        k = rec.key
         if k not in seen_keys:
             seen_keys.add(k)
-            unique.append(c)
-    return unique, ""
+            unique.append(rec)
+    return unique
+
+
+def get_history(event: Event | None = None) -> HistoryStore:
+    """이벤트의 이력 저장소 (처음 호출 시 체크포인트 + 로그 꼬리 로드)"""
+    event = event or default_event()
+    if event.history is None:
+        event.history = HistoryStore(
+            event.state_file,
+            event.history_file,
+            checkpoint_every=HISTORY_CHECKPOINT_EVERY,
+            retention_days=HISTORY_RETENTION_DAYS,
+        )
+    return event.history
 
 
 def get_state() -> dict:
     """저장된 이전 상태 로드"""
-    if STATE_FILE.exists():
-        try:
-            with open(STATE_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            pass
-    return {"counts": [], "updated": None}
+    store = get_history()
+    return {"counts": store.counts(), "updated": store.updated}
 
 
-def save_state(counts: list[dict]):
-    """현재 상태 저장"""
-    with open(STATE_FILE, "w", encoding="utf-8") as f:
-        json.dump({
-            "counts": counts,
-            "updated": datetime.now().isoformat(),
-        }, f, ensure_ascii=False, indent=2)
+def save_state(counts: list[Concert]):
+    """현재 상태 저장 (바뀐 공연만 이력 로그에 추가, 체크포인트는 주기적으로)"""
+    get_history().record(counts)
 
 
-def state_key(c: dict) -> str:
-    return f"{c['date']}_{c['time']}"
+def state_key(c: Concert):
+    """상태 비교 키. 공연 id (없으면 날짜_시간)"""
+    return record_key(c)
 
 
-def detect_changes(old: list[dict], new: list[dict]) -> list[tuple[dict, dict]]:
-    """이전 상태와 비교해 변경된 항목 (old_item, new_item) 리스트 반환"""
-    old_by_key = {state_key(c): c for c in old}
+def detect_changes(old, new: list[Concert]) -> list[tuple[Concert, Concert]]:
+    """
+    이전 상태와 비교해 변경된 항목 (old_item, new_item) 리스트 반환.
+    old 는 리스트(예전 상태 파일의 dict 도 가능) 또는 state_key → Concert dict (HistoryStore.latest 등).
+    dict 면 다시 만들지 않음
+    """
+    if isinstance(old, dict):
+        old_by_key = old
+    else:
+        old_by_key = {c.key: c for c in map(as_concert, old)}
     changes = []
     for c in new:
-        k = state_key(c)
-        if k in old_by_key and old_by_key[k]["count"] != c["count"]:
-            changes.append((old_by_key[k], c))
-        elif k not in old_by_key and c["count"] > 0:
-            # 새로 생긴 공급
-            changes.append(({"date": c["date"], "time": c["time"], "count": 0}, c))
+        prev = old_by_key.get(c.key)
+        if prev is None:
+            if c.count > 0:
+                # 새로 생긴 공급
+                changes.append((new_placeholder(c), c))
+        elif prev.count != c.count:
+            changes.append((prev, c))
     return changes
 
 
-def send_discord(changes: list[tuple[dict, dict]], new_counts: list[dict]):
-    """Discord 웹훅으로 알림 전송"""
-    if not DISCORD_WEBHOOK.strip():
-        print("[경고] DISCORD_WEBHOOK_URL 미설정 — 알림 생략")
-        return
+def build_discord_payload(
+    changes: list[tuple[Concert, Concert]],
+    new_counts: list[Concert],
+    event: Event | None = None,
+    mention: Mention | None = None,
+) -> dict:
+    """
+    변경 내역으로 Discord 웹훅 payload(dict) 생성.
+    mention 이 없으면 이벤트 웹훅 기준으로 알림 규칙에서 정함
+    (기본: 대상 경기(한일전 1519, 한국 vs 대만 1520)가 0 -> 양수로 바뀐 경우 @everyone)
+    """
+    event = event or default_event()
+    if mention is None:
+        mention = get_rules(event).mention(event, event.webhook, changes)
     lines = []
-    mention_everyone = False
     for old_c, new_c in changes:
-        name = new_c.get("name") or ""
-        title = f"{new_c['date']} {new_c['time']}"
-        if name:
-            title += f" | {name}"
-
-        # 한일전(1519), 한국 vs 대만(1520) 경기에서 0 -> 양수로 바뀐 경우 @everyone
-        new_id = new_c.get("id")
-        if (
-            isinstance(new_id, int)
-            and new_id in TARGET_CONCERT_IDS
-            and old_c.get("count", 0) == 0
-            and new_c.get("count", 0) > 0
-        ):
-            mention_everyone = True
-
+        title = f"{new_c.date} {new_c.time}"
+        if new_c.name:
+            title += f" | {new_c.name}"
         lines.append(
-            f"• **{title}** — {old_c['count']}件 → **{new_c['count']}件**"
+            f"• **{title}** — {old_c.count}件 → **{new_c.count}件**"
         )
     # 현재 1건 이상인 항목 요약
-    available = [c for c in new_counts if c["count"] > 0]
+    available = [c for c in new_counts if c.count > 0]
     body = "**매수 건수 변경**\n\n" + "\n".join(lines)
     if available:
         body += "\n\n**현재 매수 가능**\n" + "\n".join(
-            f"• {c['date']} {c['time']} | {c.get('name','')}: {c['count']}件" for c in available
+            f"• {c.date} {c.time} | {c.name}: {c.count}件" for c in available
         )
 
-    content = "@everyone" if mention_everyone else None
     payload = {
-        "content": content,
+        "content": mention.content(),
         "embeds": [{
-            "title": "WBC 2026 티켓 매수 건수 변경",
+            "title": f"{event.title} 티켓 매수 건수 변경",
             "description": body,
             "color": 0x00AA00,
             "timestamp": datetime.utcnow().isoformat() + "Z",
-            "url": BASE_URL,
+            "url": event.url,
         }],
     }
-    if mention_everyone:
-        payload["allowed_mentions"] = {"parse": ["everyone"]}
-    try:
-        r = requests.post(DISCORD_WEBHOOK, json=payload, timeout=10)
-        if r.status_code in (200, 204):
-            print("[Discord] 알림 전송 완료")
-        else:
-            print(f"[Discord] 전송 실패: {r.status_code} {r.text[:200]}")
-    except Exception as e:
-        print(f"[Discord] 오류: {e}")
+    allowed_mentions = mention.allowed_mentions()
+    if allowed_mentions:
+        payload["allowed_mentions"] = allowed_mentions
+    return payload
+
+
+_rules: RuleSet | None = None
+
+
+def get_rules(event: Event | None = None) -> RuleSet:
+    """알림 규칙 (처음 호출 시 WBC_RULES_FILE 로드). event 의 target_ids 규칙도 함께 등록"""
+    global _rules
+    if _rules is None:
+        _rules = load_rules(RULES_FILE) if RULES_FILE else RuleSet()
+    if event is not None:
+        _rules.add_event_targets([event])
+    return _rules
+
+
+def _build_target_payload(changes: list[tuple[Concert, Concert]], new_counts: list[Concert], target: Target) -> dict:
+    """알림 스레드용: 합쳐진 변경에 대해 그 웹훅의 멘션을 다시 정해 payload 생성"""
+    mention = get_rules(target.event).mention(target.event, target.webhook, changes)
+    return build_discord_payload(changes, new_counts, target.event, mention)
+
+
+_notifier: Notifier | None = None
+_snapshots: SnapshotArchive | None = None
+
+
+def get_snapshots() -> SnapshotArchive:
+    """파싱 실패 응답 스냅샷 보관함"""
+    global _snapshots
+    if _snapshots is None:
+        _snapshots = SnapshotArchive(
+            SNAPSHOT_DIR, max_count=SNAPSHOT_MAX_COUNT, max_bytes=int(SNAPSHOT_MAX_MB * 1024 * 1024)
+        )
+    return _snapshots
+
+
+def get_notifier() -> Notifier:
+    """알림 디스패처 (처음 호출 시 백그라운드 스레드 시작)"""
+    global _notifier
+    if _notifier is None:
+        _notifier = Notifier(_build_target_payload).start()
+        NOTIFY_QUEUE_DEPTH.set_function(_notifier.pending)
+    return _notifier
+
+
+def send_discord(changes: list[tuple[Concert, Concert]], new_counts: list[Concert], event: Event | None = None):
+    """
+    Discord 웹훅 알림을 큐에 넣음. 실제 전송은 백그라운드 스레드(wbc_notify)가 담당.
+    알림 규칙에 따라 웹훅별로 나눠 넣는다 (규칙 웹훅이 없으면 이벤트 웹훅 하나)
+    """
+    event = event or default_event()
+    routes = get_rules(event).route(event, changes)
+    if not routes:
+        if not event.webhook:
+            print(f"{event.tag}[경고] DISCORD_WEBHOOK_URL 미설정 — 알림 생략")
+        return
+    notifier = get_notifier()
+    for target, target_changes in routes.items():
+        notifier.submit(target.webhook, target_changes, new_counts, target)
+
+
+def get_outbox(event: Event | None = None):
+    """이벤트의 알림 아웃박스 (처음 호출 시 파일 로드). WBC_OUTBOX=0 이면 None"""
+    if not OUTBOX_ENABLED:
+        return None
+    event = event or default_event()
+    if event.outbox is None:
+        import wbc_outbox
+
+        event.outbox = wbc_outbox.Outbox(event.outbox_file)
+        if event.outbox.pending:
+            print(f"{event.tag}[아웃박스] 이전 실행에서 보내지 못한 알림 {len(event.outbox)}건을 다시 보냅니다")
+    return event.outbox
+
+
+def drain_outbox(event: Event | None = None) -> int:
+    """
+    아웃박스에서 보낼 차례인 변경 묶음을 알림 규칙대로 나눠 알림 스레드에 넘김.
+    웹훅별 전송 결과는 알림 스레드가 아웃박스에 기록 (실패하면 백오프 후 다음 주기에 다시 보냄).
+    반환: 넘긴 묶음 수
+    """
+    event = event or default_event()
+    outbox = get_outbox(event)
+    if outbox is None:
+        return 0
+    entries = outbox.due()
+    if entries:
+        with wbc_log.stage("notify"):
+            rules = get_rules(event)
+            for entry in entries:
+                routes = rules.route(event, entry.changes)
+                todo = outbox.begin(entry, [t.webhook for t in routes])
+                if not routes and not event.webhook:
+                    print(f"{event.tag}[경고] DISCORD_WEBHOOK_URL 미설정 — 알림 생략")
+                for target, target_changes in routes.items():
+                    if target.webhook in todo:
+                        get_notifier().submit(
+                            target.webhook, target_changes, entry.counts, target,
+                            on_done=outbox.callback(entry, target.webhook),
+                        )
+    OUTBOX_PENDING.set(len(outbox), event=event.slug)
+    return len(entries)
+
+
+_stream: wbc_stream.ChangeStream | None = None
+
+
+def get_stream() -> wbc_stream.ChangeStream | None:
+    """변경 이벤트 스트림. WBC_STREAM_PORT / WBC_STREAM_FILE 이 모두 없으면 None"""
+    global _stream
+    if _stream is None and (STREAM_PORT or STREAM_FILE):
+        _stream = wbc_stream.ChangeStream(jsonl_path=STREAM_FILE or None)
+        STREAM_SUBSCRIBERS.set_function(_stream.subscriber_count)
+    return _stream
+
+
+def publish_changes(changes: list[tuple[Concert, Concert]], event: Event | None = None):
+    """변경마다 구조화된 이벤트(공연·이전/새 건수·시각·페이지 요청 시간)를 스트림에 발행"""
+    stream = get_stream()
+    if stream is None or not changes:
+        return
+    event = event or default_event()
+    ts = datetime.now().isoformat()
+    fetch_ms = round(event.last_timing["total"] * 1000, 1) if event.last_timing else None
+    stream.publish([
+        {
+            "type": "change",
+            "event": event.slug,
+            "concert_id": new_c.id,
+            "date": new_c.date,
+            "time": new_c.time,
+            "name": new_c.name,
+            "old_count": old_c.count,
+            "new_count": new_c.count,
+            "ts": ts,
+            "fetch_ms": fetch_ms,
+        }
+        for old_c, new_c in changes
+    ])
+
+
+def _parse_if_changed(
+    html_text: str, last_hash: int | None, event: Event | None = None
+) -> tuple[list[Concert] | None, str, int | None]:
+    """
+    data-page 원문 해시가 직전과 같으면 디코딩을 생략.
+    반환: (결과 리스트 — 생략 시 None, 디버그 메시지, 원문 해시)
+    """
+    with wbc_log.stage("scan"):
+        raw, debug_msg = find_data_page(html_text)
+    if raw is None:
+        # 스캐너로 못 찾으면 BeautifulSoup 대체 경로 (해시 생략 없음)
+        new_counts, debug_msg = parse_counts(html_text, event=event)
+        return new_counts, debug_msg, None
+    page_hash = hash(raw)
+    if page_hash == last_hash:
+        return None, "", page_hash
+    concerts, debug_msg = decode_concerts(raw)
+    if not concerts:
+        return [], debug_msg, page_hash
+    with wbc_log.stage("build"):
+        counts = build_counts(concerts, event)
+    return counts, "" if counts else _schema_debug_msg(event.slug if event else DEFAULT_SLUG), page_hash
 
 
-def run_once():
-    """한 번 조회 후 변경 여부 확인 및 알림"""
+def run_once(event: Event | None = None):
+    """
+    한 번 조회 후 변경 여부 확인 및 알림.
+    반환: 페이지 응답 HTTP 상태 코드 (응답을 못 받았으면 None) — 스케줄러 백오프 판단용
+    JSON 로그(wbc_log)가 켜져 있으면 주기마다 cycle id 와 결과·단계별 시간을 한 줄로 남긴다
+    프로파일 세션(wbc_profile, SIGUSR1)이 진행 중이면 이 주기를 cProfile 로 잰다
+    """
+    event = event or default_event()
+    cycle = wbc_log.start_cycle(event.slug)
+    profile = wbc_profile.cycle_begin()
+    status = None
+    try:
+        status = _run_once(event)
+        # 이번 주기의 변경과, 이전에 실패해 재시도 차례가 된 알림을 보냄
+        drain_outbox(event)
+        return status
+    finally:
+        wbc_profile.cycle_end(profile)
+        wbc_log.end_cycle(cycle, status=status)
+
+
+def _run_once(event: Event):
+    tag = event.tag
+    event.stats["cycles"] += 1
+    CYCLES.inc(event=event.slug)
     html = None
     status_code = None
     for attempt in range(2):
         try:
-            status_code, html = fetch_page()
+            with wbc_log.stage("fetch"):
+                status_code, html = fetch_page(event)
+            _observe_fetch(event, status_code)
             break
-        except requests.HTTPError as e:
-            code = e.response.status_code if e.response is not None else "?"
-            print(f"[오류] 페이지 조회 실패 (시도 {attempt + 1}/2) — HTTP {code}: {e}")
-            if attempt == 0:
-                time.sleep(2)
-            else:
-                return
         except Exception as e:
-            print(f"[오류] 페이지 조회 실패 (시도 {attempt + 1}/2): {e}")
+            if transport.is_http_error(e):
+                # HTTP 오류 응답은 바로 재시도하지 않고 스케줄러 백오프에 맡김
+                code = e.response.status_code if e.response is not None else None
+                _observe_fetch(event, code)
+                print(f"{tag}[오류] 페이지 조회 실패 — HTTP {code if code is not None else '?'}: {e}")
+                wbc_log.annotate(outcome="http_error", retry_after=event.retry_after or None)
+                return code
+            _observe_fetch(event, None)
+            print(f"{tag}[오류] 페이지 조회 실패 (시도 {attempt + 1}/2): {e}")
+            wbc_log.log("fetch_error", level="warning", attempt=attempt + 1, error=str(e))
             if attempt == 0:
                 time.sleep(2)
             else:
-                return
+                wbc_log.annotate(outcome="fetch_error")
+                return None
+    if status_code == 304:
+        event.stats["not_modified"] += 1
+        SHORT_CIRCUITS.inc(event=event.slug, reason="not_modified")
+        print(f"{tag}[확인] 변경 없음 (304 Not Modified, {_short_circuit_summary(event)})")
+        wbc_log.annotate(outcome="not_modified")
+        return status_code
     if not html:
-        return
-    new_counts, debug_msg = parse_counts(html)
+        return status_code
+    t0 = time.perf_counter()
+    new_counts, debug_msg, page_hash = _parse_if_changed(html, event.last_page_hash, event)
+    PARSE_SECONDS.observe(time.perf_counter() - t0, event=event.slug)
+    if new_counts is None:
+        event.stats["unchanged_hash"] += 1
+        SHORT_CIRCUITS.inc(event=event.slug, reason="unchanged_hash")
+        print(f"{tag}[확인] 변경 없음 (data-page 동일, {_short_circuit_summary(event)})")
+        wbc_log.annotate(outcome="unchanged_hash")
+        return status_code
     if not new_counts:
-        # 디버그를 위해 마지막 HTML을 파일로 저장 (html/ 폴더에 저장해 브라우저에서 열기 쉽게)
-        html_dir = Path(__file__).parent / "html"
-        html_dir.mkdir(exist_ok=True)
-        debug_file = html_dir / "wbc_last.html"
-        try:
-            debug_file.write_text(html, encoding="utf-8")
-            print("[경고] 매수 건수 항목을 찾지 못했습니다.")
-            if status_code is not None:
-                print(f"       HTTP 상태 코드: {status_code}")
-            # debug_msg가 비어있어도 파싱 실패 원인을 추적할 수 있도록 상세 정보 출력
-            if debug_msg:
-                print(f"       원인: {debug_msg}")
+        # 파싱 실패한 응답의 검증값으로 304 를 받으면 계속 생략되므로 버림
+        event.validators.clear()
+        print(f"{tag}[경고] 매수 건수 항목을 찾지 못했습니다.")
+        wbc_log.annotate(outcome="parse_failed", reason=debug_msg or "결과 리스트가 비어있음")
+        if status_code is not None:
+            print(f"       HTTP 상태 코드: {status_code}")
+        # debug_msg가 비어있어도 파싱 실패 원인을 추적할 수 있도록 상세 정보 출력
+        if debug_msg:
+            print(f"       원인: {debug_msg}")
+        else:
+            # 파싱은 성공했지만 결과가 비어있는 경우
+            print("       원인: 파싱은 성공했지만 결과 리스트가 비어있습니다.")
+            # HTML 구조 확인
+            if "data-page" in html:
+                print("       [참고] HTML에 data-page 속성이 있습니다.")
+                if 'div id="app"' in html:
+                    print("       [참고] div#app 요소도 있습니다. JSON 구조를 확인해보세요.")
             else:
-                # 파싱은 성공했지만 결과가 비어있는 경우
-                print("       원인: 파싱은 성공했지만 결과 리스트가 비어있습니다.")
-                # HTML 구조 확인
-                if "data-page" in html:
-                    print("       [참고] HTML에 data-page 속성이 있습니다.")
-                    if 'div id="app"' in html:
-                        print("       [참고] div#app 요소도 있습니다. JSON 구조를 확인해보세요.")
-                else:
-                    print("       [참고] HTML에 data-page 속성이 없습니다.")
-            print(f"       응답 HTML을 '{debug_file}' 에 저장했습니다. 브라우저로 열어 구조를 확인해 보세요.")
-        except Exception as e:
-            print("[경고] 매수 건수 항목을 찾지 못했고, 디버그 HTML 저장에도 실패했습니다:", e)
-        return
-    prev = get_state()
-    old_counts = prev.get("counts") or []
-    changes = detect_changes(old_counts, new_counts)
+                print("       [참고] HTML에 data-page 속성이 없습니다.")
+        # 디버그용 응답 HTML 은 스냅샷 보관함에 압축 저장 (백그라운드 스레드가 기록)
+        if not get_snapshots().save(html, status_code, debug_msg, event=event.slug, url=event.url):
+            print(f"{tag}[경고] 스냅샷 저장 대기열이 가득 차 이번 응답은 저장하지 않습니다.")
+        return status_code
+    # 메모리에 유지되는 상태(공연 id 키)와 한 번에 비교·기록. 디스크는 영속화에만 사용
+    store = get_history(event)
+    outbox = get_outbox(event)
+    first = event.last_page_hash is None
+    t0 = time.perf_counter()
+    with wbc_log.stage("diff"):
+        # 알림은 이력 로그보다 먼저 아웃박스에 기록 (상태만 저장되고 알림이 사라지는 일이 없도록)
+        journal = (lambda ch, gone: outbox.add(ch, new_counts, gone)) if outbox is not None else None
+        changes = store.update(new_counts, journal=journal)
+    DIFF_SECONDS.observe(time.perf_counter() - t0, event=event.slug)
+    event.last_page_hash = page_hash
+    # 공연별 건수 게이지: 처음이나 공연 목록이 바뀌면 전체, 이후엔 바뀐 공연만 갱신.
+    # 페이지에서 사라진 공연의 게이지는 지움 (마지막 값이 계속 노출되지 않도록)
+    for key in store.removed:
+        CONCERT_LISTINGS.remove(event=event.slug, concert_id=key)
+    for c in (new_counts if first or store.added else (n for _, n in changes)):
+        CONCERT_LISTINGS.set(c.count, event=event.slug, concert_id=c.key)
     if changes:
-        print(f"[변경 감지] {len(changes)}건 — Discord 알림 전송")
-        send_discord(changes, new_counts)
+        print(f"{tag}[변경 감지] {len(changes)}건 — Discord 알림 전송")
+        wbc_log.annotate(outcome="changed", changes=len(changes))
+        wbc_log.log("changes", changes=[[n.key, o.count, n.count] for o, n in changes])
+        with wbc_log.stage("notify"):
+            publish_changes(changes, event)
+            if outbox is None:
+                send_discord(changes, new_counts, event)
     else:
-        total = sum(c["count"] for c in new_counts)
-        print(f"[확인] 변경 없음 (현재 총 매수 가능: {total}件)")
-    save_state(new_counts)
+        total = sum(c.count for c in new_counts)
+        print(f"{tag}[확인] 변경 없음 (현재 총 매수 가능: {total}件, {_short_circuit_summary(event)})")
+        wbc_log.annotate(outcome="unchanged", total=total)
+    return status_code
+
+
+def _observe_fetch(event: Event, code):
+    HTTP_RESPONSES.inc(event=event.slug, code=code if code is not None else "error")
+    if event.last_timing:
+        FETCH_SECONDS.observe(event.last_timing["total"], event=event.slug)
+
+
+def _short_circuit_summary(event: Event) -> str:
+    skipped = event.stats["not_modified"] + event.stats["unchanged_hash"]
+    summary = f"생략 {skipped}/{event.stats['cycles']}회"
+    timing = transport.format_timing(event.last_timing)
+    return f"{summary}, {timing}" if timing else summary
+
+
+def print_summary(events: list[Event], elapsed: float, scheduler: Scheduler | None = None):
+    """전체 이벤트 처리량·지연 요약. scheduler 가 있으면 루프 오버헤드도 출력"""
+    cycles = sum(ev.stats["cycles"] for ev in events)
+    rate = cycles / elapsed * 60 if elapsed > 0 else 0
+    print(f"[요약] 이벤트 {len(events)}개, 조회 {cycles}회 ({rate:.1f}회/분)")
+    if scheduler is not None:
+        o = scheduler.overhead()
+        print(
+            f"       루프: 실행당 {o['busy_avg'] * 1000:.0f}ms 작업, 평균 {o['late_avg'] * 1000:.0f}ms 지연 시작, "
+            f"대기 외 시간 {o['busy_ratio'] * 100:.2f}%"
+        )
+    for ev in events:
+        proc = ev.stats["proc_sec"] / ev.stats["cycles"] * 1000 if ev.stats["cycles"] else 0
+        print(f"       {ev.slug}: {_short_circuit_summary(ev)}, 자체 처리 평균 {proc:.1f}ms")
+
+
+def reset_for_failover(events: list[Event]):
+    """
+    리더가 바뀌면 메모리 상태를 버림. 다음 주기에 이전 리더가 디스크에 남긴
+    체크포인트 + 이력 로그에서 다시 로드하므로 인계 직후 거짓 변경 알림이 나가지 않음.
+    이전 리더가 보내지 못한 아웃박스 알림은 새 리더가 이어서 보냄.
+    버리는 저장소는 체크포인트하지 않음 (로그는 매 기록마다 fsync 되어 있음).
+    아웃박스는 먼저 닫아, 알림 스레드에 남은 항목은 보내지 않고 늦게 끝난 전송도 ack 를 쓰지 않게 한 뒤
+    보내는 중인 묶음이 끝나기를 기다림 (새 리더가 같은 파일을 이어 쓰므로)
+    """
+    for ev in events:
+        if ev.outbox is not None:
+            ev.outbox.close()
+    if _notifier is not None and not _notifier.wait_idle():
+        print("[임대] 전송 중인 알림이 끝나지 않았지만 상태를 다시 읽습니다 (결과는 기록하지 않음)")
+    for ev in events:
+        ev.history = None
+        ev.outbox = None
+        ev.last_page_hash = None
+        ev.validators.clear()
+
+
+def check_lease(elector) -> bool:
+    """이번 주기에 조회할지 (임대 미사용이면 항상). 임대 저장소 오류면 이번 주기는 대기로 보고 다음 주기에 다시 확인"""
+    if elector is None:
+        return True
+    try:
+        return elector.ensure()
+    except OSError as e:
+        print(f"[임대] 임대 확인 실패 — 이번 주기는 조회하지 않음: {e}")
+        wbc_log.log("lease_error", level="warning", error=str(e))
+        return False
+
+
+def make_elector(events: list[Event]):
+    """WBC_LEASE_FILE 이 있으면 리더 임대 관리자 (없으면 None). 리더 여부가 바뀔 때마다 상태를 다시 읽음"""
+    if not LEASE_FILE:
+        return None
+    import wbc_lease
+
+    def on_change(leader: bool, record: dict | None):
+        reset_for_failover(events)
+        LEADER.set(1 if leader else 0)
+        holder = (record or {}).get("holder")
+        if leader:
+            print(f"[임대] 리더가 되었습니다 (epoch {record.get('epoch')}) — 저장된 상태에서 이어서 조회")
+        else:
+            print(f"[임대] 대기 — 현재 리더: {holder or '-'}")
+        wbc_log.log("lease", leader=leader, holder=holder, epoch=(record or {}).get("epoch"))
+
+    return wbc_lease.from_env(min(ev.interval for ev in events), on_change=on_change)
+
+
+def get_events() -> list[Event]:
+    """감시할 이벤트 목록. WBC_EVENTS_FILE 이 있으면 그 설정, 없으면 기본 이벤트 하나"""
+    if EVENTS_FILE:
+        return load_events(EVENTS_FILE, default_webhook=DISCORD_WEBHOOK, default_interval=INTERVAL_SEC)
+    return [default_event()]
 
 
 def main():
+    events = get_events()
     print("WBC 2026 티켓 매수 건수 모니터 시작")
-    print(f"  URL: {BASE_URL}")
-    print(f"  체크 간격: {INTERVAL_SEC}초")
-    if _raw_interval < 30:
-        print(f"  [참고] WBC_INTERVAL이 30초 미만이어서 30초로 적용됩니다. 너무 짧으면 서버에서 빈 페이지/차단될 수 있습니다.")
-    print(f"  Discord: {'설정됨' if DISCORD_WEBHOOK.strip() else '미설정'}")
+    for ev in events:
+        print(f"  {ev.tag}URL: {ev.url}")
+        print(f"  {ev.tag}체크 간격: {ev.interval}초")
+        print(f"  {ev.tag}Discord: {'설정됨' if ev.webhook else '미설정'}")
+    if _raw_interval < MIN_INTERVAL_SEC:
+        print(f"  [참고] WBC_INTERVAL이 {MIN_INTERVAL_SEC}초 미만이어서 {MIN_INTERVAL_SEC}초로 적용됩니다. 너무 짧으면 서버에서 빈 페이지/차단될 수 있습니다.")
+    if wbc_log.setup_from_env() is not None:
+        signal_note = ", SIGUSR2 로 단계 추적 켜기/끄기" if wbc_log.install_signal() else ""
+        print(f"  JSON 로그: {os.environ['WBC_LOG_FILE']} (단계 추적 {'켜짐' if wbc_log.tracing() else '꺼짐'}{signal_note})")
+    if wbc_profile.install_signal():
+        print(f"  프로파일: kill -USR1 {os.getpid()} → 다음 {wbc_profile.DEFAULT_CYCLES}주기 ({wbc_profile.PROFILE_DIR})")
     print("-" * 50)
-    while True:
-        run_once()
-        time.sleep(INTERVAL_SEC)
+
+    elector = make_elector(events)
+    if elector is not None:
+        print(f"  리더 임대: {LEASE_FILE} (id {elector.holder}, ttl {elector.ttl:.0f}초)")
+        elector.start()
+    else:
+        LEADER.set(1)
+
+    if METRICS_PORT:
+        metrics.add_route("/debug/profile", wbc_profile.http_handler)
+        metrics.start_server(int(METRICS_PORT))
+        print(f"  메트릭: http://0.0.0.0:{METRICS_PORT}/metrics (프로파일: 로컬에서 POST /debug/profile)")
+    stream = get_stream()
+    if stream is not None and STREAM_PORT:
+        wbc_stream.start_server(stream, int(STREAM_PORT), STREAM_ADDR)
+        print(f"  변경 이벤트 스트림(SSE): http://{STREAM_ADDR}:{STREAM_PORT}/events")
+    if STREAM_FILE:
+        print(f"  변경 이벤트 스트림(JSONL): {STREAM_FILE}")
+
+    # 모든 이벤트가 세션·알림 스레드·스케줄러 하나를 공유.
+    # 다음 조회는 단조 시계 기준 예정 시각 + 지터, 403/429/5xx 나 조회 실패(None)면 지수 백오프
+    scheduler = Scheduler(events)
+    started = time.monotonic()
+    last_summary = started
+
+    def job(ev: Event):
+        nonlocal last_summary
+        if not check_lease(elector):
+            # 대기 복제본: 조회하지 않고 임대만 확인 (간격마다 확인하므로 만료 후 한 간격 안에 인계)
+            return SKIPPED
+        t0 = time.monotonic()
+        status = run_once(ev)
+        now = time.monotonic()
+        # 네트워크 시간을 뺀 자체 처리 시간 (파싱·비교·저장·큐 투입)
+        network = ev.last_timing["total"] if ev.last_timing else 0.0
+        ev.stats["proc_sec"] += max(0.0, now - t0 - network)
+        if now - last_summary >= SUMMARY_EVERY_SEC:
+            print_summary(events, now - started, scheduler)
+            last_summary = now
+        return status
+
+    try:
+        scheduler.run(job)
+    finally:
+        if _notifier is not None:
+            _notifier.stop()
+        if _snapshots is not None:
+            _snapshots.stop()
+        # 임대를 잃은 뒤에는 체크포인트를 쓰지 않음 (새 리더의 상태를 덮어쓰지 않도록)
+        if elector is None or elector.is_leader:
+            for ev in events:
+                if ev.history is not None:
+                    ev.history.close()
+        if elector is not None:
+            elector.release()
 
 
 if __name__ == "__main__":
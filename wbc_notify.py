@@ -0,0 +1,337 @@
+"""
+Discord 알림 비동기 전송
+모니터 루프는 submit() 으로 큐에 넣기만 하고, 백그라운드 스레드가
+짧은 시간(window) 안의 변경을 하나로 합쳐 전송한다.
+- 4096자를 넘는 본문은 자르지 않고 여러 임베드/메시지로 나눔
+- 429 응답의 Retry-After, X-RateLimit-Remaining / Reset-After 버킷 헤더를 지킴
+- 실패 시 상한이 있는 지수 백오프로 재시도
+"""
+
+import atexit
+import queue
+import threading
+import time
+
+import wbc_log
+import wbc_metrics as metrics
+import wbc_transport as transport
+
+# Discord 제한: 임베드 description 4096자, 메시지당 임베드 10개, 메시지당 임베드 글자 합 6000자
+EMBED_DESCRIPTION_MAX = 4096
+EMBEDS_PER_MESSAGE = 10
+MESSAGE_EMBED_CHARS = 6000
+
+COALESCE_WINDOW_SEC = 2.0
+MAX_ATTEMPTS = 5
+BACKOFF_BASE_SEC = 1.0
+BACKOFF_MAX_SEC = 60.0
+
+DISCORD_DELIVERIES = metrics.Counter(
+    "wbc_discord_deliveries_total", "Discord 메시지 전송 결과 수 (success / failure)", ["result"]
+)
+
+
+def split_text(text: str, limit: int = EMBED_DESCRIPTION_MAX) -> list[str]:
+    """줄 단위로 limit 이하 조각으로 나눔. 한 줄이 limit 보다 길면 그 줄만 잘라서 나눔"""
+    if len(text) <= limit:
+        return [text]
+    chunks = []
+    cur = ""
+    for line in text.split("\n"):
+        while len(line) > limit:
+            if cur:
+                chunks.append(cur)
+                cur = ""
+            chunks.append(line[:limit])
+            line = line[limit:]
+        candidate = f"{cur}\n{line}" if cur else line
+        if len(candidate) > limit:
+            chunks.append(cur)
+            cur = line
+        else:
+            cur = candidate
+    if cur:
+        chunks.append(cur)
+    return chunks
+
+
+def _embed_chars(embed: dict) -> int:
+    return len(embed.get("title") or "") + len(embed.get("description") or "")
+
+
+def split_payload(payload: dict) -> list[dict]:
+    """
+    Discord 제한을 넘는 payload 를 여러 메시지로 나눔.
+    긴 description 은 여러 임베드로 쪼개고(제목에 (i/n) 표시), 메시지당 임베드 수·글자 합 제한에 맞춰 묶는다.
+    content(@everyone 등)와 allowed_mentions 는 첫 메시지에만 둔다.
+    """
+    embeds = []
+    for embed in payload.get("embeds") or []:
+        parts = split_text(embed.get("description") or "")
+        if len(parts) == 1:
+            embeds.append(embed)
+            continue
+        for i, part in enumerate(parts, 1):
+            e = dict(embed)
+            e["description"] = part
+            e["title"] = f"{embed.get('title') or ''} ({i}/{len(parts)})".strip()
+            embeds.append(e)
+
+    messages: list[list[dict]] = [[]]
+    chars = 0
+    for e in embeds:
+        n = _embed_chars(e)
+        if messages[-1] and (len(messages[-1]) >= EMBEDS_PER_MESSAGE or chars + n > MESSAGE_EMBED_CHARS):
+            messages.append([])
+            chars = 0
+        messages[-1].append(e)
+        chars += n
+
+    out = []
+    for i, group in enumerate(messages):
+        msg = {k: v for k, v in payload.items() if k != "embeds"}
+        if i > 0:
+            msg.pop("content", None)
+            msg.pop("allowed_mentions", None)
+        msg["embeds"] = group
+        out.append(msg)
+    return out
+
+
+def _retry_after(r) -> float:
+    """429 응답의 대기 시간(초). 본문 retry_after 우선, 없으면 Retry-After 헤더"""
+    try:
+        return float(r.json().get("retry_after"))
+    except Exception:
+        pass
+    try:
+        return float(r.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return BACKOFF_BASE_SEC
+
+
+class _Bucket:
+    """웹훅별 Discord 레이트 리밋 버킷 상태"""
+
+    def __init__(self):
+        self.blocked_until = 0.0
+
+    def wait(self):
+        delay = self.blocked_until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def observe(self, headers):
+        # 남은 요청이 0 이면 Reset-After 만큼 다음 전송을 미룸
+        try:
+            remaining = int(headers.get("X-RateLimit-Remaining", "1"))
+            reset_after = float(headers.get("X-RateLimit-Reset-After", "0"))
+        except (TypeError, ValueError):
+            return
+        if remaining <= 0 and reset_after > 0:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + reset_after)
+
+
+_buckets: dict[str, _Bucket] = {}
+
+
+def deliver(webhook: str, payload: dict, max_attempts: int = MAX_ATTEMPTS, start: int = 0, on_part=None) -> bool:
+    """
+    payload 를 (필요하면 나눠서) 동기 전송. 레이트 리밋을 지키며 재시도.
+    start: 앞의 이 개수 메시지는 이미 보냈으므로 건너뜀 (나눠 보내다 실패한 payload 를 이어서 보낼 때)
+    on_part: 메시지 하나를 보낼 때마다 on_part(지금까지 보낸 메시지 수) 호출. 주면 순서대로 이어 보낼 수 있도록
+    첫 실패에서 멈춤 (없으면 실패한 메시지가 있어도 나머지를 보냄)
+    반환: 모든 메시지 전송 성공 여부
+    """
+    bucket = _buckets.setdefault(webhook, _Bucket())
+    ok = True
+    t0 = time.perf_counter()
+    messages = split_payload(payload)
+    attempts = 0
+    for index in range(start, len(messages)):
+        msg = messages[index]
+        attempt = 0
+        while True:
+            bucket.wait()
+            try:
+                r = transport.post(webhook, json=msg)
+            except ImportError:
+                # requests 미설치는 재시도해도 같음
+                raise
+            except Exception as e:
+                r = None
+                reason = f"오류: {e}"
+            else:
+                bucket.observe(r.headers)
+                if r.status_code in (200, 204):
+                    DISCORD_DELIVERIES.inc(result="success")
+                    break
+                reason = f"{r.status_code} {r.text[:200]}"
+                if r.status_code == 429:
+                    # 레이트 리밋은 서버가 알려준 시간만큼 기다리고 재시도
+                    bucket.blocked_until = time.monotonic() + _retry_after(r)
+                elif 400 <= r.status_code < 500:
+                    # 그 외 4xx 는 재시도해도 같은 결과
+                    print(f"[Discord] 전송 실패: {reason}")
+                    DISCORD_DELIVERIES.inc(result="failure")
+                    ok = False
+                    break
+            attempt += 1
+            attempts += 1
+            if attempt >= max_attempts:
+                print(f"[Discord] 전송 포기 ({attempt}회 시도): {reason}")
+                DISCORD_DELIVERIES.inc(result="failure")
+                ok = False
+                break
+            if r is None or r.status_code != 429:
+                time.sleep(min(BACKOFF_MAX_SEC, BACKOFF_BASE_SEC * 2 ** (attempt - 1)))
+        if on_part is not None:
+            if not ok:
+                break
+            on_part(index + 1)
+    wbc_log.log(
+        "deliver", level="info" if ok else "warning", ok=ok, messages=len(messages), retries=attempts,
+        ms=round((time.perf_counter() - t0) * 1000, 3),
+    )
+    return ok
+
+
+def coalesce(events: list[tuple[list, list]]) -> tuple[list[tuple], list]:
+    """
+    같은 웹훅으로 가는 여러 (changes, new_counts) 를 하나로 합침. 변경 항목은 wbc_records.Concert.
+    같은 공연이 여러 번 바뀌었으면 처음 old 와 마지막 new 를 쓰고, 결국 그대로면 제외
+    """
+    merged: dict = {}
+    for changes, _ in events:
+        for old_c, new_c in changes:
+            key = new_c.key
+            first_old = merged[key][0] if key in merged else old_c
+            merged[key] = (first_old, new_c)
+    changes = [(o, n) for o, n in merged.values() if o.count != n.count]
+    return changes, events[-1][1]
+
+
+class Notifier:
+    """백그라운드 스레드에서 변경 알림을 모아 보내는 디스패처"""
+
+    def __init__(self, build_payload, window: float = COALESCE_WINDOW_SEC):
+        self.build_payload = build_payload  # (changes, new_counts, context) -> payload dict
+        self.window = window
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._flushing = threading.Lock()  # 묶음을 보내는 동안 잡음 (wait_idle 용)
+        self.sent = 0
+        self.failed = 0
+        self.cancelled = 0
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="wbc-notify", daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+        return self
+
+    def submit(self, webhook: str, changes: list[tuple], new_counts: list, context=None, on_done=None):
+        """
+        큐에 넣고 바로 반환 (모니터 루프를 막지 않음).
+        context(이벤트 등)는 build_payload 에 그대로 전달되며, 같은 웹훅·context 끼리만 합쳐진다
+        on_done: 전송이 끝나면 알림 스레드에서 on_done(성공 여부) 호출 (아웃박스 ack 용).
+        보내기 직전에 on_done.cancelled 가 참이면 그 항목은 보내지 않음 (리더를 잃어 닫힌 아웃박스).
+        on_done 에 parts(이미 보낸 메시지 수)·part_sent(n) 가 있고 parts > 0 이면 그 항목은 다른 항목과 합치지 않고
+        나눠진 메시지를 parts 번째부터 보냄. 혼자 보내는 항목은 메시지마다 part_sent 로 알림
+        (재시도 때 보낸 메시지를 다시 보내지 않음. 여러 항목을 합친 메시지는 재시도 때 묶음이 달라질 수 있어 기록하지 않음)
+        """
+        self._queue.put((webhook, changes, new_counts, context, on_done))
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def wait_idle(self, timeout: float = 15.0) -> bool:
+        """지금 보내는 중인 묶음이 끝날 때까지 기다림 (큐에 남은 항목은 기다리지 않음). 반환: 제시간에 끝났는지"""
+        if not self._flushing.acquire(timeout=timeout):
+            return False
+        self._flushing.release()
+        return True
+
+    def stop(self, timeout: float = 15.0):
+        """남은 알림을 보내고 스레드 종료 (최대 timeout 초 대기)"""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            stop = False
+            deadline = time.monotonic() + self.window
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    nxt = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    stop = True
+                    break
+                batch.append(nxt)
+            self._flush(batch)
+            if stop:
+                return
+
+    def _flush(self, batch):
+        with self._flushing:
+            self._flush_locked(batch)
+
+    def _flush_locked(self, batch):
+        live = [item for item in batch if not getattr(item[4], "cancelled", False)]
+        if len(live) < len(batch):
+            # 아웃박스 파일에 그대로 남아 있으므로 새 리더(또는 다시 얻은 임대)가 보냄
+            self.cancelled += len(batch) - len(live)
+            print(f"[Discord] 임대를 잃어 {len(batch) - len(live)}건은 보내지 않습니다")
+            batch = live
+        groups: dict[tuple, list] = {}
+        contexts = {}
+        callbacks: dict[tuple, list] = {}
+        for webhook, changes, new_counts, context, on_done in batch:
+            # 이미 일부 메시지를 보낸 항목만 따로 보냄 (나머지는 합쳐서 한 번에: 밀린 아웃박스도 한 메시지로)
+            partial = getattr(on_done, "parts", 0) > 0
+            key = (webhook, id(context), id(on_done) if partial else None)
+            contexts[key] = context
+            groups.setdefault(key, []).append((changes, new_counts))
+            if on_done is not None:
+                callbacks.setdefault(key, []).append(on_done)
+        for key, events in groups.items():
+            webhook, context = key[0], contexts[key]
+            changes, new_counts = coalesce(events)
+            # 합쳐서 결국 그대로인 변경은 보낼 것이 없으므로 성공으로 봄
+            ok = True
+            if changes:
+                # 혼자 보내는 항목이면 메시지마다 진행을 기록해 재시도 때 이어 보냄
+                pending = callbacks.get(key, ())
+                resume = pending[0] if len(pending) == 1 and hasattr(pending[0], "part_sent") else None
+                try:
+                    payload = self.build_payload(changes, new_counts, context)
+                    if resume is None:
+                        ok = deliver(webhook, payload)
+                    else:
+                        ok = deliver(webhook, payload, start=resume.parts, on_part=resume.part_sent)
+                except Exception as e:
+                    print(f"[Discord] 오류: {e}")
+                    ok = False
+                if ok:
+                    self.sent += 1
+                    print("[Discord] 알림 전송 완료")
+                else:
+                    self.failed += 1
+            for on_done in callbacks.get(key, ()):
+                try:
+                    on_done(ok)
+                except Exception as e:
+                    print(f"[Discord] 전송 결과 기록 실패: {e}")
@@ -0,0 +1,316 @@
+"""
+알림 아웃박스 (재시작해도 잃지 않는 알림 대기열)
+상태를 저장한 뒤 Discord 전송 전에 프로세스가 죽거나 웹훅이 계속 실패하면, 다음 주기는 이미 저장된 상태와
+비교하므로 그 변경 알림은 영영 나가지 않는다. 그래서 변경을 이력 로그보다 먼저 이 파일에 기록하고
+(HistoryStore.update 의 journal), 알림 스레드가 보낸 뒤 웹훅별로 ack 를 남긴다.
+- wbc_outbox.jsonl: append-only. add(변경 묶음) / part / ack(웹훅 하나 전송 완료) / done / drop / forget 레코드
+- 멱등 키: "공연키:이전건수>새건수". 공연마다 마지막으로 기록한 키를 기억해, 상태 저장 전에 죽어
+  같은 변경을 다시 감지해도 두 번 넣지 않음. 0→3, 3→0, 0→3 처럼 실제로 되풀이된 변경은 키 사이에
+  다른 변경이 있으므로 그대로 기록됨
+- 공연이 페이지에서 사라지면(HistoryStore.update 의 journal 이 알려 줌) 그 공연의 마지막 키를 지움(forget).
+  사라졌다가 같은 건수로 돌아온 공연의 0→3 은 이력에 다시 기록되는 실제 변경이므로 다시 알림
+- 웹훅별 ack 로 일부 웹훅만 성공한 묶음은 나머지만 다시 보냄. 여러 메시지로 나눠지는 알림은 메시지마다
+  보낸 개수(part)를 기록해 재시도 때 이어서 보냄. 실패한 묶음은 지수 백오프로 재시도하고
+  max_age_sec 이 지나면 버림(drop)
+- 파일이 compact_bytes 를 넘으면 남은 항목과 공연별 마지막 키만 남기고 원자적으로 교체
+웹훅 성공 응답을 받은 뒤 ack 를 쓰기 전에 죽는 아주 짧은 구간은 막을 수 없다 (Discord 웹훅에 멱등 키가 없음).
+웹훅 URL 은 파일에 남기지 않고 짧은 해시로만 기록한다.
+리더 임대를 잃으면 close() 로 닫아, 아직 알림 스레드에 남은 항목은 보내지 않고(Ack.cancelled)
+늦게 끝난 전송 결과도 파일에 쓰지 않는다 (새 리더가 같은 파일을 이어 씀).
+"""
+
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+
+import wbc_json
+from wbc_records import Concert
+
+RETRY_BASE_SEC = 30.0
+RETRY_MAX_SEC = 15 * 60
+MAX_AGE_SEC = 24 * 3600
+
+_dumps = wbc_json.dumps
+
+
+def transition_key(old_c: Concert, new_c: Concert) -> str:
+    """멱등 키: 공연 키 + 건수 변화"""
+    return f"{new_c.key}:{old_c.count}>{new_c.count}"
+
+
+def hook_id(webhook: str) -> str:
+    """파일에 남길 웹훅 식별자 (URL 의 토큰을 남기지 않도록 해시)"""
+    return hashlib.sha1(webhook.encode("utf-8")).hexdigest()[:12]
+
+
+class Entry:
+    """아웃박스 항목 하나: 한 주기에 감지한 변경 묶음과 전송 상태"""
+
+    __slots__ = ("seq", "t", "changes", "counts", "acked", "parts", "inflight", "failed", "attempts", "retry_at")
+
+    def __init__(self, seq: int, t: float, changes: list, counts: list):
+        self.seq = seq
+        self.t = t
+        self.changes = changes  # [(old Concert, new Concert)]
+        self.counts = counts  # 그 주기의 전체 공연 (payload 의 '현재 매수 가능' 용)
+        self.acked: set[str] = set()  # 전송 완료한 웹훅 hook_id
+        self.parts: dict[str, int] = {}  # hook_id → 나눠진 메시지 중 이미 보낸 개수 (전송 완료 전)
+        self.inflight: set[str] = set()  # 알림 스레드에 넘긴 웹훅 hook_id
+        self.failed = False
+        self.attempts = 0
+        self.retry_at = 0.0
+
+    def __repr__(self):
+        return f"Entry(seq={self.seq}, changes={len(self.changes)}, acked={len(self.acked)})"
+
+
+class Ack:
+    """알림 스레드에 넘기는 전송 결과 콜백 (Notifier.submit 의 on_done). 아웃박스가 닫히면 cancelled"""
+
+    __slots__ = ("outbox", "entry", "webhook")
+
+    def __init__(self, outbox: "Outbox", entry: Entry, webhook: str):
+        self.outbox = outbox
+        self.entry = entry
+        self.webhook = webhook
+
+    @property
+    def cancelled(self) -> bool:
+        return self.outbox.closed
+
+    @property
+    def parts(self) -> int:
+        """이 웹훅으로 이미 보낸 메시지 수 (Notifier 가 그 다음 메시지부터 보냄)"""
+        return self.entry.parts.get(hook_id(self.webhook), 0)
+
+    def part_sent(self, n: int):
+        self.outbox.part_sent(self.entry, self.webhook, n)
+
+    def __call__(self, ok: bool):
+        self.outbox.delivered(self.entry, self.webhook, ok)
+
+
+class Outbox:
+    """append-only JSONL 아웃박스 + 메모리의 미전송 항목"""
+
+    def __init__(self, path, compact_bytes: int = 256 * 1024, max_age_sec: float = MAX_AGE_SEC, clock=time.time):
+        self.path = Path(path)
+        self.compact_bytes = compact_bytes
+        self.max_age_sec = max_age_sec
+        self.clock = clock
+        self.pending: dict[int, Entry] = {}  # seq → 항목 (기록 순서)
+        self.last: dict[str, str] = {}  # str(공연 키) → 마지막으로 기록한 멱등 키
+        self.duplicates = 0  # 이미 기록된 변경이라 넣지 않은 수
+        self.dropped = 0
+        self.closed = False  # 닫힌 뒤에는 파일에 쓰지 않음
+        self._seq = 0
+        self._lock = threading.Lock()
+        self.load()
+
+    def __len__(self):
+        return len(self.pending)
+
+    # ---- 로드 ----
+
+    def load(self):
+        self.pending = {}
+        self.last = {}
+        self._seq = 0
+        if not self.path.exists():
+            return
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    rec = wbc_json.loads(line)
+                except ValueError:
+                    # 비정상 종료로 잘린 마지막 줄은 무시
+                    continue
+                self._apply(rec)
+
+    def _apply(self, rec: dict):
+        op = rec.get("op")
+        seq = rec.get("seq", 0)
+        if op == "add":
+            changes = [(Concert.from_dict(o), Concert.from_dict(n)) for o, n in rec["changes"]]
+            entry = Entry(seq, rec.get("t", 0.0), changes, [Concert.from_dict(d) for d in rec.get("counts") or []])
+            entry.acked.update(rec.get("acked") or ())
+            entry.parts.update(rec.get("parts") or {})
+            self.pending[seq] = entry
+            for old_c, new_c in changes:
+                self.last[str(new_c.key)] = transition_key(old_c, new_c)
+            self._seq = max(self._seq, seq)
+        elif op == "part":
+            entry = self.pending.get(seq)
+            if entry is not None:
+                entry.parts[rec["hook"]] = rec["n"]
+        elif op == "ack":
+            entry = self.pending.get(seq)
+            if entry is not None:
+                entry.acked.add(rec["hook"])
+                entry.parts.pop(rec["hook"], None)
+        elif op in ("done", "drop"):
+            self.pending.pop(seq, None)
+        elif op == "forget":
+            for key in rec.get("keys") or ():
+                self.last.pop(key, None)
+        elif op == "seen":
+            self.last.update(rec.get("last") or {})
+            self._seq = max(self._seq, rec.get("seq_max", 0))
+
+    # ---- 기록 ----
+
+    def _append(self, recs: list[dict]):
+        if self.closed:
+            return
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(_dumps(r) + "\n" for r in recs))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def add(self, changes: list[tuple], counts: list, removed=()) -> Entry | None:
+        """
+        변경 묶음을 기록 (fsync 후 반환). 이미 기록한 변경(공연의 마지막 키와 같음)은 빼고,
+        남는 게 없으면 None. HistoryStore.update(journal=...) 로 이력 기록 직전에 호출.
+        removed: 페이지에서 사라진 공연 키. 마지막 키를 지워 다시 나타났을 때의 변경을 중복으로 보지 않음
+        """
+        with self._lock:
+            forget = [str(k) for k in removed if str(k) in self.last]
+            if forget:
+                self._append([{"op": "forget", "keys": forget}])
+                for key in forget:
+                    del self.last[key]
+            fresh = []
+            for old_c, new_c in changes:
+                if self.last.get(str(new_c.key)) == transition_key(old_c, new_c):
+                    self.duplicates += 1
+                    continue
+                fresh.append((old_c, new_c))
+            if not fresh:
+                return None
+            self._seq += 1
+            entry = Entry(self._seq, self.clock(), fresh, list(counts))
+            self._append([{
+                "op": "add",
+                "seq": entry.seq,
+                "t": entry.t,
+                "keys": [transition_key(o, n) for o, n in fresh],
+                "changes": [[o.to_dict(), n.to_dict()] for o, n in fresh],
+                "counts": [c.to_dict() for c in entry.counts],
+            }])
+            for old_c, new_c in fresh:
+                self.last[str(new_c.key)] = transition_key(old_c, new_c)
+            self.pending[entry.seq] = entry
+            return entry
+
+    def due(self) -> list[Entry]:
+        """지금 보낼 항목 (전송 중이 아니고 재시도 시각이 지남). 너무 오래된 항목은 버림"""
+        with self._lock:
+            if not self.pending:
+                return []
+            now = self.clock()
+            out = []
+            expired = []
+            for entry in self.pending.values():
+                if entry.inflight or entry.retry_at > now:
+                    continue
+                if self.max_age_sec and now - entry.t > self.max_age_sec:
+                    expired.append(entry)
+                    continue
+                out.append(entry)
+            if expired:
+                for entry in expired:
+                    self.pending.pop(entry.seq, None)
+                    print(f"[아웃박스] {entry.attempts}회 실패 후 오래된 알림을 버립니다 (seq {entry.seq}, 변경 {len(entry.changes)}건)")
+                self.dropped += len(expired)
+                self._append([{"op": "drop", "seq": e.seq} for e in expired])
+                self._maybe_compact()
+            return out
+
+    def begin(self, entry: Entry, webhooks) -> list[str]:
+        """보낼 웹훅 목록을 받아 아직 ack 되지 않은 것만 전송 중으로 표시하고 반환. 보낼 게 없으면 완료 처리"""
+        with self._lock:
+            todo = [w for w in dict.fromkeys(webhooks) if hook_id(w) not in entry.acked]
+            entry.inflight = {hook_id(w) for w in todo}
+            if not todo:
+                self._finish(entry)
+            return todo
+
+    def callback(self, entry: Entry, webhook: str) -> Ack:
+        """begin 이 돌려준 웹훅 하나의 전송 결과를 delivered 로 넘기는 on_done"""
+        return Ack(self, entry, webhook)
+
+    def close(self):
+        """리더 임대를 잃었을 때: 이후 전송 결과·기록을 파일에 남기지 않음"""
+        with self._lock:
+            self.closed = True
+
+    def part_sent(self, entry: Entry, webhook: str, n: int):
+        """나눠진 메시지 중 n 개를 이 웹훅으로 보냄 (재시도 때 n+1 번째부터 보냄)"""
+        with self._lock:
+            h = hook_id(webhook)
+            entry.parts[h] = n
+            self._append([{"op": "part", "seq": entry.seq, "hook": h, "n": n}])
+
+    def delivered(self, entry: Entry, webhook: str, ok: bool):
+        """알림 스레드의 전송 결과. 성공이면 ack 기록, 묶음의 모든 웹훅이 끝나면 완료 또는 재시도 예약"""
+        with self._lock:
+            h = hook_id(webhook)
+            entry.inflight.discard(h)
+            if ok:
+                entry.acked.add(h)
+                entry.parts.pop(h, None)
+                self._append([{"op": "ack", "seq": entry.seq, "hook": h}])
+            else:
+                entry.failed = True
+            if entry.inflight:
+                return
+            if entry.failed:
+                entry.failed = False
+                entry.attempts += 1
+                entry.retry_at = self.clock() + min(RETRY_MAX_SEC, RETRY_BASE_SEC * 2 ** (entry.attempts - 1))
+            else:
+                self._finish(entry)
+
+    def _finish(self, entry: Entry):
+        if self.pending.pop(entry.seq, None) is not None:
+            self._append([{"op": "done", "seq": entry.seq}])
+            self._maybe_compact()
+
+    # ---- 압축 ----
+
+    def _size(self) -> int:
+        try:
+            return self.path.stat().st_size
+        except OSError:
+            return 0
+
+    def _maybe_compact(self):
+        if self.compact_bytes and self._size() > self.compact_bytes:
+            self.compact()
+
+    def compact(self):
+        """남은 항목(ack 포함)과 공연별 마지막 멱등 키만 남기고 원자적으로 교체 (호출 측이 잠금 보유)"""
+        if self.closed:
+            return
+        recs = [{"op": "seen", "seq_max": self._seq, "last": self.last}]
+        for entry in self.pending.values():
+            recs.append({
+                "op": "add",
+                "seq": entry.seq,
+                "t": entry.t,
+                "keys": [transition_key(o, n) for o, n in entry.changes],
+                "changes": [[o.to_dict(), n.to_dict()] for o, n in entry.changes],
+                "counts": [c.to_dict() for c in entry.counts],
+                "acked": sorted(entry.acked),
+                "parts": entry.parts,
+            })
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("".join(_dumps(r) + "\n" for r in recs))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        # 남은 항목이 많아 줄지 않으면 매번 압축하지 않도록 기준을 늘림
+        self.compact_bytes = max(self.compact_bytes, self._size() * 2)
@@ -0,0 +1,302 @@
+"""
+실행 중인 모니터의 필요할 때만 켜는 프로파일링
+가끔 한 주기가 유난히 오래 걸릴 때, 재시작하거나 print 를 넣지 않고 그 자리에서 원인을 본다.
+SIGUSR1 (또는 메트릭 포트의 POST /debug/profile) 을 받으면 한 번의 세션을 시작한다.
+- stacks: 지금 모든 스레드의 스택을 바로 파일로 남기고, 세션 동안 SAMPLE_INTERVAL_SEC 마다
+  모든 스레드 스택을 표본 추출해 collapsed 형식(flamegraph.pl / speedscope 입력)으로 집계
+- cpu: 다음 N 주기의 run_once 를 cProfile 로 잼 (.prof 원본 + 누적 시간 상위 요약)
+- mem: tracemalloc 이 꺼져 있으면 켜고, N 주기 뒤 현재 할당 상위 top 개와 세션 중 증가분을 기록한 뒤 다시 끔
+결과는 PROFILE_DIR 에 시각_pid 접두어 파일로 남는다.
+세션이 없을 때 주기마다 드는 비용은 cycle_begin() 의 전역 변수 확인 한 번뿐이고,
+cProfile / tracemalloc / traceback 은 세션을 시작할 때 처음 import 한다.
+"""
+
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import wbc_log
+
+PROFILE_DIR = Path(os.environ.get("WBC_PROFILE_DIR") or Path(__file__).parent / "profiles")
+DEFAULT_CYCLES = int(os.environ.get("WBC_PROFILE_CYCLES", "5"))
+TOP_N = int(os.environ.get("WBC_PROFILE_TOP", "25"))
+SAMPLE_INTERVAL_SEC = float(os.environ.get("WBC_PROFILE_SAMPLE_MS", "10")) / 1000
+# 주기가 오지 않아도(대기 복제본, 긴 백오프) 표본 추출은 이 시간 뒤 멈춤
+SAMPLE_MAX_SEC = float(os.environ.get("WBC_PROFILE_MAX_SEC", "600"))
+KINDS = ("cpu", "mem", "stacks")
+
+_session = None  # 진행 중인 Session (없으면 None — cycle_begin 이 보는 유일한 값)
+_lock = threading.RLock()  # 시그널 처리기가 메인 스레드에서 끼어들 수 있으므로 재진입 가능
+_last: dict = {}  # 마지막으로 끝난 세션 요약 (status 용)
+
+
+def _stamp() -> str:
+    return f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')[:-3]}_{os.getpid()}"
+
+
+def _write(path: Path, text: str) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def _thread_names() -> dict:
+    return {t.ident: t.name for t in threading.enumerate()}
+
+
+def format_stacks() -> str:
+    """모든 스레드의 현재 스택 (스레드 이름·id 포함)"""
+    import traceback
+
+    names = _thread_names()
+    out = []
+    for ident, frame in sys._current_frames().items():
+        out.append(f"--- {names.get(ident, '?')} ({ident})")
+        out.append("".join(traceback.format_stack(frame)).rstrip())
+        out.append("")
+    return "\n".join(out)
+
+
+def dump_stacks(directory: Path | None = None) -> Path:
+    """모든 스레드 스택을 시각이 붙은 파일로 저장 (같은 시각 파일이 있으면 번호를 붙임). 반환: 파일 경로"""
+    base = Path(directory or PROFILE_DIR) / _stamp()
+    path, n = base.with_name(base.name + "_stacks.txt"), 1
+    while path.exists():
+        n += 1
+        path = base.with_name(f"{base.name}-{n}_stacks.txt")
+    return _write(path, format_stacks())
+
+
+class _Sampler(threading.Thread):
+    """모든 스레드 스택을 주기적으로 표본 추출해 (스레드;프레임;...) 별 횟수로 집계"""
+
+    def __init__(self, interval: float, max_sec: float):
+        super().__init__(name="wbc-profile", daemon=True)
+        self.interval = interval
+        self.max_sec = max_sec
+        self.counts: dict[str, int] = {}
+        self.samples = 0
+        self._halt = threading.Event()
+
+    def run(self):
+        own = threading.get_ident()
+        deadline = time.monotonic() + self.max_sec
+        while not self._halt.wait(self.interval) and time.monotonic() < deadline:
+            names = _thread_names()
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                key = ";".join(reversed(stack))
+                self.counts[key] = self.counts.get(key, 0) + 1
+            self.samples += 1
+
+    def stop(self) -> str:
+        self._halt.set()
+        self.join(timeout=5)
+        return "".join(f"{k} {v}\n" for k, v in sorted(self.counts.items(), key=lambda kv: -kv[1]))
+
+
+class Session:
+    """프로파일 세션 하나: N 주기 동안 cProfile / tracemalloc / 스택 표본"""
+
+    def __init__(self, cycles: int, top: int, kinds, directory: Path):
+        self.cycles = max(1, cycles)
+        self.top = top
+        self.kinds = tuple(k for k in KINDS if k in kinds)
+        self.dir = Path(directory)
+        self.prefix = _stamp()
+        self.done = 0
+        self.files: list[str] = []
+        self.started = time.monotonic()
+        self._profile = None
+        self._sampler = None
+        self._own_tracemalloc = False
+        self._baseline = None
+
+    def start(self):
+        if "stacks" in self.kinds:
+            self.files.append(str(_write(self.dir / f"{self.prefix}_stacks.txt", format_stacks())))
+            self._sampler = _Sampler(SAMPLE_INTERVAL_SEC, SAMPLE_MAX_SEC)
+            self._sampler.start()
+        if "cpu" in self.kinds:
+            import cProfile
+
+            self._profile = cProfile.Profile()
+        if "mem" in self.kinds:
+            import tracemalloc
+
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._own_tracemalloc = True
+            self._baseline = tracemalloc.take_snapshot()
+        return self
+
+    def begin(self):
+        if self._profile is not None:
+            self._profile.enable()
+        return self
+
+    def end(self) -> bool:
+        """주기 하나 끝. 반환: 세션이 끝났는지"""
+        if self._profile is not None:
+            self._profile.disable()
+        self.done += 1
+        return self.done >= self.cycles
+
+    def finish(self) -> list[str]:
+        """결과 파일 기록 후 켠 것 모두 끄기. 반환: 파일 경로 목록"""
+        elapsed = time.monotonic() - self.started
+        if self._profile is not None:
+            import io
+            import pstats
+
+            prof = self.dir / f"{self.prefix}_cpu.prof"
+            self.dir.mkdir(parents=True, exist_ok=True)
+            self._profile.dump_stats(prof)
+            buf = io.StringIO()
+            stats = pstats.Stats(self._profile, stream=buf)
+            stats.sort_stats("cumulative").print_stats(self.top)
+            stats.sort_stats("tottime").print_stats(self.top)
+            header = f"# {self.done}주기 cProfile ({elapsed:.1f}초 동안)\n"
+            self.files += [str(prof), str(_write(self.dir / f"{self.prefix}_cpu.txt", header + buf.getvalue()))]
+        if self._baseline is not None:
+            import tracemalloc
+
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            lines = [f"# tracemalloc: 현재 {current / 1024:.1f} KiB, 최대 {peak / 1024:.1f} KiB ({self.done}주기)", "",
+                     f"## 현재 할당 상위 {self.top}"]
+            lines += [str(s) for s in snapshot.statistics("lineno")[: self.top]]
+            lines += ["", f"## 세션 중 증가 상위 {self.top}"]
+            lines += [str(s) for s in snapshot.compare_to(self._baseline, "lineno")[: self.top]]
+            self.files.append(str(_write(self.dir / f"{self.prefix}_tracemalloc.txt", "\n".join(lines) + "\n")))
+            self._baseline = None
+            if self._own_tracemalloc:
+                tracemalloc.stop()
+        if self._sampler is not None:
+            collapsed = self._sampler.stop()
+            self.files.append(str(_write(self.dir / f"{self.prefix}_samples.txt", collapsed)))
+        return self.files
+
+    def abort(self):
+        """결과 없이 정리 (표본 스레드 종료, 직접 켠 tracemalloc 끄기)"""
+        if self._sampler is not None:
+            self._sampler.stop()
+        if self._own_tracemalloc:
+            import tracemalloc
+
+            tracemalloc.stop()
+
+
+def active() -> bool:
+    return _session is not None
+
+
+def request(cycles: int | None = None, top: int | None = None, kinds=KINDS, directory=None) -> str:
+    """세션 시작 (이미 진행 중이면 그대로). 반환: 사람이 읽는 결과 메시지"""
+    global _session
+    with _lock:
+        if _session is not None:
+            return f"이미 진행 중 ({_session.done}/{_session.cycles}주기)"
+        kinds = [k for k in kinds if k in KINDS]
+        if not kinds:
+            return f"알 수 없는 종류 (가능: {', '.join(KINDS)})"
+        session = Session(cycles or DEFAULT_CYCLES, top or TOP_N, kinds, directory or PROFILE_DIR)
+        try:
+            session.start()
+        except Exception:
+            session.abort()
+            raise
+        _session = session
+    msg = f"프로파일 시작: 다음 {session.cycles}주기, {'/'.join(session.kinds)} → {session.dir}"
+    print(f"[프로파일] {msg}")
+    wbc_log.log("profile_start", cycles=session.cycles, kinds=list(session.kinds))
+    return msg
+
+
+def cycle_begin():
+    """run_once 시작. 세션이 없으면 None (주기마다 드는 비용은 이 확인 한 번)"""
+    session = _session
+    if session is None:
+        return None
+    return session.begin()
+
+
+def cycle_end(session):
+    """run_once 끝. 세션의 주기 수를 채우면 결과 기록"""
+    global _session
+    if session is None or not session.end():
+        return
+    with _lock:
+        if _session is not session:
+            return
+        _session = None
+    files = session.finish()
+    _last.update(files=files, cycles=session.done, finished=datetime.now().isoformat(timespec="seconds"))
+    print(f"[프로파일] {session.done}주기 완료: {', '.join(files)}")
+    wbc_log.log("profile_done", cycles=session.done, files=files)
+
+
+def cancel() -> bool:
+    """진행 중인 세션을 결과 없이 끝냄. 반환: 끝낸 세션이 있었는지"""
+    global _session
+    with _lock:
+        session, _session = _session, None
+    if session is None:
+        return False
+    session.abort()
+    return True
+
+
+def status() -> dict:
+    session = _session
+    if session is None:
+        return {"active": False, "last": dict(_last)}
+    return {"active": True, "done": session.done, "cycles": session.cycles, "kinds": list(session.kinds)}
+
+
+def http_handler(method: str, query: dict) -> tuple[int, str]:
+    """
+    메트릭 포트의 /debug/profile.
+    GET: 상태(JSON), POST ?cycles=N&top=N&kinds=cpu,mem,stacks: 세션 시작, POST ?action=stacks: 스택만 바로 저장
+    """
+    import json
+
+    if method == "GET":
+        return 200, json.dumps(status(), ensure_ascii=False)
+    first = {k: v[0] for k, v in query.items() if v}
+    try:
+        if first.get("action") == "stacks":
+            return 200, f"스택 저장: {dump_stacks()}"
+        if first.get("action") == "cancel":
+            return 200, "취소함" if cancel() else "진행 중인 세션 없음"
+        kinds = first.get("kinds", ",".join(KINDS)).split(",")
+        return 200, request(int(first.get("cycles") or 0) or None, int(first.get("top") or 0) or None, kinds)
+    except ValueError as e:
+        return 400, f"잘못된 값: {e}"
+
+
+def install_signal() -> bool:
+    """SIGUSR1 로 세션 시작 (지원하는 OS 에서만). 반환: 설치 여부"""
+    import signal
+
+    if not hasattr(signal, "SIGUSR1") or threading.current_thread() is not threading.main_thread():
+        return False
+
+    def handler(*_):
+        try:
+            request()
+        except Exception as e:
+            print(f"[프로파일] 시작 실패: {e}")
+
+    signal.signal(signal.SIGUSR1, handler)
+    return True
@@ -0,0 +1,84 @@
+"""
+공연 레코드 타입
+parse_counts 결과, 이력 저장소, 변경 비교, Discord payload 가 같은 Concert 레코드를 쓴다.
+__slots__ 클래스라 공연마다 dict 를 만들지 않고, 날짜 표시 변환은 문자열별로 캐시한다.
+(dataclasses 는 import 비용이 커서 쓰지 않음)
+"""
+
+from functools import lru_cache
+
+
+class Concert:
+    __slots__ = ("id", "date", "time", "name", "count")
+
+    def __init__(self, id: int | None, date: str, time: str, name: str, count: int):
+        self.id = id
+        self.date = date
+        self.time = time
+        self.name = name
+        self.count = count
+
+    def __repr__(self):
+        return (
+            f"Concert(id={self.id!r}, date={self.date!r}, time={self.time!r}, "
+            f"name={self.name!r}, count={self.count!r})"
+        )
+
+    def __eq__(self, other):
+        if other.__class__ is not Concert:
+            return NotImplemented
+        return self.id == other.id and self.count == other.count and self.same_info(other)
+
+    __hash__ = None
+
+    @property
+    def key(self):
+        """상태/이력 키. 공연 id 가 있으면 id, 없으면 날짜_시간"""
+        return self.id if self.id is not None else f"{self.date}_{self.time}"
+
+    def same_info(self, other: "Concert") -> bool:
+        """날짜·시간·이름이 같은지 (건수 제외)"""
+        return self.date == other.date and self.time == other.time and self.name == other.name
+
+    def with_count(self, count: int) -> "Concert":
+        return Concert(self.id, self.date, self.time, self.name, count)
+
+    def to_dict(self) -> dict:
+        return {"id": self.id, "date": self.date, "time": self.time, "name": self.name, "count": self.count}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Concert":
+        return cls(d.get("id"), d.get("date") or "?", d.get("time") or "?", d.get("name") or "", d.get("count") or 0)
+
+
+def as_concert(c) -> Concert:
+    """dict(예전 상태 파일 등)도 Concert 로 변환"""
+    return c if isinstance(c, Concert) else Concert.from_dict(c)
+
+
+@lru_cache(maxsize=1024)
+def display_date(date_str: str) -> str:
+    """
+    "2026年03月02日" → "03/02". 그 외 형식은 그대로, 비어 있으면 "?".
+    같은 날짜 문자열이 매 주기 반복되므로 결과를 캐시
+    """
+    if not date_str:
+        return "?"
+    if "年" in date_str and "月" in date_str and "日" in date_str:
+        try:
+            _, rest = date_str.split("年", 1)
+            month, rest2 = rest.split("月", 1)
+            day = rest2.split("日", 1)[0]
+            return f"{int(month):02d}/{int(day):02d}"
+        except Exception:
+            return date_str
+    return date_str
+
+
+def parse_count(value) -> int:
+    """listings_count → 0 이상의 정수. 숫자가 아니면 0"""
+    if type(value) is int:
+        return value if value >= 0 else 0
+    if isinstance(value, (float, str)) and str(value).isdigit():
+        return int(value)
+    return 0
@@ -0,0 +1,310 @@
+"""
+공연별 알림 규칙
+어떤 변경을 어느 웹훅으로 보내고 누구를 멘션할지 설정 파일(JSON)로 정한다.
+이벤트의 target_ids(0건 → 1건 이상이면 @everyone)도 규칙 하나로 바뀌어 같은 경로로 처리된다.
+
+설정 파일 예:
+{
+  "route_all": true,
+  "rules": [
+    {"name": "한일전", "ids": [1519], "cross_above": 1, "mention": "everyone"},
+    {"name": "일본 경기 대량", "name_regex": "日本", "date_from": "03/05", "date_to": "03/10",
+     "min_count": 10, "webhook_env": "JAPAN_WEBHOOK_URL", "mention": ["role:123456789012345678"]},
+    {"name": "급감", "event": "wbc2026", "max_delta": -10}
+  ]
+}
+
+조건 (모두 만족해야 일치, 없는 조건은 통과):
+- ids: 공연 id 목록 / name_regex: 공연 이름 정규식 / date_from, date_to: 날짜 범위(MM/DD, 양끝 포함)
+- event: 이벤트 slug (문자열 또는 목록)
+- min_count, max_count: 바뀐 뒤 건수 범위 / cross_above: 이전 건수 < N <= 바뀐 뒤 건수
+- min_delta, max_delta: 건수 변화량(바뀐 뒤 - 이전) 범위
+라우팅:
+- webhook 또는 webhook_env: 일치한 변경을 보낼 웹훅 (없으면 이벤트 웹훅)
+- mention: "everyone" / "here" / "role:ID" / "user:ID" 또는 그 목록
+- route_all(기본 true): 규칙과 상관없이 모든 변경을 이벤트 웹훅으로도 보냄
+
+규칙은 한 번 컴파일해 id → 규칙 색인과 id 가 없는 규칙의 대체 목록으로 나눈다.
+공연마다 변하지 않는 조건(이벤트·id·이름·날짜)의 결과는 공연별로 캐시하므로,
+규칙이 수백 개여도 변경 하나를 평가하는 비용은 그 공연에 해당하는 규칙 수에만 비례한다.
+"""
+
+import json
+import os
+import re
+
+# 공연별 정적 조건 결과 캐시 상한 (넘으면 비움)
+_CACHE_MAX = 8192
+
+_DATE_NUMS = re.compile(r"\d+")
+
+
+def _norm_date(value) -> str | None:
+    """'03/05', '2026-03-05', '2026年03月05日' → '03/05'. 알 수 없으면 None"""
+    if not isinstance(value, str):
+        return None
+    nums = _DATE_NUMS.findall(value)
+    if len(nums) < 2:
+        return None
+    month, day = nums[-2], nums[-1]
+    return f"{int(month):02d}/{int(day):02d}"
+
+
+def _as_list(value) -> list:
+    if value is None:
+        return []
+    return list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+
+class Mention:
+    """멘션 정책. 여러 규칙의 멘션을 합쳐 Discord content / allowed_mentions 로 변환"""
+
+    __slots__ = ("everyone", "here", "roles", "users")
+
+    def __init__(self, everyone=False, here=False, roles=(), users=()):
+        self.everyone = everyone
+        self.here = here
+        self.roles = frozenset(roles)
+        self.users = frozenset(users)
+
+    @classmethod
+    def parse(cls, value) -> "Mention":
+        everyone = here = False
+        roles, users = set(), set()
+        for token in _as_list(value):
+            token = str(token).strip()
+            if token in ("", "none"):
+                continue
+            if token in ("everyone", "@everyone"):
+                everyone = True
+            elif token in ("here", "@here"):
+                here = True
+            elif token.startswith("role:"):
+                roles.add(token[5:])
+            elif token.startswith("user:"):
+                users.add(token[5:])
+            else:
+                raise ValueError(f"알 수 없는 mention 값: {token!r} (everyone / here / role:ID / user:ID)")
+        return cls(everyone, here, roles, users)
+
+    def __bool__(self):
+        return bool(self.everyone or self.here or self.roles or self.users)
+
+    def __or__(self, other: "Mention") -> "Mention":
+        return Mention(
+            self.everyone or other.everyone, self.here or other.here,
+            self.roles | other.roles, self.users | other.users,
+        )
+
+    def content(self) -> str | None:
+        parts = []
+        if self.everyone:
+            parts.append("@everyone")
+        if self.here:
+            parts.append("@here")
+        parts += [f"<@&{r}>" for r in sorted(self.roles)]
+        parts += [f"<@{u}>" for u in sorted(self.users)]
+        return " ".join(parts) or None
+
+    def allowed_mentions(self) -> dict | None:
+        """멘션이 없으면 None (기존 payload 처럼 allowed_mentions 를 넣지 않음)"""
+        if not self:
+            return None
+        allowed: dict = {}
+        if self.everyone or self.here:
+            allowed["parse"] = ["everyone"]
+        if self.roles:
+            allowed["roles"] = sorted(self.roles)
+        if self.users:
+            allowed["users"] = sorted(self.users)
+        return allowed
+
+
+NO_MENTION = Mention()
+
+
+class Rule:
+    """컴파일된 규칙 하나"""
+
+    __slots__ = (
+        "name", "ids", "events", "pattern", "date_from", "date_to",
+        "min_count", "max_count", "cross_above", "min_delta", "max_delta", "webhook", "mention",
+    )
+
+    def __init__(self, name: str = "", ids=(), events=(), name_regex: str | None = None,
+                 date_from=None, date_to=None, min_count=None, max_count=None, cross_above=None,
+                 min_delta=None, max_delta=None, webhook: str = "", mention=None):
+        self.name = name
+        self.ids = frozenset(ids)
+        self.events = frozenset(events)
+        self.pattern = re.compile(name_regex) if name_regex else None
+        self.date_from = _norm_date(date_from) if date_from is not None else None
+        self.date_to = _norm_date(date_to) if date_to is not None else None
+        self.min_count = min_count
+        self.max_count = max_count
+        self.cross_above = cross_above
+        self.min_delta = min_delta
+        self.max_delta = max_delta
+        self.webhook = (webhook or "").strip()
+        self.mention = mention if isinstance(mention, Mention) else Mention.parse(mention)
+
+    @classmethod
+    def from_dict(cls, entry: dict, index: int = 0) -> "Rule":
+        webhook = entry.get("webhook")
+        if not webhook and entry.get("webhook_env"):
+            webhook = os.environ.get(entry["webhook_env"], "")
+            if not webhook:
+                print(f"[경고] 규칙 {entry.get('name') or index}: 환경 변수 {entry['webhook_env']} 가 비어 이벤트 웹훅을 사용합니다")
+        try:
+            return cls(
+                name=entry.get("name") or f"rule{index}",
+                ids=_as_list(entry.get("ids", entry.get("id"))),
+                events=_as_list(entry.get("event", entry.get("events"))),
+                name_regex=entry.get("name_regex"),
+                date_from=entry.get("date_from"),
+                date_to=entry.get("date_to"),
+                min_count=entry.get("min_count"),
+                max_count=entry.get("max_count"),
+                cross_above=entry.get("cross_above"),
+                min_delta=entry.get("min_delta"),
+                max_delta=entry.get("max_delta"),
+                webhook=webhook or "",
+                mention=entry.get("mention"),
+            )
+        except re.error as e:
+            raise ValueError(f"규칙 {entry.get('name') or index}: name_regex 오류: {e}") from None
+
+    def static_match(self, slug: str, concert) -> bool:
+        """공연마다 변하지 않는 조건 (이벤트·id·이름·날짜)"""
+        if self.events and slug not in self.events:
+            return False
+        if self.ids and concert.id not in self.ids:
+            return False
+        if self.pattern is not None and not self.pattern.search(concert.name or ""):
+            return False
+        if self.date_from is not None or self.date_to is not None:
+            date = _norm_date(concert.date)
+            if date is None:
+                return False
+            if self.date_from is not None and date < self.date_from:
+                return False
+            if self.date_to is not None and date > self.date_to:
+                return False
+        return True
+
+    def count_match(self, old_count: int, new_count: int) -> bool:
+        """건수·변화량 조건"""
+        if self.min_count is not None and new_count < self.min_count:
+            return False
+        if self.max_count is not None and new_count > self.max_count:
+            return False
+        if self.cross_above is not None and not (old_count < self.cross_above <= new_count):
+            return False
+        delta = new_count - old_count
+        if self.min_delta is not None and delta < self.min_delta:
+            return False
+        if self.max_delta is not None and delta > self.max_delta:
+            return False
+        return True
+
+    def __repr__(self):
+        return f"Rule({self.name!r})"
+
+
+class Target:
+    """알림 한 갈래 (이벤트, 웹훅). 알림 스레드가 같은 Target 끼리 합칠 수 있도록 RuleSet 이 재사용"""
+
+    __slots__ = ("event", "webhook")
+
+    def __init__(self, event, webhook: str):
+        self.event = event
+        self.webhook = webhook
+
+
+class RuleSet:
+    """컴파일된 규칙 모음. route() 로 변경을 웹훅별로 나누고, mention() 으로 멘션을 정함"""
+
+    def __init__(self, rules=(), route_all: bool = True):
+        self.route_all = route_all
+        self.rules: list[Rule] = []
+        self._by_id: dict = {}
+        self._fallback: list[Rule] = []
+        self._static: dict = {}
+        self._targets: dict[tuple, Target] = {}
+        self._event_targets: set[tuple] = set()
+        for rule in rules:
+            self.add(rule)
+
+    def add(self, rule: Rule):
+        self.rules.append(rule)
+        if rule.ids:
+            for concert_id in rule.ids:
+                self._by_id.setdefault(concert_id, []).append(rule)
+        else:
+            self._fallback.append(rule)
+        self._static.clear()
+
+    def add_event_targets(self, events):
+        """이벤트 설정의 target_ids 를 '0건 → 1건 이상이면 @everyone' 규칙으로 추가 (이벤트당 한 번)"""
+        for ev in events:
+            key = (ev.slug, frozenset(ev.target_ids))
+            if key in self._event_targets:
+                continue
+            self._event_targets.add(key)
+            if ev.target_ids:
+                self.add(Rule(f"{ev.slug}:target_ids", ids=ev.target_ids, events=[ev.slug],
+                              cross_above=1, mention="everyone"))
+
+    def candidates(self, slug: str, concert) -> tuple:
+        """공연에 해당할 수 있는 규칙 (정적 조건 통과분, 공연별 캐시)"""
+        key = (slug, concert.id, concert.name, concert.date)
+        cached = self._static.get(key)
+        if cached is None:
+            if len(self._static) >= _CACHE_MAX:
+                self._static.clear()
+            pool = self._by_id.get(concert.id, ())
+            cached = tuple(r for r in (*pool, *self._fallback) if r.static_match(slug, concert))
+            self._static[key] = cached
+        return cached
+
+    def matches(self, slug: str, old_c, new_c) -> list[Rule]:
+        return [r for r in self.candidates(slug, new_c) if r.count_match(old_c.count, new_c.count)]
+
+    def target(self, event, webhook: str) -> Target:
+        key = (id(event), webhook)
+        t = self._targets.get(key)
+        if t is None:
+            t = self._targets[key] = Target(event, webhook)
+        return t
+
+    def route(self, event, changes: list[tuple]) -> dict[Target, list[tuple]]:
+        """변경을 보낼 곳(Target)별로 나눔. 웹훅이 비어 있는 갈래는 제외"""
+        out: dict[Target, list[tuple]] = {}
+        for old_c, new_c in changes:
+            hooks = {event.webhook} if self.route_all else set()
+            for rule in self.matches(event.slug, old_c, new_c):
+                hooks.add(rule.webhook or event.webhook)
+            for hook in hooks:
+                if hook:
+                    out.setdefault(self.target(event, hook), []).append((old_c, new_c))
+        return out
+
+    def mention(self, event, webhook: str, changes: list[tuple]) -> Mention:
+        """webhook 으로 가는 변경들에 일치한 규칙의 멘션을 합침"""
+        result = NO_MENTION
+        for old_c, new_c in changes:
+            for rule in self.matches(event.slug, old_c, new_c):
+                if rule.mention and (rule.webhook or event.webhook) == webhook:
+                    result = result | rule.mention
+        return result
+
+
+def load_rules(path) -> RuleSet:
+    """JSON 설정 파일에서 규칙 로드 ({"rules": [...], "route_all": bool} 또는 규칙 목록)"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    entries = data.get("rules") if isinstance(data, dict) else data
+    route_all = data.get("route_all", True) if isinstance(data, dict) else True
+    if not isinstance(entries, list):
+        raise ValueError(f"{path}: rules 목록이 없습니다")
+    return RuleSet((Rule.from_dict(e, i) for i, e in enumerate(entries)), route_all=bool(route_all))
@@ -0,0 +1,139 @@
+"""
+이벤트 실행 스케줄러
+여러 이벤트를 하나의 루프에서 각자의 간격으로 실행한다.
+- 다음 실행 시각(deadline)을 단조 시계(monotonic) 기준 힙으로 관리해 sleep 오차가 쌓이지 않음
+- 시작 시각을 가장 짧은 간격 안에 고르게 흩어 여러 이벤트의 요청이 한꺼번에 몰리지 않게 함
+- 간격에 약간의 지터(항상 +방향)를 더해 설정한 최소 간격보다 짧아지지 않음
+- 403/429/5xx 응답이나 응답을 못 받은 실행(None, 예외)이면 지수 백오프, 오류가 계속되면 이벤트의 기본 간격 자체를 늘림
+- 루프에서 실제로 일한 시간과 기다린 시간을 따로 집계
+"""
+
+import heapq
+import random
+import time
+
+# 간격에 더할 지터 비율 (0.1 → 간격의 0~10%)
+JITTER_RATIO = 0.1
+# 백오프 대상 HTTP 상태
+BACKOFF_STATUSES = {403, 429}
+# 백오프 상한(초)
+BACKOFF_MAX_SEC = 30 * 60
+# 연속 오류가 이 횟수에 이르면 기본 간격을 GROW_FACTOR 배로 늘림 (최대 MAX_SCALE 배)
+SUSTAINED_ERRORS = 5
+GROW_FACTOR = 1.5
+MAX_SCALE = 8.0
+# 연속 성공이 이 횟수에 이르면 늘린 간격을 한 단계 되돌림
+RECOVER_AFTER = 20
+# job 이 조회하지 않고 넘어갔을 때 반환 (리더가 아닌 복제본 등). 오류·성공 어느 쪽에도 세지 않고 기본 간격 뒤 다시 실행
+SKIPPED = "skipped"
+
+
+def is_backoff_status(status) -> bool:
+    """서버가 요청을 줄이라고 보는 응답인지 (403/429/5xx), 또는 응답을 못 받았는지 (None)"""
+    return status is None or status in BACKOFF_STATUSES or (isinstance(status, int) and status >= 500)
+
+
+class _Slot:
+    """이벤트 하나의 스케줄 상태"""
+
+    def __init__(self, event):
+        self.event = event
+        self.errors = 0  # 연속 오류 수
+        self.successes = 0  # 연속 성공 수
+        self.scale = 1.0  # 기본 간격 배율 (오류가 계속되면 늘어남)
+
+    @property
+    def interval(self) -> float:
+        return self.event.interval * self.scale
+
+
+class Scheduler:
+    """
+    이벤트별 간격으로 job(event) 를 호출하는 단일 루프.
+    job 은 HTTP 상태 코드(응답을 못 받았으면 None = 오류)를, 조회하지 않았으면 SKIPPED 를 반환
+    """
+
+    def __init__(self, events, clock=time.monotonic, sleep=time.sleep, rng=None, jitter=JITTER_RATIO):
+        self.events = list(events)
+        self.clock = clock
+        self.sleep = sleep
+        self.rng = rng or random.Random()
+        self.jitter = jitter
+        self._heap: list[tuple[float, int, _Slot]] = []
+        self.slots = [_Slot(ev) for ev in self.events]
+        # 루프 집계: 실행 횟수, 일한 시간, 기다린 시간, 예정보다 늦게 시작한 시간
+        self.stats = {"runs": 0, "busy_sec": 0.0, "sleep_sec": 0.0, "late_sec": 0.0}
+        now = self.clock()
+        spread = min(ev.interval for ev in self.events) if self.events else 0
+        for i, slot in enumerate(self.slots):
+            # 첫 실행을 간격 안에서 균등 분산 (첫 이벤트는 바로)
+            offset = spread * i / len(self.slots)
+            heapq.heappush(self._heap, (now + offset, i, slot))
+
+    def next_deadline(self) -> float | None:
+        return self._heap[0][0] if self._heap else None
+
+    def next_delay(self, slot: _Slot, status) -> float:
+        """job 결과에 따른 다음 실행까지의 간격(초). 항상 이벤트의 기본 간격 이상"""
+        if status == SKIPPED:
+            delay = slot.interval
+        elif is_backoff_status(status):
+            slot.errors += 1
+            slot.successes = 0
+            if slot.errors % SUSTAINED_ERRORS == 0 and slot.scale < MAX_SCALE:
+                slot.scale = min(MAX_SCALE, slot.scale * GROW_FACTOR)
+                print(f"[스케줄] {slot.event.slug}: 오류가 계속되어 기본 간격을 {slot.interval:.0f}초로 늘립니다")
+            delay = min(BACKOFF_MAX_SEC, slot.interval * 2 ** min(slot.errors, 10))
+            # 서버가 Retry-After 로 알려준 시간이 더 길면 그만큼 기다림
+            delay = max(delay, getattr(slot.event, "retry_after", 0.0) or 0.0)
+        else:
+            slot.errors = 0
+            slot.successes += 1
+            if slot.scale > 1.0 and slot.successes >= RECOVER_AFTER:
+                slot.scale = max(1.0, slot.scale / GROW_FACTOR)
+                slot.successes = 0
+            delay = slot.interval
+        return delay + self.rng.uniform(0, delay * self.jitter)
+
+    def run_pending(self, job) -> bool:
+        """가장 이른 이벤트를 기다렸다가 한 번 실행. 실행할 이벤트가 없으면 False"""
+        if not self._heap:
+            return False
+        deadline, seq, slot = heapq.heappop(self._heap)
+        delay = deadline - self.clock()
+        if delay > 0:
+            self.sleep(delay)
+            self.stats["sleep_sec"] += delay
+        started = self.clock()
+        self.stats["late_sec"] += max(0.0, started - deadline)
+        status = None
+        try:
+            status = job(slot.event)
+        finally:
+            now = self.clock()
+            self.stats["runs"] += 1
+            self.stats["busy_sec"] += now - started
+            # 다음 실행은 이번 예정 시각 기준 (sleep 오차 누적 없음). 늦게 시작했으면 실제 시작 시각 기준이라
+            # 두 요청 사이가 간격보다 짧아지지 않음.
+            # 처리 시간이 간격보다 길었으면 밀린 만큼 몰아서 실행하지 않고 지금부터 다시 셈
+            nxt = max(deadline, started) + self.next_delay(slot, status)
+            if nxt < now:
+                nxt = now
+            heapq.heappush(self._heap, (nxt, seq, slot))
+        return True
+
+    def run(self, job):
+        while self.run_pending(job):
+            pass
+
+    def overhead(self) -> dict:
+        """루프 집계 요약: 실행당 평균 일한 시간·늦게 시작한 시간, 전체 중 일한 시간 비율"""
+        runs = self.stats["runs"] or 1
+        busy = self.stats["busy_sec"]
+        total = busy + self.stats["sleep_sec"]
+        return {
+            "runs": self.stats["runs"],
+            "busy_avg": busy / runs,
+            "late_avg": self.stats["late_sec"] / runs,
+            "busy_ratio": busy / total if total else 0.0,
+        }
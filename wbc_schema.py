@@ -0,0 +1,96 @@
+"""
+공연 레코드 필드 해석과 스키마 변경(drift) 감지
+props.concerts 항목에서 id·날짜·시간·이름·건수를 어떤 키로 읽을지 레코드마다 후보를 하나씩 시도하지 않고,
+레코드 모양(정렬한 키 목록 = fingerprint, 키 순서만 바뀐 건 같은 모양)마다 한 번만 정해 캐시한다.
+(값이 null 이거나 첫 레코드와 모양이 다른 레코드는 나머지 후보 키로 다시 읽음 = FieldPlan.alternates)
+모양이 직전과 달라지면 추가/삭제된 키와 새 필드 매핑을 담은 schema_drift 이벤트를 on_drift 로 알린다.
+(처음 본 모양이라도 필수 필드를 찾지 못하면 알림)
+"""
+
+from datetime import datetime
+
+# 필드 → 후보 키 (앞쪽 우선)
+FIELD_CANDIDATES = {
+    "id": ("id",),
+    "date": ("concert_date_web_format", "concert_date"),
+    "time": ("start_time_web_format", "start_time"),
+    "name": ("name",),
+    "count": ("listings_count",),
+}
+# 없으면 결과를 믿을 수 없는 필드
+REQUIRED_FIELDS = ("id", "count")
+
+
+class FieldPlan:
+    """
+    레코드 모양 하나에 대해 정한 필드별 키 (없으면 None).
+    alternates: 필드별 나머지 후보 키 (없으면 None). 값이 null 이거나 모양이 다른 레코드는 이 키로 다시 읽음
+    """
+
+    __slots__ = ("fingerprint", "keys", "alternates", "missing")
+
+    def __init__(self, fingerprint: tuple):
+        present = set(fingerprint)
+        self.fingerprint = fingerprint
+        self.keys = tuple(next((k for k in cands if k in present), None) for cands in FIELD_CANDIDATES.values())
+        self.alternates = tuple(
+            next((k for k in cands if k != key), None) for cands, key in zip(FIELD_CANDIDATES.values(), self.keys)
+        )
+        self.missing = [f for f, k in zip(FIELD_CANDIDATES, self.keys) if k is None]
+
+    def mapping(self) -> dict:
+        return dict(zip(FIELD_CANDIDATES, self.keys))
+
+    def broken(self) -> bool:
+        return any(f in self.missing for f in REQUIRED_FIELDS)
+
+
+class SchemaResolver:
+    """fingerprint → FieldPlan 캐시. source(이벤트 slug 등)별로 직전 모양을 기억해 변경을 감지"""
+
+    def __init__(self, on_drift=None):
+        self.on_drift = on_drift  # (drift 이벤트 dict) -> None
+        self._plans: dict[tuple, FieldPlan] = {}
+        self._last: dict[str, tuple] = {}
+        self.drifts = 0
+
+    def resolve(self, records: list, source: str = "") -> FieldPlan | None:
+        """records 의 첫 항목 키 목록으로 FieldPlan 결정. 레코드가 없거나 dict 가 아니면 None"""
+        if not records or not isinstance(records[0], dict):
+            return None
+        fp = tuple(sorted(records[0]))
+        last = self._last.get(source)
+        if fp == last:
+            return self._plans[fp]
+        plan = self._plans.get(fp)
+        if plan is None:
+            plan = self._plans[fp] = FieldPlan(fp)
+        self._last[source] = fp
+        if last is not None or plan.missing:
+            self._emit(source, last, plan)
+        return plan
+
+    def current(self, source: str = "") -> FieldPlan | None:
+        """source 가 마지막으로 쓴 FieldPlan"""
+        fp = self._last.get(source)
+        return self._plans.get(fp) if fp is not None else None
+
+    def _emit(self, source: str, last: tuple | None, plan: FieldPlan):
+        before = set(last or ())
+        after = set(plan.fingerprint)
+        drift = {
+            "type": "schema_drift",
+            "event": source,
+            "ts": datetime.now().isoformat(),
+            "added": sorted(after - before) if last is not None else [],
+            "removed": sorted(before - after),
+            "fields": plan.mapping(),
+            "missing": list(plan.missing),
+            "broken": plan.broken(),
+        }
+        if last is not None:
+            prev = self._plans[last].mapping()
+            drift["changed_fields"] = {f: [prev[f], k] for f, k in drift["fields"].items() if prev[f] != k}
+        self.drifts += 1
+        if self.on_drift is not None:
+            self.on_drift(drift)
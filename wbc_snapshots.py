@@ -0,0 +1,159 @@
+"""
+디버그 스냅샷 보관함
+파싱에 실패한 응답 HTML 을 html/wbc_last.html 하나에 덮어쓰지 않고,
+시각별로 압축(zstandard 가 있으면 zstd, 없으면 gzip)해서 쌓아 둔다.
+- 스냅샷마다 HTTP 상태·debug_msg 등 메타데이터를 같은 이름의 .json 으로 함께 저장
+- 개수/전체 크기 제한을 넘으면 오래된 것부터 삭제
+- 파일 쓰기는 백그라운드 스레드가 하므로 모니터 루프는 큐에 넣기만 함
+bench/replay.py 가 이 폴더를 그대로 읽어 파서 회귀를 재현할 수 있다.
+"""
+
+import atexit
+import gzip
+import json
+import queue
+import threading
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+SNAPSHOT_SUFFIXES = (".html.zst", ".html.gz")
+_META_SUFFIX = ".json"
+
+
+def _compress(data: bytes) -> tuple[bytes, str]:
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=10).compress(data), ".html.zst"
+    return gzip.compress(data, compresslevel=6), ".html.gz"
+
+
+def read_snapshot(path) -> str:
+    """스냅샷 파일(.html.zst / .html.gz / .html)을 HTML 문자열로 읽기"""
+    path = Path(path)
+    data = path.read_bytes()
+    if path.name.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(f"{path.name}: zstandard 가 설치되지 않았습니다. 'pip install zstandard' 실행 필요")
+        data = zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    elif path.name.endswith(".gz"):
+        data = gzip.decompress(data)
+    return data.decode("utf-8", errors="replace")
+
+
+def _stem(path: Path) -> str:
+    for suffix in SNAPSHOT_SUFFIXES:
+        if path.name.endswith(suffix):
+            return path.name[: -len(suffix)]
+    return path.stem
+
+
+class SnapshotArchive:
+    """시각별 압축 스냅샷 보관함 (개수·크기 제한, 백그라운드 쓰기)"""
+
+    def __init__(self, directory, max_count: int = 50, max_bytes: int = 50 * 1024 * 1024, queue_size: int = 8):
+        self.directory = Path(directory)
+        self.max_count = max_count
+        self.max_bytes = max_bytes
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self.dropped = 0  # 큐가 가득 차서 버린 스냅샷 수
+
+    # ---- 기록 ----
+
+    def save(self, html_text: str, status=None, debug_msg: str = "", event: str = "", url: str = "") -> bool:
+        """
+        스냅샷을 큐에 넣고 바로 반환 (쓰기는 백그라운드 스레드).
+        큐가 가득 차 있으면 버리고 False
+        """
+        self._start()
+        item = (datetime.now(), html_text, {"status": status, "debug_msg": debug_msg, "event": event, "url": url})
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def write(self, html_text: str, status=None, debug_msg: str = "", event: str = "", url: str = "",
+              when: datetime | None = None) -> Path:
+        """스냅샷 하나를 바로 기록하고 제한을 넘는 오래된 스냅샷 삭제. 반환: 스냅샷 파일 경로"""
+        when = when or datetime.now()
+        meta = {"time": when.isoformat(), "event": event, "url": url, "status": status, "debug_msg": debug_msg}
+        data, suffix = _compress(html_text.encode("utf-8"))
+        meta["html_bytes"] = len(html_text.encode("utf-8"))
+        name = when.strftime("%Y%m%d-%H%M%S-%f") + (f"_{event}" if event else "")
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self.directory / (name + suffix)
+            path.write_bytes(data)
+            (self.directory / (name + _META_SUFFIX)).write_text(
+                json.dumps(meta, ensure_ascii=False, indent=2), encoding="utf-8"
+            )
+            self._evict()
+        return path
+
+    def _evict(self):
+        files = self.files()
+        sizes = [p.stat().st_size for p in files]
+        total = sum(sizes)
+        # 이름이 시각 순이므로 앞쪽(오래된 것)부터 삭제. 마지막 하나는 남김
+        i = 0
+        while i < len(files) - 1 and (len(files) - i > self.max_count or total > self.max_bytes):
+            total -= sizes[i]
+            files[i].unlink(missing_ok=True)
+            (self.directory / (_stem(files[i]) + _META_SUFFIX)).unlink(missing_ok=True)
+            i += 1
+
+    # ---- 조회 ----
+
+    def files(self) -> list[Path]:
+        """스냅샷 파일 목록 (오래된 순)"""
+        if not self.directory.exists():
+            return []
+        return sorted(p for p in self.directory.iterdir() if p.name.endswith(SNAPSHOT_SUFFIXES))
+
+    def meta(self, path) -> dict:
+        """스냅샷의 메타데이터 (없으면 빈 dict)"""
+        path = Path(path)
+        try:
+            return json.loads((path.parent / (_stem(path) + _META_SUFFIX)).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def iter_snapshots(self):
+        """(파일 경로, 메타데이터, HTML) 을 오래된 순으로 반환"""
+        for path in self.files():
+            yield path, self.meta(path), read_snapshot(path)
+
+    # ---- 백그라운드 쓰기 ----
+
+    def _start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="wbc-snapshots", daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            when, html_text, meta = item
+            try:
+                path = self.write(html_text, when=when, **meta)
+                print(f"       응답 HTML을 '{path}' 에 저장했습니다. (bench/replay.py {self.directory} 로 재현)")
+            except Exception as e:
+                print("[경고] 디버그 스냅샷 저장 실패:", e)
+
+    def stop(self, timeout: float = 10.0):
+        """큐에 남은 스냅샷을 쓰고 스레드 종료"""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
@@ -0,0 +1,160 @@
+"""
+변경 이벤트 스트림
+모니터가 감지한 변경을 구조화된 이벤트로 발행하고, 여러 구독자(대시보드·알림·분석 등)가
+판매 사이트나 wbc_state.json 을 따로 조회하지 않고 받아 볼 수 있게 한다.
+- Server-Sent Events: start_server(port) 후 GET /events (여러 클라이언트 동시 구독)
+  Last-Event-ID 헤더(또는 ?last_id=N)로 재접속하면 최근 backlog 안에서 놓친 이벤트부터 다시 받음
+  ?event=slug 로 특정 이벤트만 구독
+- JSONL: jsonl_path 를 주면 이벤트를 한 줄씩 추가 (tail -f 로 구독)
+느린 구독자의 큐가 가득 차면 그 구독자만 끊어 모니터 루프가 막히지 않는다.
+"""
+
+import json
+import queue
+import threading
+from collections import deque
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+# SSE 연결 유지용 주석 전송 간격(초)
+HEARTBEAT_SEC = 15.0
+
+
+class Subscriber:
+    """구독자 하나의 수신 큐"""
+
+    def __init__(self, maxsize: int, event_filter: str | None = None):
+        self.queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self.event_filter = event_filter
+        self.closed = False
+
+    def wants(self, item: dict) -> bool:
+        return self.event_filter is None or item.get("event") == self.event_filter
+
+    def get(self, timeout: float | None = None) -> dict | None:
+        """다음 이벤트. timeout 안에 없으면 None"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class ChangeStream:
+    """이벤트 발행/구독 브로커 (seq 번호, 최근 backlog, JSONL 파일 출력)"""
+
+    def __init__(self, backlog: int = 256, queue_size: int = 1024, jsonl_path=None):
+        self.queue_size = queue_size
+        self.jsonl_path = Path(jsonl_path) if jsonl_path else None
+        self._recent: deque = deque(maxlen=backlog)
+        self._subscribers: set[Subscriber] = set()
+        self._lock = threading.Lock()
+        self._seq = 0
+        self.published = 0
+        self.dropped = 0  # 큐가 가득 차 끊은 구독자 수
+
+    def publish(self, items: list[dict]):
+        """이벤트들에 seq 를 붙여 모든 구독자와 JSONL 파일로 보냄"""
+        if not items:
+            return
+        with self._lock:
+            for item in items:
+                self._seq += 1
+                item["seq"] = self._seq
+                self._recent.append(item)
+                for sub in list(self._subscribers):
+                    if not sub.wants(item):
+                        continue
+                    try:
+                        sub.queue.put_nowait(item)
+                    except queue.Full:
+                        # 따라오지 못하는 구독자는 끊음 (재접속 시 Last-Event-ID 로 이어 받기)
+                        sub.closed = True
+                        self._subscribers.discard(sub)
+                        self.dropped += 1
+            self.published += len(items)
+        if self.jsonl_path is not None:
+            try:
+                with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                    f.write("".join(json.dumps(i, ensure_ascii=False) + "\n" for i in items))
+            except OSError as e:
+                print("[경고] 이벤트 스트림 파일 기록 실패:", e)
+
+    def subscribe(self, last_id: int | None = None, event_filter: str | None = None) -> Subscriber:
+        """
+        구독 시작. last_id 를 주면 backlog 중 그 이후 이벤트를 먼저 큐에 넣음.
+        (backlog 보다 오래된 이벤트는 받을 수 없음)
+        """
+        sub = Subscriber(self.queue_size, event_filter)
+        with self._lock:
+            if last_id is not None:
+                for item in self._recent:
+                    if item["seq"] > last_id and sub.wants(item):
+                        try:
+                            sub.queue.put_nowait(item)
+                        except queue.Full:
+                            break
+            self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber):
+        with self._lock:
+            self._subscribers.discard(sub)
+        sub.closed = True
+
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+
+def _make_handler(stream: ChangeStream):
+    from http.server import BaseHTTPRequestHandler
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlsplit(self.path)
+            if url.path not in ("/events", "/"):
+                self.send_error(404)
+                return
+            query = parse_qs(url.query)
+            last_id = self.headers.get("Last-Event-ID") or (query.get("last_id") or [None])[0]
+            try:
+                last_id = int(last_id) if last_id is not None else None
+            except ValueError:
+                last_id = None
+            event_filter = (query.get("event") or [None])[0]
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            sub = stream.subscribe(last_id, event_filter)
+            try:
+                self.wfile.write(b": connected\n\n")
+                self.wfile.flush()
+                while not sub.closed:
+                    item = sub.get(timeout=HEARTBEAT_SEC)
+                    if item is None:
+                        chunk = ": ping\n\n"
+                    else:
+                        data = json.dumps(item, ensure_ascii=False)
+                        chunk = f"id: {item['seq']}\nevent: {item.get('type', 'message')}\ndata: {data}\n\n"
+                    self.wfile.write(chunk.encode("utf-8"))
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError, OSError):
+                pass
+            finally:
+                stream.unsubscribe(sub)
+
+        def log_message(self, *args):
+            pass
+
+    return _Handler
+
+
+def start_server(stream: ChangeStream, port: int, addr: str = "127.0.0.1"):
+    """백그라운드 스레드에서 SSE 서버 시작 (GET /events). 반환: ThreadingHTTPServer"""
+    from http.server import ThreadingHTTPServer
+
+    server = ThreadingHTTPServer((addr, port), _make_handler(stream))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="wbc-stream", daemon=True).start()
+    return server
@@ -0,0 +1,168 @@
+"""
+공유 HTTP 전송 계층
+wbc_monitor(페이지 조회·Discord)와 wbc_auto(Discord)가 같은 requests.Session 을 재사용해
+매 요청마다 TCP+TLS 연결을 새로 맺지 않도록 한다.
+요청마다 연결 수립 시간(TCP+TLS, urllib3 연결의 connect 를 감싸 잼)·TTFB(응답 헤더까지)·전체 시간을 기록한다.
+풀의 연결을 그대로 썼으면 연결 시간은 0 (끊긴 keep-alive 연결을 urllib3 가 다시 맺은 경우는 새 연결로 잡힘).
+requests 는 첫 요청 때 import 한다 (모듈 로드 시간 단축).
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+# (연결, 읽기) 타임아웃(초). 판매 사이트와 Discord 를 따로 설정
+VENDOR_TIMEOUT = (
+    float(os.environ.get("WBC_VENDOR_CONNECT_TIMEOUT", "5")),
+    float(os.environ.get("WBC_VENDOR_READ_TIMEOUT", "15")),
+)
+DISCORD_TIMEOUT = (
+    float(os.environ.get("WBC_DISCORD_CONNECT_TIMEOUT", "5")),
+    float(os.environ.get("WBC_DISCORD_READ_TIMEOUT", "10")),
+)
+_TIMEOUTS = {"vendor": VENDOR_TIMEOUT, "discord": DISCORD_TIMEOUT}
+
+# 호스트(풀) 수와 호스트당 유지할 연결 수. 판매 사이트 + Discord 정도라 작게 둠
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 4
+
+# 최근 요청 시간 기록 (kind, status, connect, ttfb, total, reused)
+TIMINGS: deque = deque(maxlen=256)
+
+_requests = None  # requests 모듈 (처음 요청할 때 로드)
+_session = None  # requests.Session
+_adapter_cls = None  # 연결 시간을 재는 HTTPAdapter (처음 Session 을 만들 때 정의)
+# 이 스레드에서 진행 중인 요청이 연결을 맺는 데 쓴 시간(초). 감싼 connect 가 더함
+_local = threading.local()
+
+
+def _load_requests():
+    global _requests
+    if _requests is None:
+        import requests
+
+        _requests = requests
+    return _requests
+
+
+def is_http_error(exc: BaseException) -> bool:
+    """requests.HTTPError 인지 (requests 를 아직 로드하지 않았으면 그럴 수 없으므로 False)"""
+    return _requests is not None and isinstance(exc, _requests.HTTPError)
+
+
+def _timed_adapter():
+    """연결 클래스의 connect(TCP 연결 + TLS 핸드셰이크)에 걸린 시간을 _local 에 더하는 HTTPAdapter"""
+    global _adapter_cls
+    if _adapter_cls is None:
+        from requests.adapters import HTTPAdapter
+        from urllib3.connection import HTTPConnection, HTTPSConnection
+        from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+        def timed(cls):
+            class Timed(cls):
+                def connect(self):
+                    t0 = time.perf_counter()
+                    try:
+                        super().connect()
+                    finally:
+                        _local.connect_sec = getattr(_local, "connect_sec", 0.0) + time.perf_counter() - t0
+
+            Timed.__name__ = "Timed" + cls.__name__
+            return Timed
+
+        class TimedHTTPPool(HTTPConnectionPool):
+            ConnectionCls = timed(HTTPConnection)
+
+        class TimedHTTPSPool(HTTPSConnectionPool):
+            ConnectionCls = timed(HTTPSConnection)
+
+        pools = {"http": TimedHTTPPool, "https": TimedHTTPSPool}
+
+        class TimedAdapter(HTTPAdapter):
+            def init_poolmanager(self, *args, **kwargs):
+                super().init_poolmanager(*args, **kwargs)
+                self.poolmanager.pool_classes_by_scheme = pools
+
+            def proxy_manager_for(self, proxy, **proxy_kwargs):
+                manager = super().proxy_manager_for(proxy, **proxy_kwargs)
+                # SOCKS 프록시는 자체 연결 클래스를 쓰므로 그대로 둠 (연결 시간은 0 으로 기록됨)
+                if not proxy.lower().startswith("socks"):
+                    manager.pool_classes_by_scheme = pools
+                return manager
+
+        _adapter_cls = TimedAdapter
+    return _adapter_cls
+
+
+def get_session():
+    """프로세스 전체에서 공유하는 requests.Session (처음 호출 시 생성)"""
+    global _session
+    if _session is None:
+        requests = _load_requests()
+        s = requests.Session()
+        adapter = _timed_adapter()(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+        s.mount("https://", adapter)
+        s.mount("http://", adapter)
+        _session = s
+    return _session
+
+
+def close_session():
+    global _session
+    if _session is not None:
+        _session.close()
+        _session = None
+
+
+def request(method: str, url: str, kind: str = "vendor", **kwargs):
+    """
+    공유 Session 으로 요청. kind("vendor" | "discord")에 맞는 타임아웃을 기본값으로 사용.
+    본문까지 모두 읽은 뒤 반환하며 시간 기록을 TIMINGS 에 추가
+    """
+    session = get_session()
+    kwargs.setdefault("timeout", _TIMEOUTS.get(kind, VENDOR_TIMEOUT))
+    _local.connect_sec = 0.0
+    t0 = time.perf_counter()
+    r = session.request(method, url, stream=True, **kwargs)
+    # stream=True 이므로 elapsed 는 응답 헤더 수신까지 = TTFB
+    ttfb = r.elapsed.total_seconds()
+    connect = _local.connect_sec
+    try:
+        r.content  # 본문을 모두 읽고 연결을 풀에 반환
+    finally:
+        total = time.perf_counter() - t0
+        TIMINGS.append({
+            "kind": kind,
+            "host": urlsplit(url).hostname,
+            "status": r.status_code,
+            "connect": connect,
+            "ttfb": ttfb,
+            "total": total,
+            "reused": connect == 0.0,
+        })
+    return r
+
+
+def get(url: str, kind: str = "vendor", **kwargs):
+    return request("GET", url, kind, **kwargs)
+
+
+def post(url: str, kind: str = "discord", **kwargs):
+    return request("POST", url, kind, **kwargs)
+
+
+def last_timing(kind: str) -> dict | None:
+    """kind 의 가장 최근 요청 시간 기록"""
+    for t in reversed(TIMINGS):
+        if t["kind"] == kind:
+            return t
+    return None
+
+
+def format_timing(t: dict | None) -> str:
+    if not t:
+        return ""
+    reuse = "연결 재사용" if t["reused"] else f"새 연결 {t['connect'] * 1000:.0f}ms"
+    return f"TTFB {t['ttfb'] * 1000:.0f}ms / 전체 {t['total'] * 1000:.0f}ms, {reuse}"